@@ -1,5 +1,10 @@
 from fastapi import APIRouter
-from .endpoints import auth, incidents, assets
+
+from app.core.cache import cache
+from app.core.rate_limit import rate_limiter
+from app.services.alert_storm import alert_storm
+from app.services.anomaly_detector import anomaly_detector
+from .endpoints import ai, auth, incidents, assets, telemetry, websockets, zones
 
 api_router = APIRouter()
 
@@ -7,8 +12,32 @@ api_router = APIRouter()
 api_router.include_router(auth.router, prefix="/auth", tags=["authentication"])
 api_router.include_router(incidents.router, prefix="/incidents", tags=["incidents"])
 api_router.include_router(assets.router, prefix="/assets", tags=["assets"])
+api_router.include_router(telemetry.router, prefix="/telemetry", tags=["telemetry"])
+api_router.include_router(zones.router, prefix="/zones", tags=["zones"])
+api_router.include_router(websockets.router, prefix="/ws", tags=["websockets"])
+api_router.include_router(ai.router, prefix="/ai", tags=["ai"])
 
 # Health check endpoint
 @api_router.get("/health")
 async def health_check():
     return {"status": "healthy", "message": "CivitasIQ API is running"}
+
+@api_router.get("/cache/stats")
+async def cache_stats():
+    """Cache hit/miss/eviction counters for tuning"""
+    return cache.stats()
+
+@api_router.get("/telemetry-anomalies/stats")
+async def anomaly_stats():
+    """Streaming anomaly detector series and alert counters for this worker"""
+    return anomaly_detector.stats()
+
+@api_router.get("/alert-groups/stats")
+async def alert_group_stats():
+    """Alert storm suppression counters for this worker"""
+    return alert_storm.stats()
+
+@api_router.get("/rate-limit/stats")
+async def rate_limit_stats():
+    """Rate limiter backend and allowed/limited counters for this worker"""
+    return rate_limiter.stats()
@@ -0,0 +1,81 @@
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from datetime import datetime, timezone
+import math
+import uuid
+
+from app.core.database import get_async_db
+from app.core.serialization import json_response
+from app.models.asset import Asset
+from app.schemas.ai import ForecastRequest, ForecastResponse
+from app.services.forecasting import current_watermark, forecaster
+
+router = APIRouter()
+
+HORIZON_UNITS = {"h": 3600, "d": 86400}
+
+@router.post("/forecast", response_model=ForecastResponse)
+async def forecast_metric(request: ForecastRequest, db: AsyncSession = Depends(get_async_db)):
+    """
+    Forecast a telemetry metric for many assets
+
+    Assets are given as ``asset_ids`` or selected by ``tenant_id`` (with
+    optional ``asset_type`` and ``location`` zone filters). Forecasts are
+    served from the forecast cache when they were computed for the current
+    data watermark; the rest are computed in one batch.
+    """
+    if request.asset_ids:
+        asset_ids = list(dict.fromkeys(request.asset_ids))
+    elif request.tenant_id:
+        query = select(Asset.id).where(Asset.tenant_id == request.tenant_id)
+        if request.asset_type:
+            query = query.where(Asset.type == request.asset_type)
+        if request.location:
+            query = query.where(Asset.properties["zone"].as_string() == request.location)
+        asset_ids = list((await db.execute(query)).scalars())
+    else:
+        raise HTTPException(status_code=400, detail="Either asset_ids or tenant_id is required")
+
+    seconds = int(request.forecast_horizon[:-1]) * HORIZON_UNITS[request.forecast_horizon[-1]]
+    steps = max(math.ceil(seconds / forecaster.step), 1)
+
+    try:
+        forecasts = await forecaster.forecast(db, asset_ids, request.metric, steps, request.model)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    if forecasts:
+        watermark = next(iter(forecasts.values())).watermark
+    else:
+        watermark = current_watermark(step=forecaster.step)
+    series = {}
+    for asset_id, forecast in forecasts.items():
+        series[str(asset_id)] = {
+            "model_type": forecast.model,
+            "values": forecast.value.tolist(),
+            "confidence_lower": forecast.lower.tolist() if request.include_confidence else None,
+            "confidence_upper": forecast.upper.tolist() if request.include_confidence else None,
+        }
+
+    return json_response({
+        "forecast_id": uuid.uuid4(),
+        "metric": request.metric,
+        "forecast_horizon": request.forecast_horizon,
+        "timestamps": [
+            datetime.fromtimestamp(watermark + i * forecaster.step, tz=timezone.utc)
+            for i in range(steps)
+        ],
+        "forecasts": series,
+        "model_info": {
+            "step_seconds": forecaster.step,
+            "last_trained": datetime.fromtimestamp(watermark, tz=timezone.utc),
+            "series": len(series),
+            "missing": [asset_id for asset_id in asset_ids if asset_id not in forecasts],
+        },
+    })
+
+@router.get("/forecast/stats")
+async def forecast_stats():
+    """Forecast cache and process pool status for this worker"""
+    return forecaster.stats()
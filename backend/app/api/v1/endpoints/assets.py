@@ -1,115 +1,326 @@
 from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy.orm import Session
+from fastapi.responses import StreamingResponse
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
 from typing import List, Optional
 from uuid import UUID
+from datetime import datetime, timedelta, timezone
 
-from app.core.database import get_db
-from app.schemas.asset import AssetCreate, AssetUpdate, AssetResponse, AssetList
+from app.core.cache import cache, cache_key
+from app.core.config import settings
+from app.core.database import get_async_db
+from app.core.loading import loader_options, parse_include
+from app.core.pagination import keyset_after, keyset_order, split_page
+from app.core.serialization import RowSerializer, geo_point, json_response
+from app.services.entity_counts import asset_counts
+from app.services.export_service import EXPORT_MEDIA_TYPES, stream_export
+from app.schemas.asset import (
+    AssetCreate, AssetUpdate, AssetResponse, AssetList, AssetLocation, AssetLocationList,
+    AssetIncidentSummary
+)
+from app.schemas.telemetry import TelemetryQueryResponse
 from app.models.asset import Asset
+from app.services.spatial_index import asset_index
+from app.services.rollups import downsample_from_rollups
+from app.services.telemetry_query import downsample, load_series
 
 router = APIRouter()
 
+# Relations that can be requested with ?include=, and how each is loaded.
+# Telemetry is deliberately absent: it is served by /{asset_id}/telemetry.
+ASSET_RELATIONS = {
+    "incidents": selectinload(Asset.incidents),
+}
+
+INCLUDE_DESCRIPTION = f"Comma-separated related data to embed: {', '.join(ASSET_RELATIONS)}"
+
+# Serializes list pages without building a model per row
+asset_serializer = RowSerializer(
+    AssetResponse,
+    converters={"location": geo_point},
+    relations={"incidents": RowSerializer(AssetIncidentSummary)}
+)
+
+def _include_options(include: Optional[str]) -> list:
+    try:
+        return loader_options(ASSET_RELATIONS, parse_include(include, ASSET_RELATIONS))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+def _filter_assets(query, tenant_id: Optional[UUID], type: Optional[str], status: Optional[str]):
+    """Apply the filters shared by the list and export endpoints"""
+    if tenant_id:
+        query = query.where(Asset.tenant_id == tenant_id)
+    if type:
+        query = query.where(Asset.type == type)
+    if status:
+        query = query.where(Asset.status == status)
+    return query
+
 @router.get("/", response_model=AssetList)
 async def get_assets(
     skip: int = Query(0, ge=0),
     limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = None,
+    include_total: bool = True,
+    exact_total: bool = False,
+    tenant_id: Optional[UUID] = None,
     type: Optional[str] = None,
     status: Optional[str] = None,
-    db: Session = Depends(get_db)
+    include: Optional[str] = Query(None, description=INCLUDE_DESCRIPTION),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Get list of assets with optional filtering
+    
+    Pass the ``next_cursor`` of a previous page as ``cursor`` for keyset
+    pagination; ``skip`` is ignored in that case. ``total`` comes from
+    maintained counters and may briefly lag concurrent writes; set
+    ``exact_total=true`` to count in the database, or ``include_total=false``
+    to skip it. Related data named in ``include`` is loaded with one extra
+    query per relation, not per row.
     """
-    query = db.query(Asset)
+    options = _include_options(include)
+    query = _filter_assets(select(Asset), tenant_id, type, status)
     
-    if type:
-        query = query.filter(Asset.type == type)
-    if status:
-        query = query.filter(Asset.status == status)
+    total = None
+    if include_total:
+        if not exact_total:
+            total = asset_counts.total(tenant_id, type=type, status=status)
+        if total is None:
+            total = await db.scalar(select(func.count()).select_from(query.subquery()))
     
-    total = query.count()
-    assets = query.offset(skip).limit(limit).all()
+    query = query.order_by(*keyset_order(Asset))
+    if cursor:
+        try:
+            query = query.where(keyset_after(Asset, cursor))
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+    else:
+        query = query.offset(skip)
     
-    return AssetList(
-        assets=assets,
-        total=total,
-        page=skip // limit + 1,
-        per_page=limit,
-        total_pages=(total + limit - 1) // limit
+    result = await db.execute(query.options(*options).limit(limit + 1))
+    assets, next_cursor = split_page(result.scalars().all(), limit)
+    
+    return json_response({
+        "assets": asset_serializer.many(assets),
+        "total": total,
+        "page": None if cursor else skip // limit + 1,
+        "per_page": limit,
+        "total_pages": (total + limit - 1) // limit if total is not None else None,
+        "next_cursor": next_cursor,
+    })
+
+@router.get("/export")
+async def export_assets(
+    format: str = Query("ndjson", pattern="^(ndjson|csv)$"),
+    tenant_id: Optional[UUID] = None,
+    type: Optional[str] = None,
+    status: Optional[str] = None
+):
+    """
+    Stream every matching asset as NDJSON or CSV
+    
+    Accepts the same filters as the list endpoint. Rows are read through a
+    server-side cursor, so memory use is constant regardless of export size.
+    """
+    query = _filter_assets(select(Asset), tenant_id, type, status).order_by(*keyset_order(Asset))
+    return StreamingResponse(
+        stream_export(query, _serialize_asset, format),
+        media_type=EXPORT_MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="assets.{format}"'}
     )
 
+def _serialize_asset(asset: Asset) -> dict:
+    return AssetResponse.model_validate(asset).model_dump(mode="json", exclude=set(ASSET_RELATIONS))
+
+@router.get("/spatial/bbox", response_model=AssetLocationList)
+async def get_assets_in_bbox(
+    tenant_id: UUID,
+    min_lng: float = Query(..., ge=-180, le=180),
+    min_lat: float = Query(..., ge=-90, le=90),
+    max_lng: float = Query(..., ge=-180, le=180),
+    max_lat: float = Query(..., ge=-90, le=90),
+    limit: int = Query(1000, ge=1, le=10000)
+):
+    """
+    Get asset locations inside a bounding box (e.g. the map viewport)
+    """
+    grid = asset_index.grid(tenant_id)
+    matches = grid.bbox(min_lng, min_lat, max_lng, max_lat, limit) if grid else []
+    assets = [AssetLocation(id=id, lng=lng, lat=lat) for id, lng, lat in matches]
+    return AssetLocationList(assets=assets, count=len(assets))
+
+@router.get("/spatial/radius", response_model=AssetLocationList)
+async def get_assets_in_radius(
+    tenant_id: UUID,
+    lng: float = Query(..., ge=-180, le=180),
+    lat: float = Query(..., ge=-90, le=90),
+    radius_m: float = Query(..., gt=0, le=100000),
+    limit: int = Query(1000, ge=1, le=10000)
+):
+    """
+    Get asset locations within ``radius_m`` metres of a point, nearest first
+    """
+    grid = asset_index.grid(tenant_id)
+    matches = grid.radius(lng, lat, radius_m, limit) if grid else []
+    assets = [
+        AssetLocation(id=id, lng=plng, lat=plat, distance_m=distance)
+        for id, plng, plat, distance in matches
+    ]
+    return AssetLocationList(assets=assets, count=len(assets))
+
+@router.get("/spatial/nearest", response_model=AssetLocationList)
+async def get_nearest_assets(
+    tenant_id: UUID,
+    lng: float = Query(..., ge=-180, le=180),
+    lat: float = Query(..., ge=-90, le=90),
+    k: int = Query(10, ge=1, le=1000)
+):
+    """
+    Get the ``k`` asset locations nearest to a point
+    """
+    grid = asset_index.grid(tenant_id)
+    matches = grid.nearest(lng, lat, k) if grid else []
+    assets = [
+        AssetLocation(id=id, lng=plng, lat=plat, distance_m=distance)
+        for id, plng, plat, distance in matches
+    ]
+    return AssetLocationList(assets=assets, count=len(assets))
+
 @router.get("/{asset_id}", response_model=AssetResponse)
-async def get_asset(asset_id: UUID, db: Session = Depends(get_db)):
+async def get_asset(
+    asset_id: UUID,
+    tenant_id: Optional[UUID] = None,
+    include: Optional[str] = Query(None, description=INCLUDE_DESCRIPTION),
+    db: AsyncSession = Depends(get_async_db)
+):
     """
     Get a specific asset by ID
+    
+    Served through the read-through cache. Pass ``tenant_id`` to scope the
+    lookup to a tenant; assets of other tenants are reported as not found.
+    Requests with ``include`` bypass the cache, since related rows change
+    without invalidating the asset.
     """
-    asset = db.query(Asset).filter(Asset.id == asset_id).first()
+    options = _include_options(include)
+    
+    async def load():
+        asset = await db.get(Asset, asset_id, options=options)
+        if asset is None or (tenant_id and asset.tenant_id != tenant_id):
+            return None
+        return AssetResponse.model_validate(asset).model_dump(mode="json")
+    
+    if include:
+        asset = await load()
+    else:
+        asset = await cache.get_or_load(cache_key("asset", tenant_id, asset_id), load)
     if not asset:
         raise HTTPException(status_code=404, detail="Asset not found")
     return asset
 
 @router.post("/", response_model=AssetResponse)
-async def create_asset(asset: AssetCreate, db: Session = Depends(get_db)):
+async def create_asset(asset: AssetCreate, db: AsyncSession = Depends(get_async_db)):
     """
     Create a new asset
     """
     db_asset = Asset(**asset.dict())
     db.add(db_asset)
-    db.commit()
-    db.refresh(db_asset)
+    await db.commit()
+    await db.refresh(db_asset)
+    asset_counts.add(db_asset.tenant_id, asset_counts.key(db_asset))
+    asset_index.upsert(db_asset.tenant_id, db_asset.id, *asset.location.coordinates)
     return db_asset
 
 @router.put("/{asset_id}", response_model=AssetResponse)
 async def update_asset(
     asset_id: UUID, 
     asset_update: AssetUpdate, 
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Update an existing asset
     """
-    db_asset = db.query(Asset).filter(Asset.id == asset_id).first()
+    db_asset = await db.get(Asset, asset_id)
     if not db_asset:
         raise HTTPException(status_code=404, detail="Asset not found")
     
+    old_key = asset_counts.key(db_asset)
     update_data = asset_update.dict(exclude_unset=True)
     for field, value in update_data.items():
         setattr(db_asset, field, value)
     
-    db.commit()
-    db.refresh(db_asset)
+    await db.commit()
+    await db.refresh(db_asset)
+    asset_counts.move(db_asset.tenant_id, old_key, asset_counts.key(db_asset))
+    await cache.invalidate("asset", db_asset.tenant_id, asset_id)
+    if asset_update.location is not None:
+        asset_index.upsert(db_asset.tenant_id, db_asset.id, *asset_update.location.coordinates)
     return db_asset
 
 @router.delete("/{asset_id}")
-async def delete_asset(asset_id: UUID, db: Session = Depends(get_db)):
+async def delete_asset(asset_id: UUID, db: AsyncSession = Depends(get_async_db)):
     """
     Delete an asset
     """
-    db_asset = db.query(Asset).filter(Asset.id == asset_id).first()
+    db_asset = await db.get(Asset, asset_id)
     if not db_asset:
         raise HTTPException(status_code=404, detail="Asset not found")
     
-    db.delete(db_asset)
-    db.commit()
+    await db.delete(db_asset)
+    await db.commit()
+    asset_counts.add(db_asset.tenant_id, asset_counts.key(db_asset), -1)
+    await cache.invalidate("asset", db_asset.tenant_id, asset_id)
+    asset_index.remove(db_asset.tenant_id, db_asset.id)
     return {"message": "Asset deleted successfully"}
 
-@router.get("/{asset_id}/telemetry")
+@router.get("/{asset_id}/telemetry", response_model=TelemetryQueryResponse)
 async def get_asset_telemetry(
     asset_id: UUID,
-    limit: int = Query(100, ge=1, le=1000),
-    db: Session = Depends(get_db)
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    metrics: Optional[List[str]] = Query(None),
+    points: int = Query(1000, ge=3, le=10000),
+    mode: str = Query("minmax", pattern="^(minmax|lttb)$"),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
-    Get telemetry data for a specific asset
+    Get downsampled telemetry for a specific asset
+    
+    Returns at most ``points`` points per metric over ``[start, end)``
+    (default: the last 24 hours). ``minmax`` aggregates fixed-width buckets
+    into min/max/avg/count, from the coarsest rollup that fits when buckets
+    are a minute or wider; ``lttb`` keeps the most significant raw points.
     """
-    asset = db.query(Asset).filter(Asset.id == asset_id).first()
+    asset = await db.get(Asset, asset_id)
     if not asset:
         raise HTTPException(status_code=404, detail="Asset not found")
     
-    # This would typically query the telemetry_data table
-    # For now, return a placeholder response
-    return {
-        "asset_id": str(asset_id),
-        "telemetry_data": [],
-        "message": "Telemetry data endpoint - implementation pending"
-    }
+    end = _as_utc(end) if end else datetime.now(timezone.utc)
+    start = _as_utc(start) if start else end - timedelta(hours=24)
+    if start >= end:
+        raise HTTPException(status_code=400, detail="start must be before end")
+    
+    rolled = None
+    if mode == "minmax" and settings.TELEMETRY_ROLLUPS_ENABLED:
+        rolled = await downsample_from_rollups(db, asset_id, asset.type, start, end, points, metrics)
+    if rolled is not None:
+        source_points, series = rolled
+    else:
+        timestamps, raw = await load_series(db, asset_id, start, end, metrics)
+        source_points, series = len(timestamps), downsample(timestamps, raw, start, end, points, mode)
+    
+    return TelemetryQueryResponse(
+        asset_id=asset_id,
+        start=start,
+        end=end,
+        mode=mode,
+        points=points,
+        source_points=source_points,
+        series=series
+    )
+
+def _as_utc(value: datetime) -> datetime:
+    """Treat naive datetimes as UTC"""
+    return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
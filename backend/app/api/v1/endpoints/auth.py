@@ -1,38 +1,39 @@
 from fastapi import APIRouter, Depends, HTTPException, status
-from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
-from sqlalchemy.orm import Session
-from datetime import datetime, timedelta
-from typing import Optional
-import jwt
+from fastapi.security import OAuth2PasswordRequestForm
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from datetime import datetime, timedelta, timezone
 
 from app.core.config import settings
-from app.core.database import get_db
-from app.schemas.auth import Token, TokenData, UserLogin
+from app.core.database import get_async_db
+from app.schemas.auth import CurrentUser, Token, UserLogin
 from app.models.user import User
 from app.core.security import (
     verify_password,
     create_access_token,
-    get_password_hash
+    get_current_user,
+    oauth2_scheme,
+    token_verifier
 )
 
 router = APIRouter()
-oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token")
 
 @router.post("/login", response_model=Token)
 async def login(
     form_data: OAuth2PasswordRequestForm = Depends(),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """User login endpoint"""
-    # TODO: Implement proper user authentication
-    # TODO: Add rate limiting for login attempts
     # TODO: Add audit logging for login events
     
-    # Placeholder authentication logic
-    if form_data.username == "admin" and form_data.password == "password":
+    user = (await db.execute(select(User).where(User.email == form_data.username))).scalar_one_or_none()
+    if user and user.is_active and verify_password(form_data.password, user.hashed_password):
+        user.last_login = datetime.now(timezone.utc)
+        await db.commit()
         access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
         access_token = create_access_token(
-            data={"sub": form_data.username}, expires_delta=access_token_expires
+            data={"sub": str(user.id), "tenant_id": str(user.tenant_id), "role": user.role},
+            expires_delta=access_token_expires
         )
         return {
             "access_token": access_token,
@@ -49,7 +50,7 @@ async def login(
 @router.post("/register", response_model=Token)
 async def register(
     user_data: UserLogin,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """User registration endpoint"""
     # TODO: Implement user registration
@@ -65,7 +66,7 @@ async def register(
 @router.post("/refresh", response_model=Token)
 async def refresh_token(
     current_token: str = Depends(oauth2_scheme),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Refresh access token"""
     # TODO: Implement token refresh logic
@@ -80,31 +81,25 @@ async def refresh_token(
 @router.post("/logout")
 async def logout(
     current_token: str = Depends(oauth2_scheme),
-    db: Session = Depends(get_db)
+    current_user: CurrentUser = Depends(get_current_user)
 ):
-    """User logout endpoint"""
-    # TODO: Implement logout logic
-    # TODO: Add token blacklisting
+    """User logout endpoint: revokes the token for the rest of its lifetime"""
     # TODO: Add audit logging
     
+    await token_verifier.revoke(current_token)
     return {"message": "Successfully logged out"}
 
-@router.get("/me")
-async def get_current_user(
-    current_token: str = Depends(oauth2_scheme),
-    db: Session = Depends(get_db)
-):
+@router.get("/me", response_model=CurrentUser)
+async def read_current_user(current_user: CurrentUser = Depends(get_current_user)):
     """Get current user information"""
-    # TODO: Implement current user retrieval
-    # TODO: Add user permissions check
     # TODO: Add user profile data
     
-    return {
-        "username": "admin",
-        "email": "admin@civitasiq.com",
-        "role": "administrator",
-        "permissions": ["read", "write", "admin"]
-    }
+    return current_user
+
+@router.get("/token-cache/stats")
+async def token_cache_stats():
+    """Token verification cache and revocation counters for this worker"""
+    return token_verifier.stats()
 
 # TODO: Add password reset endpoints
 # TODO: Add email verification endpoints
@@ -1,97 +1,228 @@
 from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy.orm import Session
+from fastapi.responses import StreamingResponse
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload, selectinload
 from typing import List, Optional
 from uuid import UUID
 
-from app.core.database import get_db
-from app.schemas.incident import IncidentCreate, IncidentUpdate, IncidentResponse, IncidentList
+from app.core.cache import cache, cache_key
+from app.core.database import get_async_db
+from app.core.loading import loader_options, parse_include
+from app.core.pagination import keyset_after, keyset_order, split_page
+from app.core.serialization import RowSerializer, geo_point, json_response
+from app.services.entity_counts import incident_counts
+from app.services.export_service import EXPORT_MEDIA_TYPES, stream_export
+from app.schemas.incident import (
+    IncidentCreate, IncidentUpdate, IncidentResponse, IncidentList,
+    IncidentAssetSummary, IncidentUserSummary
+)
+from app.schemas.recommendation import RecommendationResponse
 from app.models.incident import Incident
 
 router = APIRouter()
 
+# Relations that can be requested with ?include=, and how each is loaded
+INCIDENT_RELATIONS = {
+    "assets": selectinload(Incident.assets),
+    "recommendations": selectinload(Incident.recommendations),
+    "assigned_user": joinedload(Incident.assigned_user),
+}
+
+INCLUDE_DESCRIPTION = f"Comma-separated related data to embed: {', '.join(INCIDENT_RELATIONS)}"
+
+# Serializes list pages without building a model per row
+incident_serializer = RowSerializer(
+    IncidentResponse,
+    converters={"location": geo_point},
+    relations={
+        "assets": RowSerializer(IncidentAssetSummary),
+        "recommendations": RowSerializer(RecommendationResponse),
+        "assigned_user": RowSerializer(IncidentUserSummary),
+    }
+)
+
+def _include_options(include: Optional[str]) -> list:
+    try:
+        return loader_options(INCIDENT_RELATIONS, parse_include(include, INCIDENT_RELATIONS))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+def _filter_incidents(
+    query,
+    tenant_id: Optional[UUID],
+    status: Optional[str],
+    severity: Optional[str],
+    type: Optional[str]
+):
+    """Apply the filters shared by the list and export endpoints"""
+    if tenant_id:
+        query = query.where(Incident.tenant_id == tenant_id)
+    if status:
+        query = query.where(Incident.status == status)
+    if severity:
+        query = query.where(Incident.severity == severity)
+    if type:
+        query = query.where(Incident.type == type)
+    return query
+
 @router.get("/", response_model=IncidentList)
 async def get_incidents(
     skip: int = Query(0, ge=0),
     limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = None,
+    include_total: bool = True,
+    exact_total: bool = False,
+    tenant_id: Optional[UUID] = None,
     status: Optional[str] = None,
     severity: Optional[str] = None,
     type: Optional[str] = None,
-    db: Session = Depends(get_db)
+    include: Optional[str] = Query(None, description=INCLUDE_DESCRIPTION),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Get list of incidents with optional filtering
+    
+    Pass the ``next_cursor`` of a previous page as ``cursor`` for keyset
+    pagination; ``skip`` is ignored in that case. ``total`` comes from
+    maintained counters and may briefly lag concurrent writes; set
+    ``exact_total=true`` to count in the database, or ``include_total=false``
+    to skip it. Related data named in ``include`` is loaded with one extra
+    query per relation, not per row.
     """
-    query = db.query(Incident)
+    options = _include_options(include)
+    query = _filter_incidents(select(Incident), tenant_id, status, severity, type)
     
-    if status:
-        query = query.filter(Incident.status == status)
-    if severity:
-        query = query.filter(Incident.severity == severity)
-    if type:
-        query = query.filter(Incident.type == type)
+    total = None
+    if include_total:
+        if not exact_total:
+            total = incident_counts.total(tenant_id, status=status, severity=severity, type=type)
+        if total is None:
+            total = await db.scalar(select(func.count()).select_from(query.subquery()))
     
-    total = query.count()
-    incidents = query.offset(skip).limit(limit).all()
+    query = query.order_by(*keyset_order(Incident))
+    if cursor:
+        try:
+            query = query.where(keyset_after(Incident, cursor))
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+    else:
+        query = query.offset(skip)
     
-    return IncidentList(
-        incidents=incidents,
-        total=total,
-        page=skip // limit + 1,
-        per_page=limit,
-        total_pages=(total + limit - 1) // limit
+    result = await db.execute(query.options(*options).limit(limit + 1))
+    incidents, next_cursor = split_page(result.scalars().all(), limit)
+    
+    return json_response({
+        "incidents": incident_serializer.many(incidents),
+        "total": total,
+        "page": None if cursor else skip // limit + 1,
+        "per_page": limit,
+        "total_pages": (total + limit - 1) // limit if total is not None else None,
+        "next_cursor": next_cursor,
+    })
+
+@router.get("/export")
+async def export_incidents(
+    format: str = Query("ndjson", pattern="^(ndjson|csv)$"),
+    tenant_id: Optional[UUID] = None,
+    status: Optional[str] = None,
+    severity: Optional[str] = None,
+    type: Optional[str] = None
+):
+    """
+    Stream every matching incident as NDJSON or CSV
+    
+    Accepts the same filters as the list endpoint. Rows are read through a
+    server-side cursor, so memory use is constant regardless of export size.
+    """
+    query = _filter_incidents(select(Incident), tenant_id, status, severity, type).order_by(*keyset_order(Incident))
+    return StreamingResponse(
+        stream_export(query, _serialize_incident, format),
+        media_type=EXPORT_MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="incidents.{format}"'}
     )
 
+def _serialize_incident(incident: Incident) -> dict:
+    return IncidentResponse.model_validate(incident).model_dump(mode="json", exclude=set(INCIDENT_RELATIONS))
+
 @router.get("/{incident_id}", response_model=IncidentResponse)
-async def get_incident(incident_id: UUID, db: Session = Depends(get_db)):
+async def get_incident(
+    incident_id: UUID,
+    tenant_id: Optional[UUID] = None,
+    include: Optional[str] = Query(None, description=INCLUDE_DESCRIPTION),
+    db: AsyncSession = Depends(get_async_db)
+):
     """
     Get a specific incident by ID
+    
+    Served through the read-through cache. Pass ``tenant_id`` to scope the
+    lookup to a tenant; incidents of other tenants are reported as not found.
+    Requests with ``include`` bypass the cache, since related rows change
+    without invalidating the incident.
     """
-    incident = db.query(Incident).filter(Incident.id == incident_id).first()
+    options = _include_options(include)
+    
+    async def load():
+        incident = await db.get(Incident, incident_id, options=options)
+        if incident is None or (tenant_id and incident.tenant_id != tenant_id):
+            return None
+        return IncidentResponse.model_validate(incident).model_dump(mode="json")
+    
+    if include:
+        incident = await load()
+    else:
+        incident = await cache.get_or_load(cache_key("incident", tenant_id, incident_id), load)
     if not incident:
         raise HTTPException(status_code=404, detail="Incident not found")
     return incident
 
 @router.post("/", response_model=IncidentResponse)
-async def create_incident(incident: IncidentCreate, db: Session = Depends(get_db)):
+async def create_incident(incident: IncidentCreate, db: AsyncSession = Depends(get_async_db)):
     """
     Create a new incident
     """
     db_incident = Incident(**incident.dict())
     db.add(db_incident)
-    db.commit()
-    db.refresh(db_incident)
+    await db.commit()
+    await db.refresh(db_incident)
+    incident_counts.add(db_incident.tenant_id, incident_counts.key(db_incident))
     return db_incident
 
 @router.put("/{incident_id}", response_model=IncidentResponse)
 async def update_incident(
     incident_id: UUID, 
     incident_update: IncidentUpdate, 
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Update an existing incident
     """
-    db_incident = db.query(Incident).filter(Incident.id == incident_id).first()
+    db_incident = await db.get(Incident, incident_id)
     if not db_incident:
         raise HTTPException(status_code=404, detail="Incident not found")
     
+    old_key = incident_counts.key(db_incident)
     update_data = incident_update.dict(exclude_unset=True)
     for field, value in update_data.items():
         setattr(db_incident, field, value)
     
-    db.commit()
-    db.refresh(db_incident)
+    await db.commit()
+    await db.refresh(db_incident)
+    incident_counts.move(db_incident.tenant_id, old_key, incident_counts.key(db_incident))
+    await cache.invalidate("incident", db_incident.tenant_id, incident_id)
     return db_incident
 
 @router.delete("/{incident_id}")
-async def delete_incident(incident_id: UUID, db: Session = Depends(get_db)):
+async def delete_incident(incident_id: UUID, db: AsyncSession = Depends(get_async_db)):
     """
     Delete an incident
     """
-    db_incident = db.query(Incident).filter(Incident.id == incident_id).first()
+    db_incident = await db.get(Incident, incident_id)
     if not db_incident:
         raise HTTPException(status_code=404, detail="Incident not found")
     
-    db.delete(db_incident)
-    db.commit()
+    await db.delete(db_incident)
+    await db.commit()
+    incident_counts.add(db_incident.tenant_id, incident_counts.key(db_incident), -1)
+    await cache.invalidate("incident", db_incident.tenant_id, incident_id)
     return {"message": "Incident deleted successfully"}
@@ -0,0 +1,67 @@
+from typing import List, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Request
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.database import get_async_db
+from app.models.metric import MetricDefinition
+from app.schemas.telemetry import MetricDefinitionResponse, TelemetryBatchResult
+from app.services.telemetry_service import decode_payload, ingest_batch
+from app.services.telemetry_wal import LogFullError, log_batch, telemetry_wal
+
+router = APIRouter()
+
+NDJSON_CONTENT_TYPES = ("application/x-ndjson", "application/ndjson", "application/jsonl")
+
+@router.post("/batch", response_model=TelemetryBatchResult)
+async def ingest_telemetry_batch(request: Request, db: AsyncSession = Depends(get_async_db)):
+    """
+    Ingest a batch of telemetry readings
+    
+    Accepts either a JSON array of readings or NDJSON (one reading per line)
+    when sent with an NDJSON content type. Invalid rows are rejected
+    individually; the rest of the batch is written in a single transaction,
+    or, with the write-ahead log enabled, acknowledged once it is durable in
+    the log and stored by the normalizer shortly after.
+    """
+    content_type = request.headers.get("content-type", "").split(";")[0].strip()
+    body = await request.body()
+    
+    try:
+        records, errors = decode_payload(body, ndjson=content_type in NDJSON_CONTENT_TYPES)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    if len(records) > settings.TELEMETRY_BATCH_MAX_ROWS:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Batch exceeds {settings.TELEMETRY_BATCH_MAX_ROWS} readings"
+        )
+    
+    if settings.TELEMETRY_WAL_ENABLED:
+        try:
+            return await log_batch(records, errors)
+        except LogFullError as e:
+            raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "5"})
+    
+    return await ingest_batch(db, records, errors)
+
+@router.get("/wal/stats")
+async def telemetry_wal_stats():
+    """Write-ahead log backlog and normalizer counters for this worker"""
+    return telemetry_wal.stats()
+
+@router.get("/metrics", response_model=List[MetricDefinitionResponse])
+async def list_metric_definitions(asset_type: Optional[str] = None, db: AsyncSession = Depends(get_async_db)):
+    """
+    Metric catalog: the id and unit of every metric reported per asset type
+    
+    Ids are assigned as readings of a new metric are first stored.
+    """
+    query = select(MetricDefinition).order_by(MetricDefinition.asset_type, MetricDefinition.name)
+    if asset_type:
+        query = query.where(MetricDefinition.asset_type == asset_type)
+    result = await db.execute(query)
+    return result.scalars().all()
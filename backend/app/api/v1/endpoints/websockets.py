@@ -0,0 +1,118 @@
+import asyncio
+import json
+from typing import Optional, Set
+from fastapi import APIRouter, HTTPException, WebSocket, WebSocketDisconnect, status
+
+from app.core.config import settings
+from app.core.security import token_verifier
+from app.services.ws_hub import Hub, Subscriber, alert_hub, geofence_hub, telemetry_hub, total_connections
+
+router = APIRouter()
+
+def _parse_ids(value: Optional[str]) -> Set[str]:
+    """Parse a comma-separated query parameter into a set"""
+    return {item.strip() for item in value.split(",") if item.strip()} if value else set()
+
+def _apply_subscription(subscriber: Subscriber, message: dict):
+    """Handle a client subscribe/unsubscribe request"""
+    assets = {str(asset) for asset in message.get("assets", [])}
+    zones = {str(zone) for zone in message.get("zones", [])}
+    if message.get("action") == "subscribe":
+        subscriber.assets |= assets
+        subscriber.zones |= zones
+    elif message.get("action") == "unsubscribe":
+        subscriber.assets -= assets
+        subscriber.zones -= zones
+
+async def _serve(
+    websocket: WebSocket,
+    hub: Hub,
+    token: Optional[str],
+    assets: Optional[str],
+    zones: Optional[str]
+):
+    """Register a subscriber for the token's tenant and pump its queue until the client disconnects"""
+    try:
+        user = await token_verifier.verify(token) if token else None
+    except HTTPException:
+        user = None
+    if user is None:
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+        return
+    if total_connections() >= settings.WS_MAX_CONNECTIONS:
+        await websocket.close(code=status.WS_1013_TRY_AGAIN_LATER)
+        return
+    
+    await websocket.accept()
+    subscriber = Subscriber(websocket, user.tenant_id, _parse_ids(assets), _parse_ids(zones))
+    hub.add(subscriber)
+    sender = asyncio.create_task(subscriber.send_loop(settings.WS_HEARTBEAT_INTERVAL))
+    try:
+        while True:
+            receiver = asyncio.ensure_future(websocket.receive_text())
+            done, _ = await asyncio.wait({receiver, sender}, return_when=asyncio.FIRST_COMPLETED)
+            if sender in done:
+                # Sending failed (client went away); stop serving this socket
+                receiver.cancel()
+                break
+            try:
+                _apply_subscription(subscriber, json.loads(receiver.result()))
+            except (ValueError, AttributeError):
+                await websocket.send_text(json.dumps({"type": "error", "message": "Invalid subscription message"}))
+    except WebSocketDisconnect:
+        pass
+    finally:
+        hub.remove(subscriber)
+        sender.cancel()
+        await asyncio.gather(sender, return_exceptions=True)
+
+@router.websocket("/alerts")
+async def alerts_socket(
+    websocket: WebSocket,
+    assets: Optional[str] = None,
+    zones: Optional[str] = None,
+    token: Optional[str] = None
+):
+    """
+    Real-time alert notifications
+    
+    Optionally narrowed to comma-separated ``assets`` and ``zones``; clients
+    can change their subscription by sending
+    ``{"action": "subscribe" | "unsubscribe", "assets": [...], "zones": [...]}``.
+    """
+    await _serve(websocket, alert_hub, token, assets, zones)
+
+@router.websocket("/telemetry")
+async def telemetry_socket(
+    websocket: WebSocket,
+    assets: Optional[str] = None,
+    zones: Optional[str] = None,
+    token: Optional[str] = None
+):
+    """
+    Real-time sensor telemetry
+    
+    Slow clients receive only the latest reading per asset. Subscriptions
+    work as for ``/ws/alerts``.
+    """
+    await _serve(websocket, telemetry_hub, token, assets, zones)
+
+@router.websocket("/geofence")
+async def geofence_socket(
+    websocket: WebSocket,
+    assets: Optional[str] = None,
+    zones: Optional[str] = None,
+    token: Optional[str] = None
+):
+    """
+    Real-time geofence enter/exit events
+    
+    ``zones`` filters on geofence zone names. Subscriptions work as for
+    ``/ws/alerts``.
+    """
+    await _serve(websocket, geofence_hub, token, assets, zones)
+
+@router.get("/stats")
+async def websocket_stats():
+    """Connection and queue counters for the WebSocket hubs in this worker"""
+    return {"alerts": alert_hub.stats(), "telemetry": telemetry_hub.stats(), "geofence": geofence_hub.stats()}
@@ -0,0 +1,109 @@
+from fastapi import APIRouter, Depends, HTTPException
+from geoalchemy2.shape import from_shape
+from shapely.geometry import shape
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Optional
+from uuid import UUID
+
+from app.core.config import settings
+from app.core.database import get_async_db
+from app.models.zone import Zone
+from app.schemas.zone import GeoPolygon, ZoneCreate, ZoneUpdate, ZoneResponse, ZoneList
+from app.services.geofence import geofence_engine
+
+router = APIRouter()
+
+def _boundary(polygon: GeoPolygon):
+    """Validated shapely geometry for a GeoJSON polygon"""
+    try:
+        geometry = shape(polygon.model_dump())
+    except (ValueError, TypeError, IndexError) as e:
+        raise HTTPException(status_code=400, detail=f"Invalid boundary: {e}")
+    if geometry.is_empty or not geometry.is_valid:
+        raise HTTPException(status_code=400, detail="Invalid boundary: polygon is empty or self-intersecting")
+    return geometry
+
+@router.get("/", response_model=ZoneList)
+async def get_zones(tenant_id: Optional[UUID] = None, db: AsyncSession = Depends(get_async_db)):
+    """
+    Get geofence zones, optionally for one tenant
+    """
+    query = select(Zone).order_by(Zone.name)
+    if tenant_id:
+        query = query.where(Zone.tenant_id == tenant_id)
+    zones = (await db.execute(query)).scalars().all()
+    return ZoneList(zones=zones, total=len(zones))
+
+@router.get("/{zone_id}", response_model=ZoneResponse)
+async def get_zone(zone_id: UUID, db: AsyncSession = Depends(get_async_db)):
+    """
+    Get a specific geofence zone
+    """
+    zone = await db.get(Zone, zone_id)
+    if not zone:
+        raise HTTPException(status_code=404, detail="Zone not found")
+    return zone
+
+@router.post("/", response_model=ZoneResponse)
+async def create_zone(zone: ZoneCreate, db: AsyncSession = Depends(get_async_db)):
+    """
+    Create a geofence zone
+    """
+    boundary = _boundary(zone.boundary)
+    db_zone = Zone(
+        name=zone.name,
+        boundary=from_shape(boundary, srid=settings.DEFAULT_SRID),
+        properties=zone.properties,
+        tenant_id=zone.tenant_id
+    )
+    db.add(db_zone)
+    await db.commit()
+    await db.refresh(db_zone)
+    geofence_engine.set_zone(db_zone.tenant_id, db_zone.id, db_zone.name, boundary)
+    return db_zone
+
+@router.put("/{zone_id}", response_model=ZoneResponse)
+async def update_zone(zone_id: UUID, zone_update: ZoneUpdate, db: AsyncSession = Depends(get_async_db)):
+    """
+    Update a geofence zone
+    """
+    db_zone = await db.get(Zone, zone_id)
+    if not db_zone:
+        raise HTTPException(status_code=404, detail="Zone not found")
+
+    boundary = _boundary(zone_update.boundary) if zone_update.boundary is not None else None
+    if zone_update.name is not None:
+        db_zone.name = zone_update.name
+    if zone_update.properties is not None:
+        db_zone.properties = zone_update.properties
+    if boundary is not None:
+        db_zone.boundary = from_shape(boundary, srid=settings.DEFAULT_SRID)
+
+    await db.commit()
+    await db.refresh(db_zone)
+    current = geofence_engine.zones(db_zone.tenant_id)
+    if boundary is None and current is not None and zone_id in current.zones:
+        boundary = current.zones[zone_id][1]
+    if boundary is not None:
+        geofence_engine.set_zone(db_zone.tenant_id, db_zone.id, db_zone.name, boundary)
+    return db_zone
+
+@router.delete("/{zone_id}")
+async def delete_zone(zone_id: UUID, db: AsyncSession = Depends(get_async_db)):
+    """
+    Delete a geofence zone
+    """
+    db_zone = await db.get(Zone, zone_id)
+    if not db_zone:
+        raise HTTPException(status_code=404, detail="Zone not found")
+
+    await db.delete(db_zone)
+    await db.commit()
+    geofence_engine.remove_zone(db_zone.tenant_id, zone_id)
+    return {"message": "Zone deleted successfully"}
+
+@router.get("/geofence/stats")
+async def geofence_stats():
+    """Geofence engine zone and event counters for this worker"""
+    return geofence_engine.stats()
@@ -0,0 +1,263 @@
+"""
+Read-through cache for hot API objects.
+
+Lookups go through a small in-process LRU/TTL tier first and then a shared
+tier, which is Redis when ``REDIS_URL`` is reachable and an in-memory
+stand-in otherwise. Keys are tenant-scoped by the callers; see ``cache_key``.
+"""
+import json
+import logging
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+from uuid import UUID
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Scope used for lookups made without a tenant
+UNSCOPED = "*"
+
+
+def cache_key(kind: str, tenant_id: Optional[UUID], object_id: Any) -> str:
+    """Build a tenant-scoped cache key"""
+    return f"civitasiq:{tenant_id or UNSCOPED}:{kind}:{object_id}"
+
+
+class LocalTTLCache:
+    """Bounded LRU cache whose entries also expire after ``ttl`` seconds"""
+
+    def __init__(self, max_entries: int, ttl: float):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: str) -> Optional[Any]:
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        value, expires_at = entry
+        if expires_at < time.monotonic():
+            del self._entries[key]
+            self.expirations += 1
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None):
+        self._entries[key] = (value, time.monotonic() + (ttl if ttl is not None else self.ttl))
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def delete(self, key: str):
+        self._entries.pop(key, None)
+
+    def clear(self):
+        self._entries.clear()
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+        }
+
+
+class MemoryBackend:
+    """In-memory stand-in for Redis, used when Redis is not reachable"""
+
+    name = "memory"
+
+    def __init__(self, max_entries: int):
+        self._cache = LocalTTLCache(max_entries, ttl=0)
+
+    async def get(self, key: str) -> Optional[str]:
+        return self._cache.get(key)
+
+    async def set(self, key: str, value: str, ttl: int):
+        self._cache.set(key, value, ttl)
+
+    async def get_many(self, keys: List[str]) -> List[Optional[str]]:
+        return [self._cache.get(key) for key in keys]
+
+    async def set_many(self, values: Dict[str, str], ttl: int):
+        for key, value in values.items():
+            self._cache.set(key, value, ttl)
+
+    async def delete(self, *keys: str):
+        for key in keys:
+            self._cache.delete(key)
+
+    async def close(self):
+        self._cache.clear()
+
+
+class RedisBackend:
+    """Shared cache tier backed by Redis"""
+
+    name = "redis"
+
+    def __init__(self, client):
+        self._client = client
+
+    async def get(self, key: str) -> Optional[str]:
+        return await self._client.get(key)
+
+    async def set(self, key: str, value: str, ttl: int):
+        await self._client.set(key, value, ex=ttl)
+
+    async def get_many(self, keys: List[str]) -> List[Optional[str]]:
+        return await self._client.mget(keys)
+
+    async def set_many(self, values: Dict[str, str], ttl: int):
+        async with self._client.pipeline(transaction=False) as pipe:
+            for key, value in values.items():
+                pipe.set(key, value, ex=ttl)
+            await pipe.execute()
+
+    async def delete(self, *keys: str):
+        await self._client.delete(*keys)
+
+    async def close(self):
+        await self._client.close()
+
+
+class TieredCache:
+    """Local LRU/TTL tier in front of a shared Redis (or in-memory) tier"""
+
+    def __init__(self):
+        self.local = LocalTTLCache(settings.CACHE_LOCAL_MAX_ENTRIES, settings.CACHE_LOCAL_TTL_SECONDS)
+        self.shared = MemoryBackend(settings.CACHE_LOCAL_MAX_ENTRIES * 10)
+        self.shared_hits = 0
+        self.shared_misses = 0
+        self.errors = 0
+
+    async def connect(self):
+        """Switch the shared tier to Redis if it answers a ping"""
+        if not settings.CACHE_ENABLED:
+            return
+        try:
+            import redis.asyncio as redis
+
+            client = redis.from_url(
+                settings.REDIS_URL,
+                db=settings.REDIS_DB,
+                decode_responses=True,
+                socket_connect_timeout=1
+            )
+            await client.ping()
+        except Exception as e:
+            logger.warning(f"Redis unavailable, using in-memory cache tier: {e}")
+            return
+        self.shared = RedisBackend(client)
+        logger.info("Cache connected to Redis")
+
+    async def close(self):
+        await self.shared.close()
+
+    async def get(self, key: str) -> Optional[Any]:
+        value = self.local.get(key)
+        if value is not None:
+            return value
+        try:
+            raw = await self.shared.get(key)
+        except Exception as e:
+            self.errors += 1
+            logger.warning(f"Cache read failed for {key}: {e}")
+            return None
+        if raw is None:
+            self.shared_misses += 1
+            return None
+        self.shared_hits += 1
+        value = json.loads(raw)
+        self.local.set(key, value)
+        return value
+
+    async def set(self, key: str, value: Any):
+        self.local.set(key, value)
+        try:
+            await self.shared.set(key, json.dumps(value), settings.CACHE_TTL_SECONDS)
+        except Exception as e:
+            self.errors += 1
+            logger.warning(f"Cache write failed for {key}: {e}")
+
+    async def delete(self, *keys: str):
+        for key in keys:
+            self.local.delete(key)
+        try:
+            await self.shared.delete(*keys)
+        except Exception as e:
+            self.errors += 1
+            logger.warning(f"Cache invalidation failed for {keys}: {e}")
+
+    async def get_shared(self, keys: List[str]) -> Dict[str, Any]:
+        """Values found for ``keys`` in the shared tier only, for callers that keep their own local copy"""
+        if not keys:
+            return {}
+        try:
+            raws = await self.shared.get_many(keys)
+        except Exception as e:
+            self.errors += 1
+            logger.warning(f"Cache read failed for {len(keys)} keys: {e}")
+            return {}
+        found = {key: json.loads(raw) for key, raw in zip(keys, raws) if raw is not None}
+        self.shared_hits += len(found)
+        self.shared_misses += len(keys) - len(found)
+        return found
+
+    async def set_shared(self, values: Dict[str, Any], ttl: int):
+        """Write ``values`` to the shared tier only"""
+        if not values:
+            return
+        try:
+            await self.shared.set_many({key: json.dumps(value) for key, value in values.items()}, ttl)
+        except Exception as e:
+            self.errors += 1
+            logger.warning(f"Cache write failed for {len(values)} keys: {e}")
+
+    async def get_or_load(self, key: str, loader: Callable[[], Awaitable[Optional[Any]]]) -> Optional[Any]:
+        """Return the cached value for ``key``, calling ``loader`` on a miss"""
+        if not settings.CACHE_ENABLED:
+            return await loader()
+        value = await self.get(key)
+        if value is None:
+            value = await loader()
+            if value is not None:
+                await self.set(key, value)
+        return value
+
+    async def invalidate(self, kind: str, tenant_id: UUID, object_id: Any):
+        """Drop an object from its tenant scope and the unscoped scope"""
+        await self.delete(
+            cache_key(kind, tenant_id, object_id),
+            cache_key(kind, None, object_id)
+        )
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "backend": self.shared.name,
+            "local": self.local.stats(),
+            "shared": {
+                "hits": self.shared_hits,
+                "misses": self.shared_misses,
+                "errors": self.errors,
+            },
+        }
+
+
+cache = TieredCache()
@@ -1,10 +1,13 @@
-from sqlalchemy import create_engine, MetaData
+from sqlalchemy import Column, DateTime, MetaData, String, Table, create_engine, delete, func, inspect, insert, select, text
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.pool import StaticPool
 import logging
-from typing import AsyncGenerator
+from typing import AsyncGenerator, List, Optional
 import asyncio
+import hashlib
 
 from app.core.config import settings
 
@@ -25,12 +28,62 @@ engine = create_engine(
 # Create session factory
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Async drivers used for each sync driver family
+ASYNC_DRIVERS = {
+    "postgresql": "postgresql+asyncpg",
+    "sqlite": "sqlite+aiosqlite",
+}
+
+def get_async_database_url(url: str) -> str:
+    """Map a sync database URL onto the matching async driver"""
+    parsed = make_url(url)
+    backend = parsed.get_backend_name()
+    if parsed.get_driver_name() in ("asyncpg", "aiosqlite") or backend not in ASYNC_DRIVERS:
+        return url
+    return parsed.set(drivername=ASYNC_DRIVERS[backend]).render_as_string(hide_password=False)
+
+def get_pool_options(url: str) -> dict:
+    """Pool sizing for server databases; aiosqlite keeps SQLAlchemy's default pool"""
+    if make_url(url).get_backend_name() == "sqlite":
+        return {}
+    return {
+        "pool_size": settings.DATABASE_POOL_SIZE,
+        "max_overflow": settings.DATABASE_MAX_OVERFLOW,
+    }
+
+ASYNC_DATABASE_URL = settings.ASYNC_DATABASE_URL or get_async_database_url(DATABASE_URL)
+
+# Create async engine (asyncpg for Postgres, aiosqlite for local development)
+async_engine = create_async_engine(
+    ASYNC_DATABASE_URL,
+    pool_pre_ping=True,
+    echo=settings.DEBUG,
+    **get_pool_options(ASYNC_DATABASE_URL)
+)
+
+# Create async session factory. Objects stay usable after commit so that
+# endpoints can return them without triggering a lazy refresh.
+AsyncSessionLocal = async_sessionmaker(
+    async_engine,
+    class_=AsyncSession,
+    autoflush=False,
+    expire_on_commit=False
+)
+
 # Create base class for models
 Base = declarative_base()
 
 # Metadata for schema management
 metadata = MetaData()
 
+# Fingerprint of the model metadata the tables were last created from
+schema_version = Table(
+    "schema_version",
+    metadata,
+    Column("version", String(64), primary_key=True),
+    Column("applied_at", DateTime(timezone=True), server_default=func.now(), nullable=False),
+)
+
 def get_db():
     """Get database session"""
     db = SessionLocal()
@@ -39,19 +92,72 @@ def get_db():
     finally:
         db.close()
 
+async def get_async_db() -> AsyncGenerator[AsyncSession, None]:
+    """Get async database session"""
+    async with AsyncSessionLocal() as session:
+        yield session
+
+def schema_fingerprint(model_metadata: MetaData) -> str:
+    """Stable hash of every table, column, type and index in ``model_metadata``"""
+    digest = hashlib.sha256()
+    for table in sorted(model_metadata.tables.values(), key=lambda t: t.fullname):
+        digest.update(table.fullname.encode())
+        for column in table.columns:
+            digest.update(f"|{column.name}:{column.type!r}:{column.nullable}:{column.primary_key}".encode())
+        for index in sorted(table.indexes, key=lambda i: i.name or ""):
+            digest.update(f"|{index.name}:{[c.name for c in index.columns]}".encode())
+    return digest.hexdigest()[:16]
+
+def _read_schema_version(connection) -> Optional[str]:
+    if not inspect(connection).has_table(schema_version.name):
+        return None
+    return connection.execute(select(schema_version.c.version)).scalar()
+
+def _schema_mismatches(connection, model_metadata: MetaData) -> List[str]:
+    """Differences between existing tables and the models that ``create_all`` cannot fix"""
+    inspector = inspect(connection)
+    mismatches = []
+    for table in model_metadata.tables.values():
+        if not inspector.has_table(table.name, schema=table.schema):
+            continue
+        existing = {column["name"]: column for column in inspector.get_columns(table.name, schema=table.schema)}
+        for column in table.columns:
+            found = existing.get(column.name)
+            if found is None:
+                mismatches.append(f"{table.name}.{column.name} is missing")
+            elif column.nullable and not column.primary_key and not found["nullable"]:
+                mismatches.append(f"{table.name}.{column.name} is NOT NULL")
+    return mismatches
+
 async def init_db():
-    """Initialize database"""
+    """
+    Initialize database: create missing tables unless the recorded schema version is current.
+    
+    A new version is only recorded once existing tables have every model
+    column; otherwise startup fails until the migration has been run.
+    """
     try:
         # Import all models to ensure they are registered
-        from app.models import (
-            user, tenant, role, audit_log,
-            asset, zone, telemetry, incident,
-            recommendation, document
-        )
+        import app.models  # noqa: F401
+        from app.models.base import Base as ModelBase
         
-        # Create all tables
-        Base.metadata.create_all(bind=engine)
-        logger.info("Database tables created successfully")
+        version = schema_fingerprint(ModelBase.metadata)
+        async with async_engine.begin() as conn:
+            if await conn.run_sync(_read_schema_version) == version:
+                logger.info(f"Database schema {version} is current, skipping table creation")
+                return
+            # create_all only adds missing tables; column changes need a migration
+            mismatches = await conn.run_sync(_schema_mismatches, ModelBase.metadata)
+            if mismatches:
+                raise RuntimeError(
+                    f"Database schema is out of date ({'; '.join(mismatches)}); "
+                    "run the migrations listed in backend/README.md before starting this version"
+                )
+            await conn.run_sync(ModelBase.metadata.create_all)
+            await conn.run_sync(metadata.create_all)
+            await conn.execute(delete(schema_version))
+            await conn.execute(insert(schema_version).values(version=version))
+        logger.info(f"Database tables created for schema {version}")
         
         # TODO: Run initial migrations
         # TODO: Seed initial data
@@ -60,6 +166,20 @@ async def init_db():
         logger.error(f"Database initialization failed: {e}")
         raise
 
+async def prime_pool(connections: int):
+    """Open ``connections`` pooled connections up front so first requests don't pay for connecting"""
+    async def touch():
+        async with async_engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+    
+    # Held concurrently, so each one is a separate pooled connection
+    await asyncio.gather(*(touch() for _ in range(connections)))
+
+async def close_db():
+    """Release pooled connections on shutdown"""
+    await async_engine.dispose()
+    engine.dispose()
+
 async def check_db_health():
     """Check database health"""
     try:
@@ -76,7 +196,6 @@ def get_db_session():
     """Get database session for use in background tasks"""
     return SessionLocal()
 
-# TODO: Add async database support for better performance
 # TODO: Add connection pooling configuration
 # TODO: Add database migration support with Alembic
 # TODO: Add database backup and recovery procedures
@@ -0,0 +1,31 @@
+"""
+Relationship loading for API responses.
+
+List and detail endpoints load related rows only when asked to through an
+``?include=`` parameter, using one ``selectinload``/``joinedload`` per
+relationship regardless of page size. Every other relationship is set to
+``raiseload`` so that an accidental lazy load fails loudly instead of
+issuing one query per row.
+"""
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy.orm import raiseload
+
+
+def parse_include(include: Optional[str], relations: Dict[str, Any]) -> List[str]:
+    """Split a comma-separated ``include`` value, rejecting unknown relations"""
+    if not include:
+        return []
+    names = [name.strip() for name in include.split(",") if name.strip()]
+    unknown = [name for name in names if name not in relations]
+    if unknown:
+        raise ValueError(
+            f"Unknown include value(s): {', '.join(unknown)}; "
+            f"expected any of: {', '.join(relations)}"
+        )
+    return list(dict.fromkeys(names))
+
+
+def loader_options(relations: Dict[str, Any], include: List[str]) -> list:
+    """Eager loaders for the included relations; everything else raises on access"""
+    return [relations[name] for name in include] + [raiseload("*")]
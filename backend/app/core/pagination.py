@@ -0,0 +1,54 @@
+"""
+Keyset (cursor) pagination helpers.
+
+List endpoints order rows by ``(created_at, id)`` descending and resume from
+the last row of the previous page instead of using OFFSET, so the cost of a
+page does not grow with its depth. Cursors are opaque, URL-safe tokens.
+"""
+import base64
+from datetime import datetime
+from typing import List, Optional, Tuple
+from uuid import UUID
+
+from sqlalchemy import tuple_
+
+
+def encode_cursor(created_at: datetime, id: UUID) -> str:
+    """Encode a row position into an opaque cursor"""
+    raw = f"{created_at.isoformat()}|{id}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, UUID]:
+    """Decode a cursor produced by ``encode_cursor``; raises ValueError if malformed"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, id = base64.urlsafe_b64decode(padded.encode()).decode().split("|")
+        return datetime.fromisoformat(created_at), UUID(id)
+    except Exception:
+        raise ValueError("Invalid pagination cursor")
+
+
+def keyset_order(model):
+    """Stable ordering used by all keyset-paginated listings (newest first)"""
+    return (model.created_at.desc(), model.id.desc())
+
+
+def keyset_after(model, cursor: str):
+    """Filter clause selecting rows that sort after the cursor position"""
+    created_at, id = decode_cursor(cursor)
+    return tuple_(model.created_at, model.id) < tuple_(created_at, id)
+
+
+def split_page(rows: List, limit: int) -> Tuple[List, Optional[str]]:
+    """
+    Trim a ``limit + 1`` row fetch to one page and build the next cursor.
+
+    Fetching one extra row tells us whether another page exists without a
+    separate COUNT query.
+    """
+    if len(rows) <= limit:
+        return rows, None
+    page = rows[:limit]
+    last = page[-1]
+    return page, encode_cursor(last.created_at, last.id)
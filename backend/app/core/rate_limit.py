@@ -0,0 +1,274 @@
+"""
+Per-tenant, per-route request rate limiting.
+
+Every HTTP request is charged to a (tenant, route) key against two limits:
+a burst limit of ``RATE_LIMIT_PER_MINUTE`` and a sustained limit of
+``RATE_LIMIT_PER_HOUR`` (``RATE_LIMIT_AI_PER_MINUTE`` replaces the burst
+limit on ``/api/v1/ai`` routes). The tenant is that of the user behind the
+bearer token, verified through the token cache, so clients cannot pick the
+key they are charged to; requests without a valid token are keyed by the
+client address. The route is the matched path template, so ``/assets/{asset_id}`` is one
+key however many ids are requested.
+
+When Redis is reachable the limits are shared by all workers and enforced
+with sliding-window counters in a Lua script, one round trip per request.
+Otherwise each worker enforces them on its own with in-process token
+buckets. Rejected requests get 429 with ``Retry-After``; every limited
+response carries ``X-RateLimit-Limit``, ``X-RateLimit-Remaining`` and
+``X-RateLimit-Reset`` for the burst limit.
+"""
+import logging
+import math
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+from fastapi import HTTPException
+from starlette.routing import Match
+
+from app.core.config import settings
+from app.core.security import token_verifier
+
+logger = logging.getLogger(__name__)
+
+AI_ROUTE_PREFIX = "/api/v1/ai"
+
+# Distinct (method, path) pairs whose route template is remembered
+ROUTE_CACHE_SIZE = 10000
+
+# Checks every window's weighted count, then charges all windows only if
+# none is exhausted. KEYS: current and previous bucket per window.
+# ARGV: now, then (window, limit) per window.
+# Returns {allowed, retry_after_ms, remaining in the first window}.
+SLIDING_WINDOW_SCRIPT = """
+local now = tonumber(ARGV[1])
+local retry_ms = 0
+local remaining = -1
+for i = 0, #KEYS / 2 - 1 do
+    local window = tonumber(ARGV[2 + i * 2])
+    local limit = tonumber(ARGV[3 + i * 2])
+    local current = tonumber(redis.call('GET', KEYS[1 + i * 2]) or '0')
+    local previous = tonumber(redis.call('GET', KEYS[2 + i * 2]) or '0')
+    local elapsed = (now % window) / window
+    local estimate = previous * (1 - elapsed) + current
+    if remaining < 0 then
+        remaining = math.max(limit - estimate - 1, 0)
+    end
+    if estimate + 1 > limit then
+        local wait
+        if previous > 0 and current < limit then
+            -- time until the previous bucket's weight has dropped enough
+            wait = ((1 - (limit - current - 1) / previous) - elapsed) * window
+        else
+            wait = (1 - elapsed) * window
+        end
+        retry_ms = math.max(retry_ms, math.ceil(math.max(wait, 0.001) * 1000))
+    end
+end
+if retry_ms > 0 then
+    return {0, retry_ms, 0}
+end
+for i = 0, #KEYS / 2 - 1 do
+    local window = tonumber(ARGV[2 + i * 2])
+    redis.call('INCR', KEYS[1 + i * 2])
+    redis.call('EXPIRE', KEYS[1 + i * 2], window * 2)
+end
+return {1, 0, math.floor(remaining)}
+"""
+
+Limits = Tuple[Tuple[int, int], ...]  # (window seconds, requests) per window
+
+
+class TokenBuckets:
+    """In-process token buckets, one per window, for each key"""
+
+    def __init__(self, max_keys: int):
+        self.max_keys = max_keys
+        # key -> [last refill, tokens per window...]
+        self.buckets: "OrderedDict[Any, List[float]]" = OrderedDict()
+
+    def acquire(self, key: Any, limits: Limits, now: float) -> Tuple[bool, float, int]:
+        """Take one token from every bucket; returns (allowed, retry after, remaining)"""
+        state = self.buckets.get(key)
+        if state is None:
+            state = [now] + [float(limit) for _, limit in limits]
+            self.buckets[key] = state
+            if len(self.buckets) > self.max_keys:
+                # Forgetting a key only ever refills its buckets
+                self.buckets.popitem(last=False)
+        else:
+            self.buckets.move_to_end(key)
+
+        elapsed = now - state[0]
+        state[0] = now
+        retry_after = 0.0
+        for i, (window, limit) in enumerate(limits, 1):
+            rate = limit / window
+            tokens = min(state[i] + elapsed * rate, limit)
+            state[i] = tokens
+            if tokens < 1:
+                retry_after = max(retry_after, (1 - tokens) / rate)
+        if retry_after:
+            return False, retry_after, 0
+        for i in range(1, len(limits) + 1):
+            state[i] -= 1
+        return True, 0.0, int(state[1])
+
+
+class RateLimiter:
+    """Redis sliding-window counters with an in-process token bucket fallback"""
+
+    def __init__(self):
+        self.local = TokenBuckets(settings.RATE_LIMIT_LOCAL_MAX_KEYS)
+        self._redis = None
+        self._script = None
+        self.allowed = 0
+        self.limited = 0
+        self.errors = 0
+
+    async def connect(self):
+        """Share limits through Redis if it answers a ping"""
+        try:
+            import redis.asyncio as redis
+
+            client = redis.from_url(
+                settings.REDIS_URL,
+                db=settings.REDIS_DB,
+                socket_connect_timeout=1,
+                socket_timeout=settings.RATE_LIMIT_REDIS_TIMEOUT_MS / 1000
+            )
+            await client.ping()
+        except Exception as e:
+            logger.warning(f"Redis unavailable, rate limits are enforced per worker: {e}")
+            return
+        self._redis = client
+        self._script = client.register_script(SLIDING_WINDOW_SCRIPT)
+        logger.info("Rate limiter connected to Redis")
+
+    async def close(self):
+        if self._redis is not None:
+            await self._redis.close()
+            self._redis = None
+
+    async def acquire(self, key: Tuple[str, str], limits: Limits) -> Tuple[bool, float, int]:
+        now = time.time()
+        if self._redis is not None:
+            try:
+                return await self._acquire_shared(key, limits, now)
+            except Exception as e:
+                # Degrade to per-worker limits rather than failing requests
+                self.errors += 1
+                logger.warning(f"Redis rate limit check failed, using local buckets: {e}")
+        return self.local.acquire(key, limits, now)
+
+    async def _acquire_shared(self, key: Tuple[str, str], limits: Limits, now: float) -> Tuple[bool, float, int]:
+        tenant, route = key
+        keys, args = [], [now]
+        for window, limit in limits:
+            index = int(now // window)
+            base = f"ratelimit:{tenant}:{route}:{window}"
+            keys += [f"{base}:{index}", f"{base}:{index - 1}"]
+            args += [window, limit]
+        allowed, retry_ms, remaining = await self._script(keys=keys, args=args)
+        return bool(allowed), retry_ms / 1000, int(remaining)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "backend": "redis" if self._redis is not None else "local",
+            "allowed": self.allowed,
+            "limited": self.limited,
+            "errors": self.errors,
+            "local_keys": len(self.local.buckets),
+        }
+
+
+rate_limiter = RateLimiter()
+
+
+def _limits_for(route: str) -> Limits:
+    per_minute = settings.RATE_LIMIT_AI_PER_MINUTE if route.startswith(AI_ROUTE_PREFIX) else settings.RATE_LIMIT_PER_MINUTE
+    return ((60, per_minute), (3600, settings.RATE_LIMIT_PER_HOUR))
+
+
+async def _tenant(scope) -> str:
+    for name, value in scope["headers"]:
+        if name == b"authorization":
+            scheme, _, token = value.decode("latin-1").partition(" ")
+            if scheme.lower() == "bearer" and token:
+                try:
+                    user = await token_verifier.verify(token)
+                except HTTPException:
+                    # The route rejects the request; until then it counts against the address
+                    break
+                return f"tenant:{user.tenant_id}"
+            break
+    client = scope.get("client")
+    return f"ip:{client[0]}" if client else "anonymous"
+
+
+class RateLimitMiddleware:
+    """ASGI middleware enforcing the per-tenant, per-route limits"""
+
+    def __init__(self, app, router, limiter: RateLimiter = rate_limiter):
+        self.app = app
+        self.router = router
+        self.limiter = limiter
+        self.exempt = frozenset(settings.RATE_LIMIT_EXEMPT_PATHS)
+        self.routes: "OrderedDict[Tuple[str, str], str]" = OrderedDict()
+
+    def _route(self, scope) -> str:
+        """Path template of the route serving the request, cached per (method, path)"""
+        cache_key = (scope["method"], scope["path"])
+        route = self.routes.get(cache_key)
+        if route is not None:
+            return route
+        route = scope["path"]
+        for candidate in self.router.routes:
+            match, _ = candidate.matches(scope)
+            if match == Match.FULL:
+                route = getattr(candidate, "path_format", None) or getattr(candidate, "path", route)
+                break
+        self.routes[cache_key] = route
+        if len(self.routes) > ROUTE_CACHE_SIZE:
+            self.routes.popitem(last=False)
+        return route
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"] in self.exempt:
+            await self.app(scope, receive, send)
+            return
+
+        route = self._route(scope)
+        limits = _limits_for(route)
+        allowed, retry_after, remaining = await self.limiter.acquire((await _tenant(scope), route), limits)
+        window, limit = limits[0]
+        headers = [
+            (b"x-ratelimit-limit", str(limit).encode()),
+            (b"x-ratelimit-remaining", str(remaining).encode()),
+            (b"x-ratelimit-reset", str(int(time.time() + (retry_after or window))).encode()),
+        ]
+
+        if not allowed:
+            self.limiter.limited += 1
+            headers.append((b"retry-after", str(max(math.ceil(retry_after), 1)).encode()))
+            body = b'{"detail":"Rate limit exceeded"}'
+            await send({
+                "type": "http.response.start",
+                "status": 429,
+                "headers": [
+                    (b"content-type", b"application/json"),
+                    (b"content-length", str(len(body)).encode()),
+                    *headers,
+                ],
+            })
+            await send({"type": "http.response.body", "body": body})
+            return
+
+        self.limiter.allowed += 1
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                message["headers"] = list(message.get("headers", ())) + headers
+            await send(message)
+
+        await self.app(scope, receive, send_wrapper)
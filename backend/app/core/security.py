@@ -0,0 +1,306 @@
+"""
+Password hashing, access tokens and the authenticated-user dependency.
+
+Verifying a bearer token means checking its signature and expiry and then
+loading the user it names. ``get_current_user`` does that once per token:
+the resolved user is cached under the token's SHA-256 digest until the
+token expires, or for at most ``AUTH_CACHE_MAX_TTL_SECONDS`` so that role
+and deactivation changes still apply, and requests carrying a hot token
+cost one hash and one dictionary lookup.
+
+Logging out revokes the token. Its digest goes into a blocklist - a Bloom
+filter in front of an exact set - that keeps it only until the token would
+have expired anyway. Revocations are shared between workers through Redis
+and picked up every ``AUTH_REVOCATION_SYNC_SECONDS``; without Redis they
+apply to the worker that served the logout.
+
+``jose`` and ``passlib`` (and the ``cryptography`` stack behind them) are
+imported on first use rather than at startup; requests served from the
+cache never touch them.
+"""
+import asyncio
+import functools
+import hashlib
+import logging
+import math
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional
+
+from fastapi import Depends, HTTPException, status
+from fastapi.security import OAuth2PasswordBearer
+from pydantic import ValidationError
+
+from app.core.cache import LocalTTLCache
+from app.core.config import settings
+from app.schemas.auth import CurrentUser, TokenData
+
+logger = logging.getLogger(__name__)
+
+oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/v1/auth/login")
+
+ROLE_PERMISSIONS = {
+    "admin": ["read", "write", "admin"],
+    "operator": ["read", "write"],
+    "viewer": ["read"],
+    "citizen": ["read"],
+}
+
+# Sorted set of "<digest hex>:<expiry>" members scored by revocation time
+REVOKED_TOKENS_KEY = "civitasiq:revoked_tokens"
+
+
+@functools.lru_cache(maxsize=None)
+def _pwd_context():
+    from passlib.context import CryptContext
+
+    return CryptContext(schemes=["bcrypt"], deprecated="auto")
+
+
+def verify_password(plain_password: str, hashed_password: str) -> bool:
+    return _pwd_context().verify(plain_password, hashed_password)
+
+
+def get_password_hash(password: str) -> str:
+    return _pwd_context().hash(password)
+
+
+def create_access_token(data: Dict[str, Any], expires_delta: Optional[timedelta] = None) -> str:
+    """Sign an access token carrying ``data`` plus expiry and a unique id"""
+    from jose import jwt
+
+    now = datetime.now(timezone.utc)
+    claims = dict(data)
+    claims.update(
+        iat=now,
+        exp=now + (expires_delta or timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)),
+        jti=uuid.uuid4().hex,
+    )
+    return jwt.encode(claims, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
+
+
+def token_digest(token: str) -> bytes:
+    """Key under which a token is cached and revoked; the token itself is never stored"""
+    return hashlib.sha256(token.encode()).digest()
+
+
+def _unauthorized(detail: str) -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail=detail,
+        headers={"WWW-Authenticate": "Bearer"},
+    )
+
+
+class BloomFilter:
+    """Fixed-size Bloom filter over SHA-256 digests"""
+
+    def __init__(self, capacity: int, error_rate: float = 0.01):
+        self.size = max(int(-capacity * math.log(error_rate) / math.log(2) ** 2), 64)
+        self.hashes = max(round(self.size / max(capacity, 1) * math.log(2)), 1)
+        self.bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, digest: bytes) -> List[int]:
+        # Double hashing over two independent slices of the digest
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:16], "little") | 1
+        return [(h1 + i * h2) % self.size for i in range(self.hashes)]
+
+    def add(self, digest: bytes):
+        for position in self._positions(digest):
+            self.bits[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, digest: bytes) -> bool:
+        return all(self.bits[position >> 3] & (1 << (position & 7)) for position in self._positions(digest))
+
+
+class RevocationList:
+    """Revoked token digests, kept until the tokens expire"""
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self.bloom = BloomFilter(capacity)
+        self.expires: Dict[bytes, float] = {}
+        self.false_positives = 0
+
+    def __len__(self) -> int:
+        return len(self.expires)
+
+    def add(self, digest: bytes, expires_at: float):
+        if digest not in self.expires:
+            self.bloom.add(digest)
+        self.expires[digest] = expires_at
+        if len(self.expires) > self.capacity:
+            self.prune(time.time())
+
+    def __contains__(self, digest: bytes) -> bool:
+        # Almost every token is not revoked and is answered by the filter
+        if digest not in self.bloom:
+            return False
+        if digest in self.expires:
+            return True
+        self.false_positives += 1
+        return False
+
+    def prune(self, now: float):
+        """Forget tokens that have expired and rebuild the filter"""
+        self.expires = {digest: expires_at for digest, expires_at in self.expires.items() if expires_at > now}
+        # Grow rather than let the false positive rate climb
+        self.capacity = max(self.capacity, len(self.expires) * 2)
+        self.bloom = BloomFilter(self.capacity)
+        for digest in self.expires:
+            self.bloom.add(digest)
+
+
+class TokenVerifier:
+    """Verifies bearer tokens, caching the resolved user until the token expires"""
+
+    def __init__(self):
+        self.cache = LocalTTLCache(settings.AUTH_CACHE_MAX_ENTRIES, settings.AUTH_CACHE_MAX_TTL_SECONDS)
+        self.revoked = RevocationList(settings.AUTH_REVOCATION_CAPACITY)
+        self._redis = None
+        self._synced_at = 0.0
+        self.verified = 0
+        self.rejected = 0
+
+    async def connect(self):
+        """Share revocations through Redis if it answers a ping"""
+        try:
+            import redis.asyncio as redis
+
+            client = redis.from_url(
+                settings.REDIS_URL,
+                db=settings.REDIS_DB,
+                decode_responses=True,
+                socket_connect_timeout=1
+            )
+            await client.ping()
+        except Exception as e:
+            logger.warning(f"Redis unavailable, token revocations apply per worker: {e}")
+            return
+        self._redis = client
+        await self.sync()
+
+    async def close(self):
+        if self._redis is not None:
+            await self._redis.close()
+            self._redis = None
+
+    async def verify(self, token: str) -> CurrentUser:
+        digest = token_digest(token)
+        if settings.AUTH_CACHE_ENABLED:
+            user = self.cache.get(digest)
+            if user is not None:
+                return user
+        from jose import ExpiredSignatureError, JWTError, jwt
+
+        if digest in self.revoked:
+            self.rejected += 1
+            raise _unauthorized("Token has been revoked")
+        try:
+            claims = TokenData(**jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM]))
+        except ExpiredSignatureError:
+            self.rejected += 1
+            raise _unauthorized("Token has expired")
+        except (JWTError, ValidationError):
+            self.rejected += 1
+            raise _unauthorized("Could not validate credentials")
+
+        user = await self._load_user(claims.sub)
+        if user is None:
+            self.rejected += 1
+            raise _unauthorized("Could not validate credentials")
+        self.verified += 1
+
+        ttl = min(claims.exp - time.time(), settings.AUTH_CACHE_MAX_TTL_SECONDS)
+        # A logout may have landed while the user was loading
+        if settings.AUTH_CACHE_ENABLED and ttl > 0 and digest not in self.revoked:
+            self.cache.set(digest, user, ttl)
+        return user
+
+    async def _load_user(self, subject: str) -> Optional[CurrentUser]:
+        from app.core.database import AsyncSessionLocal
+        from app.models.user import User
+
+        try:
+            user_id = uuid.UUID(subject)
+        except ValueError:
+            return None
+        async with AsyncSessionLocal() as db:
+            user = await db.get(User, user_id)
+        if user is None or not user.is_active:
+            return None
+        return CurrentUser(
+            id=user.id,
+            email=user.email,
+            name=user.name,
+            role=user.role,
+            tenant_id=user.tenant_id,
+            permissions=ROLE_PERMISSIONS.get(user.role, [])
+        )
+
+    async def revoke(self, token: str):
+        """Block a token for the rest of its lifetime"""
+        from jose import JWTError, jwt
+
+        digest = token_digest(token)
+        try:
+            expires_at = float(jwt.get_unverified_claims(token)["exp"])
+        except (JWTError, KeyError, TypeError, ValueError):
+            expires_at = time.time() + settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60
+        self.revoked.add(digest, expires_at)
+        self.cache.delete(digest)
+        if self._redis is None:
+            return
+        try:
+            await self._redis.zadd(REVOKED_TOKENS_KEY, {f"{digest.hex()}:{int(expires_at)}": time.time()})
+        except Exception as e:
+            logger.warning(f"Failed to share token revocation: {e}")
+
+    async def sync(self):
+        """Apply revocations made by other workers and forget expired ones"""
+        now = time.time()
+        if self._redis is not None:
+            # Overlap the previous read so that revocations stamped by
+            # slightly slower clocks are not missed; re-adding is harmless
+            since = self._synced_at - max(settings.AUTH_REVOCATION_SYNC_SECONDS, 1)
+            members = await self._redis.zrangebyscore(REVOKED_TOKENS_KEY, since, "+inf")
+            for member in members:
+                digest_hex, expires_at = member.split(":")
+                digest = bytes.fromhex(digest_hex)
+                self.revoked.add(digest, float(expires_at))
+                self.cache.delete(digest)
+            self._synced_at = now
+            await self._redis.zremrangebyscore(
+                REVOKED_TOKENS_KEY, "-inf", now - settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60
+            )
+        self.revoked.prune(now)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "cache": self.cache.stats(),
+            "verified": self.verified,
+            "rejected": self.rejected,
+            "revoked": len(self.revoked),
+            "revocation_false_positives": self.revoked.false_positives,
+            "shared": self._redis is not None,
+        }
+
+
+token_verifier = TokenVerifier()
+
+
+async def get_current_user(token: str = Depends(oauth2_scheme)) -> CurrentUser:
+    """Dependency resolving the bearer token to the authenticated user"""
+    return await token_verifier.verify(token)
+
+
+async def run_revocation_sync_loop():
+    """Periodically pull revocations from other workers"""
+    while True:
+        await asyncio.sleep(settings.AUTH_REVOCATION_SYNC_SECONDS)
+        try:
+            await token_verifier.sync()
+        except Exception as e:
+            logger.error(f"Token revocation sync failed: {e}")
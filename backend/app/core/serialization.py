@@ -0,0 +1,101 @@
+"""
+Fast-path JSON serialization for list endpoints.
+
+Building a Pydantic model per ORM row and then letting FastAPI validate and
+encode the whole page again dominates CPU time on large pages. A
+``RowSerializer`` instead reads the response schema's fields straight off
+each row into plain dicts, and ``json_response`` encodes the page once with
+orjson. The output matches what the response models produce; endpoints keep
+their ``response_model`` for the OpenAPI schema.
+"""
+import struct
+from typing import Any, Dict, Iterable, List, Optional, Type
+
+import orjson
+from fastapi.responses import Response
+from geoalchemy2.elements import WKBElement
+from geoalchemy2.shape import to_shape
+from pydantic import BaseModel
+from sqlalchemy import inspect
+
+
+# EWKB geometry type flags
+EWKB_SRID = 0x20000000
+EWKB_FLAGS = 0xE0000000
+WKB_POINT = 1
+
+
+def geo_point(value: Any) -> Any:
+    """GeoJSON point for a geography value read from the database"""
+    if not isinstance(value, WKBElement):
+        return value
+    data = value.data
+    if isinstance(data, str):
+        data = bytes.fromhex(data)
+    order = "<" if data[0] == 1 else ">"
+    (geometry_type,) = struct.unpack_from(order + "I", data, 1)
+    if geometry_type & ~EWKB_SRID != WKB_POINT:
+        # Not a plain 2D point: let shapely decode it
+        point = to_shape(value)
+        return {"type": "Point", "coordinates": [float(point.x), float(point.y)]}
+    offset = 9 if geometry_type & EWKB_SRID else 5
+    lng, lat = struct.unpack_from(order + "dd", data, offset)
+    return {"type": "Point", "coordinates": [lng, lat]}
+
+
+class RowSerializer:
+    """
+    Turns ORM rows into dicts shaped like ``schema``.
+
+    ``converters`` maps field names to functions applied to the raw
+    attribute value; ``relations`` maps relationship fields to the
+    serializer of the related schema. Relationships that were not loaded are
+    emitted as None, never lazy-loaded.
+    """
+
+    def __init__(
+        self,
+        schema: Type[BaseModel],
+        converters: Optional[Dict[str, Any]] = None,
+        relations: Optional[Dict[str, "RowSerializer"]] = None
+    ):
+        self.converters = converters or {}
+        self.relations = relations or {}
+        # Keys are emitted in schema field order, like the response model
+        self.fields = list(schema.model_fields)
+        self.plain = not self.converters and not self.relations
+
+    def __call__(self, row: Any) -> Dict[str, Any]:
+        if self.plain:
+            return {name: getattr(row, name) for name in self.fields}
+        unloaded = inspect(row).unloaded if self.relations else ()
+        data = {}
+        for name in self.fields:
+            serializer = self.relations.get(name)
+            if serializer is not None:
+                data[name] = None if name in unloaded else self._related(serializer, getattr(row, name))
+                continue
+            value = getattr(row, name)
+            convert = self.converters.get(name)
+            data[name] = convert(value) if convert is not None else value
+        return data
+
+    @staticmethod
+    def _related(serializer: "RowSerializer", value: Any) -> Any:
+        if value is None:
+            return None
+        if isinstance(value, (list, tuple, set)):
+            return serializer.many(value)
+        return serializer(value)
+
+    def many(self, rows: Iterable[Any]) -> List[Dict[str, Any]]:
+        return [self(row) for row in rows]
+
+
+def json_response(content: Any, status_code: int = 200) -> Response:
+    """Encode ``content`` with orjson, bypassing response model validation"""
+    return Response(
+        content=orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS),
+        status_code=status_code,
+        media_type="application/json"
+    )
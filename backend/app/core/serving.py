@@ -0,0 +1,250 @@
+"""
+Multi-process serving.
+
+With ``WORKERS`` greater than one, ``python main.py`` runs a supervisor that
+binds the listening socket, warms everything that can be shared and then
+forks the workers, which all accept from the same socket:
+
+* before forking, the supervisor creates or checks the schema once (so
+  workers never race ``create_all``), builds the middleware stack and the
+  OpenAPI document, imports the modules workers would otherwise load on
+  first use, and freezes the garbage collector so the inherited objects
+  stay in pages shared with the workers;
+* each worker then runs the application lifespan, which primes its own
+  connection pool and loads its in-process caches, and only starts
+  accepting connections once that is done.
+
+``SIGHUP`` replaces the workers one at a time: a new worker is forked and
+must finish starting up before the old one is asked to stop, and the old
+one finishes its in-flight requests (up to ``WORKER_GRACEFUL_TIMEOUT``).
+Workers that die are replaced. ``SIGTERM``/``SIGINT`` stop every worker
+gracefully and then the supervisor.
+
+Connection pools, caches and counters are per worker: the database sees up
+to ``WORKERS * (DATABASE_POOL_SIZE + DATABASE_MAX_OVERFLOW)`` connections.
+
+Jobs that work on shared data (cold storage compaction and forecast
+precompute) run only in the worker holding an exclusive ``flock`` on
+``WORKER_LEADER_LOCK_PATH``; when that worker exits, another one takes the
+lock over within ``LEADER_RETRY_SECONDS``. Jobs that refresh a worker's own
+state (telemetry log normalizing, revocation sync, spatial index and zone
+refreshes, counter reconciles, alert group flushes) run in every worker.
+The lock is per host, so with several hosts the leader jobs should be
+enabled on one of them only.
+"""
+import asyncio
+import fcntl
+import gc
+import logging
+import multiprocessing
+import os
+import signal
+import time
+from pathlib import Path
+from typing import Awaitable, Callable, List, Optional
+
+import uvicorn
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Forking is what lets workers inherit the warmed-up supervisor
+_context = multiprocessing.get_context("fork")
+
+# Minimum time between replacing crashed workers
+RESPAWN_BACKOFF_SECONDS = 1.0
+
+# How often workers that are not the leader try to take the leader lock
+LEADER_RETRY_SECONDS = 5.0
+
+
+class LeaderLock:
+    """Exclusive ``flock`` electing the one worker that runs the leader jobs"""
+
+    def __init__(self, path: str):
+        self.path = Path(path)
+        self._fd: Optional[int] = None
+
+    @property
+    def held(self) -> bool:
+        return self._fd is not None
+
+    def acquire(self) -> bool:
+        """Take the lock without blocking; returns whether this process holds it"""
+        if self._fd is not None:
+            return True
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            os.close(fd)
+            return False
+        self._fd = fd
+        return True
+
+    def release(self):
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+
+
+leader_lock = LeaderLock(settings.WORKER_LEADER_LOCK_PATH)
+
+
+async def run_leader_jobs(jobs: List[Callable[[], Awaitable[None]]]):
+    """Wait until this worker holds the leader lock, then run ``jobs`` until cancelled"""
+    while not leader_lock.acquire():
+        await asyncio.sleep(LEADER_RETRY_SECONDS)
+    logger.info(f"Worker {os.getpid()} is the leader, running {len(jobs)} cluster jobs")
+    try:
+        await asyncio.gather(*(job() for job in jobs))
+    finally:
+        leader_lock.release()
+
+
+class WorkerServer(uvicorn.Server):
+    """uvicorn server that reports when it has started accepting connections"""
+
+    def __init__(self, config: uvicorn.Config, ready):
+        super().__init__(config)
+        self.ready = ready
+
+    async def startup(self, sockets=None):
+        await super().startup(sockets=sockets)
+        if not self.should_exit:
+            self.ready.set()
+
+
+def _run_worker(config: uvicorn.Config, sockets, ready):
+    # Undo the supervisor's handlers; uvicorn installs its own
+    for sig in (signal.SIGHUP, signal.SIGTERM, signal.SIGINT):
+        signal.signal(sig, signal.SIG_DFL)
+    WorkerServer(config, ready).run(sockets=sockets)
+
+
+class Worker:
+    def __init__(self, config: uvicorn.Config, sockets):
+        self.ready = _context.Event()
+        self.process = _context.Process(target=_run_worker, args=(config, sockets, self.ready), name="civitasiq-worker")
+        self.process.start()
+
+    @property
+    def pid(self) -> Optional[int]:
+        return self.process.pid
+
+    def stop(self):
+        """Ask the worker to finish in-flight requests and exit"""
+        if self.process.is_alive():
+            os.kill(self.process.pid, signal.SIGTERM)
+
+    def join(self, timeout: float):
+        self.process.join(timeout)
+        if self.process.is_alive():
+            logger.warning(f"Worker {self.pid} did not stop within {timeout}s, killing it")
+            self.process.kill()
+            self.process.join()
+
+
+def prewarm(app):
+    """Work done once in the supervisor so that every forked worker inherits it"""
+    from app.core.database import async_engine, engine, init_db
+    from app.core.security import _pwd_context
+
+    async def prepare_schema():
+        await init_db()
+        # Connections must not cross the fork
+        await async_engine.dispose()
+
+    asyncio.run(prepare_schema())
+    engine.dispose()
+
+    app.openapi()
+    app.middleware_stack = app.build_middleware_stack()
+    # Loaded on first use in a single process; shared here
+    _pwd_context()
+    import jose.jwt  # noqa: F401
+
+    gc.collect()
+    gc.freeze()
+
+
+class Supervisor:
+    """Forks and supervises ``workers`` uvicorn worker processes"""
+
+    def __init__(self, config: uvicorn.Config, workers: int):
+        self.config = config
+        self.count = workers
+        self.sockets = []
+        self.workers: List[Worker] = []
+        self.should_exit = False
+        self.should_restart = False
+
+    def _handle_exit(self, sig, frame):
+        self.should_exit = True
+
+    def _handle_restart(self, sig, frame):
+        self.should_restart = True
+
+    def run(self):
+        self.config.load()
+        self.sockets = [self.config.bind_socket()]
+        prewarm(self.config.app)
+        signal.signal(signal.SIGTERM, self._handle_exit)
+        signal.signal(signal.SIGINT, self._handle_exit)
+        signal.signal(signal.SIGHUP, self._handle_restart)
+
+        logger.info(f"Starting {self.count} workers on {self.config.host}:{self.config.port} (supervisor {os.getpid()})")
+        self.workers = [Worker(self.config, self.sockets) for _ in range(self.count)]
+        last_respawn = 0.0
+        while not self.should_exit:
+            time.sleep(0.2)
+            if self.should_restart:
+                self.should_restart = False
+                self.restart()
+            for index, worker in enumerate(self.workers):
+                if worker.process.is_alive() or self.should_exit:
+                    continue
+                if time.monotonic() - last_respawn < RESPAWN_BACKOFF_SECONDS:
+                    break
+                logger.error(f"Worker {worker.pid} exited with code {worker.process.exitcode}, replacing it")
+                last_respawn = time.monotonic()
+                self.workers[index] = Worker(self.config, self.sockets)
+
+        logger.info("Stopping workers")
+        for worker in self.workers:
+            worker.stop()
+        for worker in self.workers:
+            worker.join(settings.WORKER_GRACEFUL_TIMEOUT)
+        for sock in self.sockets:
+            sock.close()
+
+    def restart(self):
+        """Replace workers one at a time, each only once its successor is ready"""
+        logger.info("Rolling restart of workers")
+        for index, old in enumerate(list(self.workers)):
+            new = Worker(self.config, self.sockets)
+            if not new.ready.wait(settings.WORKER_STARTUP_TIMEOUT):
+                logger.error(f"Replacement worker {new.pid} did not become ready, aborting restart")
+                new.stop()
+                new.join(settings.WORKER_GRACEFUL_TIMEOUT)
+                return
+            self.workers[index] = new
+            old.stop()
+            old.join(settings.WORKER_GRACEFUL_TIMEOUT)
+            if self.should_exit:
+                return
+        logger.info("Rolling restart complete")
+
+
+def serve(app, workers: Optional[int] = None):
+    """Serve ``app`` with ``workers`` forked worker processes"""
+    config = uvicorn.Config(
+        app,
+        host=settings.HOST,
+        port=settings.PORT,
+        log_level="info",
+        timeout_graceful_shutdown=settings.WORKER_GRACEFUL_TIMEOUT
+    )
+    Supervisor(config, workers or settings.WORKERS).run()
@@ -6,6 +6,9 @@ from .incident import Incident
 from .telemetry import TelemetryData
 from .alert import Alert
 from .recommendation import AIRecommendation
+from .zone import Zone
+from .metric import MetricDefinition
+from .rollup import TelemetryRollup
 
 __all__ = [
     'User',
@@ -14,5 +17,8 @@ __all__ = [
     'Incident',
     'TelemetryData',
     'Alert',
-    'AIRecommendation'
+    'AIRecommendation',
+    'Zone',
+    'MetricDefinition',
+    'TelemetryRollup'
 ]
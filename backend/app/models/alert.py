@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Text, ForeignKey, Boolean, DateTime
+from sqlalchemy import Column, String, Text, ForeignKey, Boolean, DateTime, Integer, JSON
 from sqlalchemy.orm import relationship
 from sqlalchemy.dialects.postgresql import UUID
 from geoalchemy2 import Geography
@@ -17,6 +17,8 @@ class Alert(Base, TimestampMixin):
     acknowledged = Column(Boolean, default=False)
     acknowledged_by = Column(UUID(as_uuid=True), ForeignKey('users.id'))
     acknowledged_at = Column(DateTime(timezone=True))
+    member_count = Column(Integer, nullable=False, default=1, server_default="1")  # Alerts folded into this one
+    members = Column(JSON, default=[])  # Summaries of the folded alerts (capped)
     
     # Relationships
     acknowledged_by_user = relationship("User", back_populates="alerts_acknowledged")
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, JSON, ForeignKey
+from sqlalchemy import Column, Index, String, JSON, ForeignKey
 from sqlalchemy.orm import relationship
 from sqlalchemy.dialects.postgresql import UUID
 from geoalchemy2 import Geography
@@ -7,6 +7,10 @@ import uuid
 
 class Asset(Base, TimestampMixin):
     __tablename__ = "assets"
+    __table_args__ = (
+        # Supports keyset pagination ordered by (created_at, id)
+        Index("ix_assets_created_at_id", "created_at", "id"),
+    )
     
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     type = Column(String(100), nullable=False, index=True)  # traffic_signal, air_quality_sensor, etc.
@@ -0,0 +1,17 @@
+from sqlalchemy import Column, Integer, String, SmallInteger, UniqueConstraint
+from .base import Base
+
+class MetricDefinition(Base):
+    __tablename__ = "metric_catalog"
+    __table_args__ = (
+        UniqueConstraint("asset_type", "name", name="uq_metric_catalog_asset_type_name"),
+    )
+    
+    # Stored as uint16 in telemetry rows; SQLite only autoincrements INTEGER keys
+    id = Column(SmallInteger().with_variant(Integer, "sqlite"), primary_key=True, autoincrement=True)
+    asset_type = Column(String(100), nullable=False)
+    name = Column(String(100), nullable=False)
+    unit = Column(String(32))
+    
+    def __repr__(self):
+        return f"<MetricDefinition(id={self.id}, asset_type='{self.asset_type}', name='{self.name}')>"
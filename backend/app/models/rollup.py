@@ -0,0 +1,21 @@
+from sqlalchemy import Column, Integer, SmallInteger, Float, ForeignKey, DateTime
+from sqlalchemy.dialects.postgresql import UUID
+from .base import Base
+
+class TelemetryRollup(Base):
+    __tablename__ = "telemetry_rollups"
+    
+    # Primary key order serves per-asset, per-metric range scans at one resolution
+    asset_id = Column(UUID(as_uuid=True), ForeignKey('assets.id', ondelete='CASCADE'), primary_key=True)
+    metric_id = Column(SmallInteger, ForeignKey('metric_catalog.id'), primary_key=True)
+    resolution = Column(Integer, primary_key=True)  # Bucket width in seconds
+    bucket = Column(DateTime(timezone=True), primary_key=True)  # Bucket start
+    count = Column(Integer, nullable=False)
+    sum = Column(Float, nullable=False)
+    min = Column(Float, nullable=False)
+    max = Column(Float, nullable=False)
+    last = Column(Float, nullable=False)
+    last_at = Column(DateTime(timezone=True), nullable=False)  # Timestamp of the last reading
+    
+    def __repr__(self):
+        return f"<TelemetryRollup(asset_id={self.asset_id}, metric_id={self.metric_id}, resolution={self.resolution}, bucket='{self.bucket}')>"
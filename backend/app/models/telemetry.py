@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, JSON, ForeignKey, DateTime
+from sqlalchemy import Column, String, JSON, ForeignKey, DateTime, Index, LargeBinary
 from sqlalchemy.orm import relationship
 from sqlalchemy.dialects.postgresql import UUID
 from geoalchemy2 import Geography
@@ -7,11 +7,18 @@ import uuid
 
 class TelemetryData(Base):
     __tablename__ = "telemetry_data"
+    __table_args__ = (
+        # Serves per-asset time-range scans
+        Index("ix_telemetry_data_asset_id_timestamp", "asset_id", "timestamp"),
+    )
     
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     asset_id = Column(UUID(as_uuid=True), ForeignKey('assets.id'), nullable=False, index=True)
     timestamp = Column(DateTime(timezone=True), nullable=False, index=True)
-    metrics = Column(JSON, nullable=False)  # Store sensor readings as JSON
+    # Readings as parallel arrays: uint16 metric catalog ids and float32 values
+    metric_ids = Column(LargeBinary)
+    metric_values = Column(LargeBinary)
+    metrics = Column(JSON)  # Rows not yet migrated to metric_ids/metric_values
     location = Column(Geography('POINT', srid=4326))  # Optional, can be different from asset location
     tags = Column(JSON, default={})  # Additional metadata
     
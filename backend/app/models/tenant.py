@@ -17,6 +17,7 @@ class Tenant(Base, TimestampMixin):
     users = relationship("User", back_populates="tenant")
     assets = relationship("Asset", back_populates="tenant")
     incidents = relationship("Incident", back_populates="tenant")
+    zones = relationship("Zone", back_populates="tenant")
     
     def __repr__(self):
         return f"<Tenant(id={self.id}, name='{self.name}', domain='{self.domain}')>"
@@ -0,0 +1,21 @@
+from sqlalchemy import Column, String, JSON, ForeignKey
+from sqlalchemy.orm import relationship
+from sqlalchemy.dialects.postgresql import UUID
+from geoalchemy2 import Geography
+from .base import Base, TimestampMixin
+import uuid
+
+class Zone(Base, TimestampMixin):
+    __tablename__ = "zones"
+    
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    name = Column(String(255), nullable=False)
+    boundary = Column(Geography('GEOMETRY', srid=4326), nullable=False)  # Polygon or MultiPolygon
+    properties = Column(JSON, default={})
+    tenant_id = Column(UUID(as_uuid=True), ForeignKey('tenants.id'), nullable=False, index=True)
+    
+    # Relationships
+    tenant = relationship("Tenant", back_populates="zones")
+    
+    def __repr__(self):
+        return f"<Zone(id={self.id}, name='{self.name}')>"
@@ -1,18 +1,24 @@
 # Import all schemas
+from .auth import Token, TokenData, UserLogin, CurrentUser
 from .user import UserCreate, UserUpdate, UserResponse, UserList
 from .tenant import TenantCreate, TenantUpdate, TenantResponse
-from .asset import AssetCreate, AssetUpdate, AssetResponse, AssetList
+from .asset import AssetCreate, AssetUpdate, AssetResponse, AssetList, AssetLocationList
 from .incident import IncidentCreate, IncidentUpdate, IncidentResponse, IncidentList
-from .telemetry import TelemetryDataCreate, TelemetryDataResponse
+from .telemetry import TelemetryDataCreate, TelemetryDataResponse, TelemetryBatchResult, TelemetryQueryResponse, MetricDefinitionResponse
 from .alert import AlertCreate, AlertUpdate, AlertResponse, AlertList
 from .recommendation import RecommendationCreate, RecommendationUpdate, RecommendationResponse
+from .ai import ForecastRequest, ForecastResponse
+from .zone import ZoneCreate, ZoneUpdate, ZoneResponse, ZoneList
 
 __all__ = [
+    'Token', 'TokenData', 'UserLogin', 'CurrentUser',
     'UserCreate', 'UserUpdate', 'UserResponse', 'UserList',
     'TenantCreate', 'TenantUpdate', 'TenantResponse',
-    'AssetCreate', 'AssetUpdate', 'AssetResponse', 'AssetList',
+    'AssetCreate', 'AssetUpdate', 'AssetResponse', 'AssetList', 'AssetLocationList',
     'IncidentCreate', 'IncidentUpdate', 'IncidentResponse', 'IncidentList',
-    'TelemetryDataCreate', 'TelemetryDataResponse',
+    'TelemetryDataCreate', 'TelemetryDataResponse', 'TelemetryBatchResult', 'TelemetryQueryResponse', 'MetricDefinitionResponse',
     'AlertCreate', 'AlertUpdate', 'AlertResponse', 'AlertList',
-    'RecommendationCreate', 'RecommendationUpdate', 'RecommendationResponse'
+    'RecommendationCreate', 'RecommendationUpdate', 'RecommendationResponse',
+    'ForecastRequest', 'ForecastResponse',
+    'ZoneCreate', 'ZoneUpdate', 'ZoneResponse', 'ZoneList'
 ]
@@ -0,0 +1,34 @@
+from pydantic import BaseModel, Field
+from typing import Optional, Dict, List
+from datetime import datetime
+from uuid import UUID
+
+class ForecastRequest(BaseModel):
+    metric: str = Field(..., min_length=1)
+    forecast_horizon: str = Field("24h", pattern=r"^\d+[hd]$")
+    asset_ids: Optional[List[UUID]] = None
+    tenant_id: Optional[UUID] = None
+    asset_type: Optional[str] = None
+    location: Optional[str] = None  # Zone
+    model: str = Field("auto", pattern="^(auto|seasonal_naive|ets|prophet)$")
+    include_confidence: bool = True
+
+class SeriesForecast(BaseModel):
+    model_type: str
+    values: List[float]
+    confidence_lower: Optional[List[float]] = None
+    confidence_upper: Optional[List[float]] = None
+
+class ForecastModelInfo(BaseModel):
+    step_seconds: int
+    last_trained: datetime  # Data watermark the forecasts were computed at
+    series: int
+    missing: List[UUID]  # Requested assets without data in the history window
+
+class ForecastResponse(BaseModel):
+    forecast_id: UUID
+    metric: str
+    forecast_horizon: str
+    timestamps: List[datetime]
+    forecasts: Dict[UUID, SeriesForecast]
+    model_info: ForecastModelInfo
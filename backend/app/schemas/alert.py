@@ -32,6 +32,8 @@ class AlertResponse(AlertBase, BaseSchema):
     acknowledged: bool
     acknowledged_by: Optional[UUID] = None
     acknowledged_at: Optional[datetime] = None
+    member_count: int = 1
+    members: list[Dict[str, Any]] = []
     created_at: datetime
     updated_at: Optional[datetime] = None
 
@@ -1,12 +1,19 @@
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, model_validator
 from typing import Optional, Dict, Any
 from datetime import datetime
 from uuid import UUID
+from app.core.serialization import geo_point
 from .base import BaseSchema
 
 class GeoPoint(BaseModel):
     type: str = "Point"
     coordinates: list[float] = Field(..., min_items=2, max_items=2)
+    
+    @model_validator(mode="before")
+    @classmethod
+    def _from_geography(cls, data):
+        """Accept geography values read from the database"""
+        return geo_point(data)
 
 class AssetBase(BaseModel):
     type: str = Field(..., min_length=1, max_length=100)
@@ -25,15 +32,36 @@ class AssetUpdate(BaseModel):
     properties: Optional[Dict[str, Any]] = None
     status: Optional[str] = Field(None, regex="^(active|inactive|maintenance|error)$")
 
+class AssetIncidentSummary(BaseSchema):
+    id: UUID
+    title: str
+    type: str
+    severity: str
+    status: str
+    created_at: datetime
+
 class AssetResponse(AssetBase, BaseSchema):
     id: UUID
     tenant_id: UUID
     created_at: datetime
     updated_at: Optional[datetime] = None
+    # Related data, populated only when requested through ``?include=``
+    incidents: Optional[list[AssetIncidentSummary]] = None
 
 class AssetList(BaseSchema):
     assets: list[AssetResponse]
-    total: int
-    page: int
+    total: Optional[int] = None
+    page: Optional[int] = None
     per_page: int
-    total_pages: int
+    total_pages: Optional[int] = None
+    next_cursor: Optional[str] = None
+
+class AssetLocation(BaseModel):
+    id: UUID
+    lng: float
+    lat: float
+    distance_m: Optional[float] = None
+
+class AssetLocationList(BaseModel):
+    assets: list[AssetLocation]
+    count: int
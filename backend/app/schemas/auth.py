@@ -0,0 +1,29 @@
+from pydantic import BaseModel, EmailStr, Field
+from typing import List, Optional
+from uuid import UUID
+from .base import BaseSchema
+
+class Token(BaseModel):
+    access_token: str
+    token_type: str = "bearer"
+    expires_in: int
+
+class TokenData(BaseModel):
+    """Claims carried by an access token"""
+    sub: str
+    exp: int
+    tenant_id: Optional[UUID] = None
+    role: Optional[str] = None
+
+class UserLogin(BaseModel):
+    email: EmailStr
+    password: str = Field(..., min_length=8)
+
+class CurrentUser(BaseSchema):
+    """The authenticated user, as resolved from an access token"""
+    id: UUID
+    email: str
+    name: str
+    role: str
+    tenant_id: UUID
+    permissions: List[str] = []
@@ -1,4 +1,5 @@
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, model_validator
+from sqlalchemy import inspect
 from typing import Optional, Dict, Any
 from datetime import datetime
 from uuid import UUID
@@ -11,6 +12,25 @@ class BaseSchema(BaseModel):
             datetime: lambda v: v.isoformat(),
             UUID: lambda v: str(v)
         }
+    
+    @model_validator(mode="before")
+    @classmethod
+    def _skip_unloaded_relationships(cls, data: Any) -> Any:
+        """
+        Read ORM objects without triggering lazy loads: relationships that
+        were not eagerly loaded are left to the field default (None).
+        """
+        state = inspect(data, raiseerr=False)
+        if state is None or not hasattr(state, "unloaded"):
+            return data
+        skipped = state.unloaded.intersection(state.mapper.relationships.keys())
+        if not skipped:
+            return data
+        return {
+            name: getattr(data, name)
+            for name in cls.model_fields
+            if name not in skipped and hasattr(data, name)
+        }
 
 class PaginationParams(BaseModel):
     """Pagination parameters for list endpoints"""
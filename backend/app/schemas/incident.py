@@ -1,12 +1,20 @@
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, model_validator
 from typing import Optional, List, Dict, Any
 from datetime import datetime
 from uuid import UUID
+from app.core.serialization import geo_point
 from .base import BaseSchema
+from .recommendation import RecommendationResponse
 
 class GeoPoint(BaseModel):
     type: str = "Point"
     coordinates: List[float] = Field(..., min_items=2, max_items=2)
+    
+    @model_validator(mode="before")
+    @classmethod
+    def _from_geography(cls, data):
+        """Accept geography values read from the database"""
+        return geo_point(data)
 
 class IncidentBase(BaseModel):
     title: str = Field(..., min_length=1, max_length=255)
@@ -33,6 +41,18 @@ class IncidentUpdate(BaseModel):
     tags: Optional[List[str]] = None
     metadata: Optional[Dict[str, Any]] = None
 
+class IncidentAssetSummary(BaseSchema):
+    id: UUID
+    type: str
+    name: str
+    status: str
+
+class IncidentUserSummary(BaseSchema):
+    id: UUID
+    name: str
+    email: str
+    role: str
+
 class IncidentResponse(IncidentBase, BaseSchema):
     id: UUID
     status: str
@@ -42,10 +62,15 @@ class IncidentResponse(IncidentBase, BaseSchema):
     tenant_id: UUID
     created_at: datetime
     updated_at: Optional[datetime] = None
+    # Related data, populated only when requested through ``?include=``
+    assets: Optional[List[IncidentAssetSummary]] = None
+    recommendations: Optional[List[RecommendationResponse]] = None
+    assigned_user: Optional[IncidentUserSummary] = None
 
 class IncidentList(BaseSchema):
     incidents: List[IncidentResponse]
-    total: int
-    page: int
+    total: Optional[int] = None
+    page: Optional[int] = None
     per_page: int
-    total_pages: int
+    total_pages: Optional[int] = None
+    next_cursor: Optional[str] = None
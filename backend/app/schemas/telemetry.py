@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List
 from datetime import datetime
 from uuid import UUID
 from .base import BaseSchema
@@ -20,3 +20,36 @@ class TelemetryDataCreate(TelemetryDataBase):
 
 class TelemetryDataResponse(TelemetryDataBase, BaseSchema):
     id: UUID
+
+class MetricDefinitionResponse(BaseSchema):
+    id: int
+    asset_type: str
+    name: str
+    unit: Optional[str] = None
+
+class TelemetryRejection(BaseModel):
+    index: int
+    error: str
+
+class TelemetryBatchResult(BaseModel):
+    accepted: int
+    rejected: int
+    errors: List[TelemetryRejection] = Field(default_factory=list)
+    elapsed_ms: float
+
+class DownsampledSeries(BaseModel):
+    t: List[int]  # Epoch milliseconds
+    min: Optional[List[float]] = None
+    max: Optional[List[float]] = None
+    avg: Optional[List[float]] = None
+    count: Optional[List[int]] = None
+    v: Optional[List[float]] = None
+
+class TelemetryQueryResponse(BaseModel):
+    asset_id: UUID
+    start: datetime
+    end: datetime
+    mode: str
+    points: int
+    source_points: int
+    series: Dict[str, DownsampledSeries]
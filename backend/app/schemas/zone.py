@@ -0,0 +1,43 @@
+from pydantic import BaseModel, Field, model_validator
+from typing import Optional, Dict, Any, List
+from datetime import datetime
+from uuid import UUID
+from geoalchemy2.elements import WKBElement
+from geoalchemy2.shape import to_shape
+from shapely.geometry import mapping
+from .base import BaseSchema
+
+class GeoPolygon(BaseModel):
+    type: str = Field(..., pattern="^(Polygon|MultiPolygon)$")
+    coordinates: List[Any]
+    
+    @model_validator(mode="before")
+    @classmethod
+    def _from_geography(cls, data):
+        """Accept geography values read from the database"""
+        if isinstance(data, WKBElement):
+            return mapping(to_shape(data))
+        return data
+
+class ZoneBase(BaseModel):
+    name: str = Field(..., min_length=1, max_length=255)
+    boundary: GeoPolygon
+    properties: Dict[str, Any] = Field(default_factory=dict)
+
+class ZoneCreate(ZoneBase):
+    tenant_id: UUID
+
+class ZoneUpdate(BaseModel):
+    name: Optional[str] = Field(None, min_length=1, max_length=255)
+    boundary: Optional[GeoPolygon] = None
+    properties: Optional[Dict[str, Any]] = None
+
+class ZoneResponse(ZoneBase, BaseSchema):
+    id: UUID
+    tenant_id: UUID
+    created_at: datetime
+    updated_at: Optional[datetime] = None
+
+class ZoneList(BaseSchema):
+    zones: list[ZoneResponse]
+    total: int
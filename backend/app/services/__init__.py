@@ -0,0 +1 @@
+# Business logic and background processing services
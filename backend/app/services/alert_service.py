@@ -0,0 +1,183 @@
+"""
+Raising alerts generated by the platform.
+
+Producers (such as the telemetry anomaly detector) hand over candidate
+alerts as dicts holding the ``alerts`` columns plus routing fields
+(``tenant_id``, ``asset_id``, ``zone``, ``source``). Candidates first pass
+through storm suppression (see ``alert_storm``); the survivors are written
+with one multi-row INSERT and then pushed to live alert subscribers of their
+tenant. Growth of grouped alerts is written and pushed by a periodic flush.
+"""
+import asyncio
+import logging
+import uuid
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Tuple
+from uuid import UUID
+
+from sqlalchemy import insert, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.models.alert import Alert
+from app.services.alert_storm import alert_storm
+from app.services.anomaly_detector import Anomaly
+from app.services.spatial_index import asset_index
+from app.services.ws_hub import alert_hub
+
+logger = logging.getLogger(__name__)
+
+ALERT_COLUMNS = (
+    "id", "type", "title", "message", "severity", "location", "acknowledged", "member_count", "members"
+)
+
+ANOMALY_ALERT_TYPES = {
+    "zscore": "telemetry_anomaly",
+    "stuck": "sensor_stuck",
+}
+
+
+def _asset_point(tenant_id: UUID, asset_id: UUID) -> Optional[Tuple[float, float]]:
+    grid = asset_index.grid(tenant_id)
+    return grid.points.get(asset_id) if grid is not None else None
+
+
+def anomaly_alert(
+    anomaly: Anomaly,
+    tenant_id: UUID,
+    zone: Optional[str],
+    location: Optional[str] = None
+) -> Dict[str, Any]:
+    """
+    Candidate alert for a telemetry anomaly, located at the reading's
+    ``location`` (EWKT) if it had one, else at the asset's indexed position.
+    """
+    if anomaly.kind == "stuck":
+        title = f"Sensor stuck: {anomaly.metric}"
+        message = (
+            f"Asset {anomaly.asset_id} has reported {anomaly.metric}={anomaly.value:g} "
+            f"for {settings.ANOMALY_STUCK_SAMPLES} consecutive readings"
+        )
+    else:
+        title = f"Anomalous {anomaly.metric} reading"
+        message = (
+            f"Asset {anomaly.asset_id} reported {anomaly.metric}={anomaly.value:g}, "
+            f"{anomaly.zscore:+.1f} standard deviations from its recent mean of {anomaly.mean:g}"
+        )
+    point = _asset_point(tenant_id, anomaly.asset_id)
+    return {
+        "id": uuid.uuid4(),
+        "type": ANOMALY_ALERT_TYPES[anomaly.kind],
+        "title": title,
+        "message": message,
+        "severity": anomaly.severity,
+        "location": location or (f"SRID={settings.DEFAULT_SRID};POINT({point[0]} {point[1]})" if point else None),
+        "acknowledged": False,
+        "member_count": 1,
+        "members": [],
+        "tenant_id": tenant_id,
+        "source": anomaly.asset_id,
+        "asset_id": anomaly.asset_id,
+        "zone": zone,
+        "metric": anomaly.metric,
+        "point": point,
+        "timestamp": datetime.fromtimestamp(anomaly.timestamp, tz=timezone.utc),
+    }
+
+
+async def _push(candidate: Dict[str, Any]):
+    point = candidate.get("point")
+    # Keyed by alert id, so updates of a grouped alert coalesce for slow clients
+    await alert_hub.publish(
+        candidate["tenant_id"],
+        {
+            "id": str(candidate["id"]),
+            "type": candidate["type"],
+            "severity": candidate["severity"],
+            "title": candidate["title"],
+            "message": candidate["message"],
+            "asset_id": str(candidate["asset_id"]) if candidate.get("asset_id") else None,
+            "location": {"lng": point[0], "lat": point[1]} if point else None,
+            "member_count": candidate["member_count"],
+            "members": candidate["members"],
+            "timestamp": candidate["timestamp"].isoformat(),
+        },
+        key=candidate["id"],
+        asset_id=candidate.get("asset_id"),
+        zone=candidate.get("zone")
+    )
+
+
+async def raise_alerts(db: AsyncSession, candidates: List[Dict[str, Any]]) -> int:
+    """Suppress storms, then persist the remaining alerts and push them to live subscribers"""
+    if settings.ALERT_STORM_ENABLED:
+        candidates = alert_storm.admit(candidates)
+    if not candidates:
+        return 0
+
+    try:
+        await db.execute(
+            insert(Alert),
+            [{name: candidate[name] for name in ALERT_COLUMNS} for candidate in candidates]
+        )
+        await db.commit()
+    except Exception:
+        await db.rollback()
+        for candidate in candidates:
+            alert_storm.forget(candidate["id"])
+        raise
+
+    for candidate in candidates:
+        await _push(candidate)
+
+    logger.info("Raised %d alerts", len(candidates))
+    return len(candidates)
+
+
+async def flush_alert_groups(db: AsyncSession) -> int:
+    """Write and push the member counts of alert groups that grew"""
+    groups, expired = alert_storm.take_updates()
+    if not groups:
+        for group in expired:
+            alert_storm.forget(group.id)
+        return 0
+
+    try:
+        await db.execute(
+            update(Alert),
+            [
+                {"id": group.id, "member_count": group.member_count, "members": group.members}
+                for group in groups
+            ]
+        )
+        await db.commit()
+    except Exception:
+        await db.rollback()
+        for group in groups:
+            group.dirty = True
+        raise
+
+    # Close expired groups only once their last update is stored
+    for group in expired:
+        alert_storm.forget(group.id)
+
+    for group in groups:
+        await _push(dict(group.parent, member_count=group.member_count, members=list(group.members)))
+
+    logger.debug("Flushed %d alert groups", len(groups))
+    return len(groups)
+
+
+async def run_group_flush_loop():
+    """Periodically write out grouped alerts so storms cost one update per group"""
+    from app.core.database import AsyncSessionLocal
+
+    while True:
+        await asyncio.sleep(settings.ALERT_GROUP_FLUSH_SECONDS)
+        try:
+            async with AsyncSessionLocal() as db:
+                await flush_alert_groups(db)
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            logger.exception("Alert group flush failed")
@@ -0,0 +1,205 @@
+"""
+Alert storm suppression.
+
+When a substation trips, hundreds of sensors alert within seconds. Instead of
+storing and pushing every one of them, candidate alerts pass through this
+stage first:
+
+* each source (normally the asset) may raise at most
+  ``ALERT_SOURCE_RATE_LIMIT`` alerts per ``ALERT_SOURCE_WINDOW_SECONDS``;
+  repeats beyond that are dropped;
+* an alert with the same tenant, type and severity as an open group, and
+  within ``ALERT_GROUP_RADIUS_M`` of the alert that opened it, joins that
+  group instead of becoming a new alert. Groups stay open for
+  ``ALERT_GROUP_WINDOW_SECONDS``.
+
+The alert that opens a group is stored and pushed immediately and becomes
+the parent; later members only bump its ``member_count`` and ``members``,
+which are written and pushed at most every ``ALERT_GROUP_FLUSH_SECONDS``.
+
+Groups are per process, like the anomaly detector feeding them.
+"""
+import math
+import time
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional, Tuple
+from uuid import UUID
+
+from app.core.config import settings
+from app.services.spatial_index import haversine_m
+
+METERS_PER_DEGREE = 111_320.0
+
+GroupKey = Tuple[UUID, str, str]
+
+
+class AlertGroup:
+    """An open group of similar alerts and the parent alert representing it"""
+
+    __slots__ = (
+        "parent", "key", "point", "cell", "expires", "member_count", "members", "dirty"
+    )
+
+    def __init__(self, parent: Dict[str, Any], key: GroupKey, cell: Optional[Tuple[int, int]], expires: float):
+        self.parent = parent
+        self.key = key
+        self.point = parent.get("point")
+        self.cell = cell
+        self.expires = expires
+        self.member_count = 1
+        self.members = [member_entry(parent)]
+        self.dirty = False
+
+    @property
+    def id(self) -> UUID:
+        return self.parent["id"]
+
+
+def member_entry(candidate: Dict[str, Any]) -> Dict[str, Any]:
+    """Compact record of a grouped alert kept on the parent"""
+    return {
+        "asset_id": str(candidate["asset_id"]) if candidate.get("asset_id") else None,
+        "metric": candidate.get("metric"),
+        "title": candidate["title"],
+        "timestamp": candidate["timestamp"].isoformat(),
+    }
+
+
+class AlertStormSuppressor:
+    """Rate-limits alert sources and folds similar nearby alerts into groups"""
+
+    def __init__(
+        self,
+        window: float = settings.ALERT_GROUP_WINDOW_SECONDS,
+        radius_m: float = settings.ALERT_GROUP_RADIUS_M,
+        max_members: int = settings.ALERT_GROUP_MAX_MEMBERS,
+        source_limit: int = settings.ALERT_SOURCE_RATE_LIMIT,
+        source_window: float = settings.ALERT_SOURCE_WINDOW_SECONDS
+    ):
+        self.window = window
+        self.radius_m = radius_m
+        self.cell_degrees = max(radius_m / METERS_PER_DEGREE, 1e-6)
+        self.max_members = max_members
+        self.source_limit = source_limit
+        self.source_window = source_window
+
+        # group key -> cell (None for alerts without a location) -> open groups
+        self.groups: Dict[GroupKey, Dict[Optional[Tuple[int, int]], List[AlertGroup]]] = {}
+        self.by_id: Dict[UUID, AlertGroup] = {}
+        self.source_hits: Dict[Any, Deque[float]] = {}
+
+        self.admitted = 0
+        self.grouped = 0
+        self.rate_limited = 0
+
+    def _cell(self, point: Tuple[float, float]) -> Tuple[int, int]:
+        return math.floor(point[0] / self.cell_degrees), math.floor(point[1] / self.cell_degrees)
+
+    def _rate_limited(self, source: Any, now: float) -> bool:
+        if source is None or self.source_limit <= 0:
+            return False
+        hits = self.source_hits.get(source)
+        if hits is None:
+            hits = self.source_hits[source] = deque()
+        while hits and hits[0] <= now - self.source_window:
+            hits.popleft()
+        if len(hits) >= self.source_limit:
+            return True
+        hits.append(now)
+        return False
+
+    def _find_group(self, key: GroupKey, point: Optional[Tuple[float, float]], now: float) -> Optional[AlertGroup]:
+        cells = self.groups.get(key)
+        if not cells:
+            return None
+        if point is None:
+            return next((g for g in cells.get(None, ()) if g.expires > now), None)
+
+        # Longitude degrees shrink towards the poles, so widen the column span
+        x, y = self._cell(point)
+        lat_scale = max(math.cos(math.radians(point[1])), 1e-6)
+        span_x = math.ceil(self.radius_m / (METERS_PER_DEGREE * lat_scale) / self.cell_degrees)
+        best, best_distance = None, self.radius_m
+        for cx in range(x - span_x, x + span_x + 1):
+            for cy in (y - 1, y, y + 1):
+                for group in cells.get((cx, cy), ()):
+                    if group.expires <= now:
+                        continue
+                    distance = haversine_m(point[0], point[1], group.point[0], group.point[1])
+                    if distance <= best_distance:
+                        best, best_distance = group, distance
+        return best
+
+    def admit(self, candidates: List[Dict[str, Any]], now: Optional[float] = None) -> List[Dict[str, Any]]:
+        """
+        Run candidates through rate limiting and grouping. Returns the
+        candidates that open new groups and must be stored and pushed; the
+        rest are folded into open groups or dropped.
+        """
+        now = time.time() if now is None else now
+        parents = []
+        for candidate in candidates:
+            if self._rate_limited(candidate.get("source"), now):
+                self.rate_limited += 1
+                continue
+            key = (candidate["tenant_id"], candidate["type"], candidate["severity"])
+            point = candidate.get("point")
+            group = self._find_group(key, point, now)
+            if group is not None:
+                group.member_count += 1
+                if len(group.members) < self.max_members:
+                    group.members.append(member_entry(candidate))
+                group.dirty = True
+                self.grouped += 1
+                continue
+
+            cell = self._cell(point) if point is not None else None
+            group = AlertGroup(candidate, key, cell, now + self.window)
+            self.groups.setdefault(key, {}).setdefault(cell, []).append(group)
+            self.by_id[group.id] = group
+            candidate["member_count"] = group.member_count
+            candidate["members"] = list(group.members)
+            parents.append(candidate)
+            self.admitted += 1
+        return parents
+
+    def take_updates(self, now: Optional[float] = None) -> Tuple[List[AlertGroup], List[AlertGroup]]:
+        """
+        Groups whose membership changed since the last call, and the expired
+        groups to close with ``forget`` once those updates are written. Idle
+        source windows are dropped.
+        """
+        now = time.time() if now is None else now
+        updates = [group for group in self.by_id.values() if group.dirty]
+        for group in updates:
+            group.dirty = False
+
+        # Expired groups take no new members, so they can stay until closed
+        expired = [group for group in self.by_id.values() if group.expires <= now]
+        for source in [s for s, hits in self.source_hits.items() if not hits or hits[-1] <= now - self.source_window]:
+            del self.source_hits[source]
+        return updates, expired
+
+    def forget(self, group_id: UUID):
+        """Close a group, e.g. when its parent alert could not be stored"""
+        group = self.by_id.pop(group_id, None)
+        if group is None:
+            return
+        cells = self.groups[group.key]
+        cells[group.cell].remove(group)
+        if not cells[group.cell]:
+            del cells[group.cell]
+        if not cells:
+            del self.groups[group.key]
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "open_groups": len(self.by_id),
+            "admitted": self.admitted,
+            "grouped": self.grouped,
+            "rate_limited": self.rate_limited,
+            "tracked_sources": len(self.source_hits),
+        }
+
+
+alert_storm = AlertStormSuppressor()
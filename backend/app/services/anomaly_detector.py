@@ -0,0 +1,256 @@
+"""
+Streaming anomaly detection over ingested telemetry.
+
+Every (asset, metric) series gets a slot in a set of parallel NumPy arrays
+holding its exponentially weighted mean and variance, sample count, last
+value and stuck-value run length. Series are found through a sorted NumPy
+array of keys (asset number and metric id packed into an int64), so
+per-series state is a few dozen bytes with no Python object per series;
+only assets and metric names have dictionary entries. A reading is scored against the series'
+statistics before they are updated with it:
+
+* the z-score of the reading maps onto the alert severities through
+  ``ANOMALY_Z_LEVELS`` (info, warning, error, critical);
+* a value repeated ``ANOMALY_STUCK_SAMPLES`` or more times in a row is
+  reported as a stuck sensor.
+
+Series are only scored after ``ANOMALY_WARMUP_SAMPLES`` readings, and a
+series that alerted stays quiet for ``ANOMALY_COOLDOWN_SECONDS``.
+
+State is per process. With several API workers, route each asset's
+telemetry to the same worker, or run detection in a single consumer.
+"""
+import logging
+import sys
+from typing import Any, Dict, List, NamedTuple, Sequence
+from uuid import UUID
+
+import numpy as np
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+SEVERITIES = ("info", "warning", "error", "critical")
+
+# Standard deviation floor relative to the mean, so that a series that has
+# been near-constant does not turn every small change into a critical alert
+MIN_RELATIVE_STD = 1e-3
+MIN_STD = 1e-9
+
+# Bits reserved for the metric id in a series key
+METRIC_BITS = 16
+
+INITIAL_CAPACITY = 1024
+
+STATE_ARRAYS = ("mean", "var", "last_value", "last_seen", "quiet_until", "count", "stuck_run")
+
+
+class Anomaly(NamedTuple):
+    kind: str  # "zscore" or "stuck"
+    severity: str
+    asset_id: UUID
+    metric: str
+    value: float
+    mean: float
+    std: float
+    zscore: float
+    timestamp: float  # epoch seconds
+    row: int  # index of the reading in the observed batch
+
+
+class AnomalyDetector:
+    """EWMA z-score and stuck-value detection for many series"""
+
+    def __init__(
+        self,
+        alpha: float = settings.ANOMALY_EWMA_ALPHA,
+        warmup: int = settings.ANOMALY_WARMUP_SAMPLES,
+        z_levels: Sequence[float] = tuple(settings.ANOMALY_Z_LEVELS),
+        stuck_samples: int = settings.ANOMALY_STUCK_SAMPLES,
+        cooldown: float = settings.ANOMALY_COOLDOWN_SECONDS,
+        capacity: int = INITIAL_CAPACITY
+    ):
+        if len(z_levels) != len(SEVERITIES):
+            raise ValueError(f"Expected {len(SEVERITIES)} z-score levels, got {len(z_levels)}")
+        self.alpha = alpha
+        self.warmup = warmup
+        self.z_levels = np.asarray(sorted(z_levels), dtype=np.float64)
+        self.stuck_samples = stuck_samples
+        self.cooldown = cooldown
+
+        self.assets: Dict[UUID, int] = {}
+        self.metric_ids: Dict[str, int] = {}
+        # Sorted series keys and the slot of each
+        self.keys = np.empty(0, dtype=np.int64)
+        self.key_slots = np.empty(0, dtype=np.uint32)
+        self.size = 0
+        self.mean = np.zeros(capacity, dtype=np.float64)
+        self.var = np.zeros(capacity, dtype=np.float64)
+        self.last_value = np.zeros(capacity, dtype=np.float64)
+        self.last_seen = np.full(capacity, -np.inf, dtype=np.float64)
+        self.quiet_until = np.full(capacity, -np.inf, dtype=np.float64)
+        self.count = np.zeros(capacity, dtype=np.uint32)
+        self.stuck_run = np.zeros(capacity, dtype=np.uint32)
+
+        self.observed = 0
+        self.late = 0
+        self.raised = 0
+
+    def __len__(self) -> int:
+        return self.size
+
+    def _grow(self, capacity: int):
+        for name in STATE_ARRAYS:
+            current = getattr(self, name)
+            grown = np.full(capacity, -np.inf if name in ("last_seen", "quiet_until") else 0, dtype=current.dtype)
+            grown[:self.size] = current[:self.size]
+            setattr(self, name, grown)
+
+    def _slots(self, keys: np.ndarray) -> np.ndarray:
+        """Slots of the series ``keys``, assigning slots to new series"""
+        index = np.searchsorted(self.keys, keys)
+        known = index < self.keys.size
+        known[known] = self.keys[index[known]] == keys[known]
+        if not known.all():
+            new = np.unique(keys[~known])
+            capacity = len(self.mean)
+            while self.size + new.size > capacity:
+                capacity *= 2
+            if capacity > len(self.mean):
+                self._grow(capacity)
+            at = np.searchsorted(self.keys, new)
+            self.keys = np.insert(self.keys, at, new)
+            self.key_slots = np.insert(self.key_slots, at, np.arange(self.size, self.size + new.size, dtype=np.uint32))
+            self.size += new.size
+            index = np.searchsorted(self.keys, keys)
+        return self.key_slots[index].astype(np.int64)
+
+    def observe_rows(self, rows: List[Dict[str, Any]]) -> List[Anomaly]:
+        """Score ingested telemetry rows (``asset_id``, ``timestamp``, ``metrics``)"""
+        keys, values, timestamps, row_index, names = [], [], [], [], []
+        for index, row in enumerate(rows):
+            ts = row["timestamp"].timestamp()
+            asset = self.assets.setdefault(row["asset_id"], len(self.assets)) << METRIC_BITS
+            for metric, value in row["metrics"].items():
+                if isinstance(value, bool) or not isinstance(value, (int, float)):
+                    continue
+                metric_id = self.metric_ids.get(metric)
+                if metric_id is None:
+                    metric_id = self.metric_ids[metric] = len(self.metric_ids)
+                keys.append(asset | metric_id)
+                values.append(value)
+                timestamps.append(ts)
+                row_index.append(index)
+                names.append(metric)
+        if not keys:
+            return []
+
+        anomalies = self.observe(
+            self._slots(np.asarray(keys, dtype=np.int64)),
+            np.asarray(values, dtype=np.float64),
+            np.asarray(timestamps, dtype=np.float64)
+        )
+        return [
+            Anomaly(
+                kind, severity, rows[row_index[i]]["asset_id"], names[i],
+                value, mean, std, z, ts, row_index[i]
+            )
+            for kind, severity, i, value, mean, std, z, ts in anomalies
+        ]
+
+    def observe(self, slots: np.ndarray, values: np.ndarray, timestamps: np.ndarray) -> List[tuple]:
+        """
+        Update series state with a batch of readings and return anomalies as
+        (kind, severity, position, value, mean, std, z, timestamp) tuples.
+
+        Readings of the same series are applied in timestamp order, one
+        round per reading, each round vectorized across series. Readings no
+        newer than the last one seen for their series are skipped.
+        """
+        finite = np.isfinite(values)
+        positions = np.flatnonzero(finite)
+        self.observed += positions.size
+        order = positions[np.lexsort((timestamps[positions], slots[positions]))]
+        if not order.size:
+            return []
+
+        sorted_slots = slots[order]
+        starts = np.ones(order.size, dtype=bool)
+        starts[1:] = sorted_slots[1:] != sorted_slots[:-1]
+        rank = np.arange(order.size) - np.maximum.accumulate(np.where(starts, np.arange(order.size), 0))
+
+        anomalies = []
+        for round_ in range(int(rank.max()) + 1):
+            batch = order[rank == round_]
+            anomalies.extend(self._update(slots[batch], values[batch], timestamps[batch], batch))
+        self.raised += len(anomalies)
+        return anomalies
+
+    def _update(self, s: np.ndarray, x: np.ndarray, t: np.ndarray, positions: np.ndarray) -> List[tuple]:
+        fresh_enough = t > self.last_seen[s]
+        self.late += int((~fresh_enough).sum())
+        s, x, t, positions = s[fresh_enough], x[fresh_enough], t[fresh_enough], positions[fresh_enough]
+        if not s.size:
+            return []
+
+        count = self.count[s]
+        first = count == 0
+        mean = self.mean[s]
+        var = self.var[s]
+
+        diff = x - mean
+        std = np.maximum(np.sqrt(var), np.maximum(np.abs(mean) * MIN_RELATIVE_STD, MIN_STD))
+        z = diff / std
+        level = np.searchsorted(self.z_levels, np.abs(z), side="right")
+
+        increment = self.alpha * diff
+        self.mean[s] = np.where(first, x, mean + increment)
+        self.var[s] = np.where(first, 0.0, (1 - self.alpha) * (var + diff * increment))
+
+        repeated = ~first & (x == self.last_value[s])
+        run = np.where(repeated, self.stuck_run[s] + 1, 1)
+        self.stuck_run[s] = run
+        self.count[s] = count + 1
+        self.last_value[s] = x
+        self.last_seen[s] = t
+
+        quiet = t < self.quiet_until[s]
+        spike = (count >= self.warmup) & (level > 0) & ~quiet
+        # At or past the threshold, so a sensor that got stuck while quiet is still reported
+        stuck = (run >= self.stuck_samples) & ~quiet
+        fired = spike | stuck
+        self.quiet_until[s[fired]] = t[fired] + self.cooldown
+
+        anomalies = []
+        for i in np.flatnonzero(fired):
+            if spike[i]:
+                anomalies.append((
+                    "zscore", SEVERITIES[level[i] - 1], int(positions[i]),
+                    float(x[i]), float(mean[i]), float(std[i]), float(z[i]), float(t[i])
+                ))
+            else:
+                anomalies.append((
+                    "stuck", "warning", int(positions[i]),
+                    float(x[i]), float(mean[i]), float(std[i]), 0.0, float(t[i])
+                ))
+        return anomalies
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "series": self.size,
+            "observed": self.observed,
+            "late": self.late,
+            "raised": self.raised,
+            "state_bytes": (
+                sum(getattr(self, name).nbytes for name in STATE_ARRAYS)
+                + self.keys.nbytes
+                + self.key_slots.nbytes
+                + sys.getsizeof(self.assets)
+                + sum(sys.getsizeof(asset_id) for asset_id in self.assets)
+                + sys.getsizeof(self.metric_ids)
+            ),
+        }
+
+
+anomaly_detector = AnomalyDetector()
@@ -0,0 +1,334 @@
+"""
+Columnar cold store for historical telemetry.
+
+Closed days of ``telemetry_data`` are compacted into one file per asset and
+UTC day under ``TELEMETRY_COLD_STORE_PATH``. Each file holds a millisecond
+offset column (uint32, relative to the start of the day) and one float32
+column per metric, laid out contiguously after a small JSON header so that
+readers can memory-map the file and view columns without copying.
+
+Run a compaction pass manually (from the backend directory) with:
+    python -m app.services.cold_store
+"""
+import asyncio
+import json
+import logging
+import mmap
+import os
+import struct
+from datetime import date, datetime, time, timedelta, timezone
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+from uuid import UUID
+
+import numpy as np
+from sqlalchemy import delete, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.models.telemetry import TelemetryData
+from app.services.metric_catalog import metric_catalog
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b"CIQCOL01"
+PREAMBLE = struct.Struct("<8sI")  # magic, header length
+ALIGNMENT = 64
+
+TIMESTAMP_DTYPE = np.dtype("<u4")
+VALUE_DTYPE = np.dtype("<f4")
+
+# Hot rows deleted per statement once compacted, within bind parameter limits
+DELETE_CHUNK_SIZE = 5000
+
+
+def _day_start(day: date) -> float:
+    """Epoch seconds of midnight UTC for ``day``"""
+    return datetime.combine(day, time.min, tzinfo=timezone.utc).timestamp()
+
+
+def _align(offset: int) -> int:
+    return (offset + ALIGNMENT - 1) // ALIGNMENT * ALIGNMENT
+
+
+def segment_path(asset_id: UUID, day: date) -> Path:
+    """Location of the cold segment for an asset and day"""
+    return Path(settings.TELEMETRY_COLD_STORE_PATH) / str(asset_id) / f"{day.isoformat()}.col"
+
+
+class ColdSegment:
+    """A memory-mapped cold segment; column arrays are read-only views of the file"""
+
+    def __init__(self, path: Path):
+        with open(path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, header_length = PREAMBLE.unpack_from(self._mmap, 0)
+        if magic != MAGIC:
+            raise ValueError(f"Not a telemetry cold segment: {path}")
+        header = json.loads(self._mmap[PREAMBLE.size:PREAMBLE.size + header_length])
+
+        self.base = header["base"]
+        self.rows = header["rows"]
+        self.offsets = self._column(header["columns"]["_t"], TIMESTAMP_DTYPE)
+        self.columns = {
+            name: self._column(position, VALUE_DTYPE)
+            for name, position in header["columns"].items()
+            if name != "_t"
+        }
+
+    def _column(self, position: int, dtype: np.dtype) -> np.ndarray:
+        return np.frombuffer(self._mmap, dtype=dtype, count=self.rows, offset=position)
+
+    def window(
+        self,
+        start: float,
+        end: float,
+        metrics: Optional[List[str]] = None
+    ) -> Tuple[np.ndarray, Dict[str, np.ndarray]]:
+        """Readings in ``[start, end)`` (epoch seconds) as float64 arrays"""
+        lo = np.searchsorted(self.offsets, max(0.0, (start - self.base) * 1000), side="left")
+        hi = np.searchsorted(self.offsets, max(0.0, (end - self.base) * 1000), side="left")
+        timestamps = self.base + self.offsets[lo:hi] / 1000.0
+        names = metrics if metrics is not None else list(self.columns)
+        series = {}
+        for name in names:
+            column = self.columns.get(name)
+            if column is None:
+                series[name] = np.full(hi - lo, np.nan)
+            else:
+                series[name] = column[lo:hi].astype(np.float64)
+        return timestamps, series
+
+
+def read_segment(asset_id: UUID, day: date) -> Optional[ColdSegment]:
+    """Open the cold segment for an asset and day, if one exists"""
+    path = segment_path(asset_id, day)
+    if not path.exists():
+        return None
+    return ColdSegment(path)
+
+
+def write_segment(
+    asset_id: UUID,
+    day: date,
+    timestamps: np.ndarray,
+    series: Dict[str, np.ndarray]
+) -> Path:
+    """
+    Write a cold segment atomically.
+
+    ``timestamps`` are epoch seconds within ``day`` and must be sorted; the
+    file is fsynced before it replaces any previous segment for the day.
+    """
+    base = _day_start(day)
+    columns = {"_t": np.round((timestamps - base) * 1000).astype(TIMESTAMP_DTYPE)}
+    for name, values in series.items():
+        columns[name] = values.astype(VALUE_DTYPE)
+
+    # Column positions depend on the header length, so lay out until stable
+    positions: Dict[str, int] = {}
+    while True:
+        header = json.dumps({
+            "asset_id": str(asset_id),
+            "day": day.isoformat(),
+            "base": base,
+            "rows": int(timestamps.size),
+            "columns": positions,
+        }).encode()
+        position = _align(PREAMBLE.size + len(header))
+        layout = {}
+        for name, column in columns.items():
+            layout[name] = position
+            position = _align(position + column.nbytes)
+        if layout == positions:
+            break
+        positions = layout
+
+    path = segment_path(asset_id, day)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_suffix(".tmp")
+    with open(tmp_path, "wb") as f:
+        f.write(PREAMBLE.pack(MAGIC, len(header)))
+        f.write(header)
+        for name, column in columns.items():
+            f.seek(positions[name])
+            f.write(column.tobytes())
+        f.truncate(position)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+    return path
+
+
+def merge_series(
+    parts: List[Tuple[np.ndarray, Dict[str, np.ndarray]]],
+    metrics: Optional[List[str]] = None,
+    dedupe: bool = False
+) -> Tuple[np.ndarray, Dict[str, np.ndarray]]:
+    """
+    Concatenate (timestamps, series) parts into one time-ordered series.
+
+    With ``dedupe``, readings of a later part at a millisecond (the precision
+    segments keep) an earlier part already has are dropped.
+    """
+    parts = [part for part in parts if part[0].size]
+    if dedupe and len(parts) > 1:
+        seen = np.round(parts[0][0] * 1000)
+        kept = [parts[0]]
+        for part_timestamps, series in parts[1:]:
+            millis = np.round(part_timestamps * 1000)
+            keep = ~np.isin(millis, seen)
+            kept.append((part_timestamps[keep], {name: values[keep] for name, values in series.items()}))
+            seen = np.concatenate([seen, millis])
+        parts = [part for part in kept if part[0].size]
+    if metrics is not None:
+        names = list(metrics)
+    else:
+        names = sorted({name for _, series in parts for name in series})
+    if not parts:
+        return np.empty(0), {name: np.empty(0) for name in names}
+
+    # Sorted even for a single part: segments are searched by time
+    timestamps = np.concatenate([part[0] for part in parts])
+    order = np.argsort(timestamps, kind="stable")
+    merged = {}
+    for name in names:
+        values = np.concatenate([
+            series.get(name, np.full(part_timestamps.size, np.nan))
+            for part_timestamps, series in parts
+        ])
+        merged[name] = values[order]
+    return timestamps[order], merged
+
+
+def load_cold_series(
+    asset_id: UUID,
+    start: datetime,
+    end: datetime,
+    metrics: Optional[List[str]] = None
+) -> List[Tuple[np.ndarray, Dict[str, np.ndarray]]]:
+    """Windows of every cold segment overlapping ``[start, end)``"""
+    parts = []
+    start_ts, end_ts = start.timestamp(), end.timestamp()
+    day = start.astimezone(timezone.utc).date()
+    last_day = (end.astimezone(timezone.utc) - timedelta(microseconds=1)).date()
+    while day <= last_day:
+        segment = read_segment(asset_id, day)
+        if segment is not None:
+            parts.append(segment.window(start_ts, end_ts, metrics))
+        day += timedelta(days=1)
+    return parts
+
+
+async def compact_day(db: AsyncSession, asset_id: UUID, day: date) -> int:
+    """
+    Move one asset-day of hot rows into its cold segment.
+
+    Late rows for a day that was already compacted are merged into the
+    existing segment. Hot rows are deleted only after the segment is durable,
+    and only the rows that were read, so rows committed meanwhile stay hot
+    for the next run. Readings the segment already holds from a run whose
+    delete failed are taken from the hot rows only, so retries never
+    duplicate them.
+    """
+    day_start = datetime.combine(day, time.min, tzinfo=timezone.utc)
+    window = (
+        (TelemetryData.asset_id == asset_id)
+        & (TelemetryData.timestamp >= day_start)
+        & (TelemetryData.timestamp < day_start + timedelta(days=1))
+    )
+    result = await db.execute(
+        select(
+            TelemetryData.id,
+            TelemetryData.timestamp,
+            TelemetryData.metric_ids,
+            TelemetryData.metric_values,
+            TelemetryData.metrics
+        )
+        .where(window)
+        .order_by(TelemetryData.timestamp)
+    )
+    rows = result.all()
+    if not rows:
+        return 0
+
+    row_ids, row_times, metric_ids, metric_values, documents = zip(*rows)
+    timestamps = np.array([timestamp.timestamp() for timestamp in row_times], dtype=np.float64)
+    hot = await metric_catalog.decode(db, metric_ids, metric_values, documents)
+    parts = [(timestamps, hot)]
+    existing = read_segment(asset_id, day)
+    if existing is not None:
+        parts.append(existing.window(day_start.timestamp(), day_start.timestamp() + 86400))
+
+    merged_timestamps, merged = merge_series(parts, dedupe=True)
+    write_segment(asset_id, day, merged_timestamps, merged)
+
+    for offset in range(0, len(row_ids), DELETE_CHUNK_SIZE):
+        await db.execute(
+            delete(TelemetryData).where(TelemetryData.id.in_(row_ids[offset:offset + DELETE_CHUNK_SIZE]))
+        )
+    await db.commit()
+    return len(rows)
+
+
+async def compact_closed_partitions(db: AsyncSession, now: Optional[datetime] = None) -> int:
+    """
+    Compact every asset-day older than ``TELEMETRY_HOT_DAYS``.
+
+    Returns the number of hot rows moved to the cold store.
+    """
+    now = now or datetime.now(timezone.utc)
+    cutoff = datetime.combine(
+        (now - timedelta(days=settings.TELEMETRY_HOT_DAYS)).date(), time.min, tzinfo=timezone.utc
+    )
+    oldest = await db.scalar(
+        select(func.min(TelemetryData.timestamp)).where(TelemetryData.timestamp < cutoff)
+    )
+    if oldest is None:
+        return 0
+
+    moved = 0
+    day = oldest.astimezone(timezone.utc).date()
+    while day < cutoff.date():
+        day_start = datetime.combine(day, time.min, tzinfo=timezone.utc)
+        result = await db.execute(
+            select(TelemetryData.asset_id)
+            .where(TelemetryData.timestamp >= day_start)
+            .where(TelemetryData.timestamp < day_start + timedelta(days=1))
+            .distinct()
+        )
+        for asset_id in result.scalars().all():
+            moved += await compact_day(db, asset_id, day)
+        day += timedelta(days=1)
+
+    logger.info("Compacted %d telemetry rows older than %s", moved, cutoff.date())
+    return moved
+
+
+async def run_compaction_loop():
+    """Periodically compact closed partitions until cancelled"""
+    from app.core.database import AsyncSessionLocal
+
+    while True:
+        try:
+            async with AsyncSessionLocal() as db:
+                await compact_closed_partitions(db)
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            logger.exception("Telemetry compaction failed")
+        await asyncio.sleep(settings.TELEMETRY_COMPACTION_INTERVAL_SECONDS)
+
+
+async def _compact_once():
+    from app.core.database import AsyncSessionLocal, close_db
+
+    async with AsyncSessionLocal() as db:
+        moved = await compact_closed_partitions(db)
+    await close_db()
+    print(f"Compacted {moved} telemetry rows")
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(_compact_once())
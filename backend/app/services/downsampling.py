@@ -0,0 +1,121 @@
+"""
+Vectorized time-series downsampling.
+
+Both reducers take epoch-second timestamps (sorted ascending) and a float
+array of the same length, where missing readings are NaN, and return a
+bounded number of points suitable for charting.
+"""
+from typing import Dict
+
+import numpy as np
+
+
+def bucket_aggregate(
+    timestamps: np.ndarray,
+    values: np.ndarray,
+    start: float,
+    end: float,
+    buckets: int
+) -> Dict[str, np.ndarray]:
+    """
+    Aggregate a series into ``buckets`` equal-width time buckets.
+
+    Returns the bucket start time plus min/max/avg/count for every non-empty
+    bucket. Relies on ``timestamps`` being sorted so that each bucket is a
+    contiguous run and can be reduced with ``ufunc.reduceat``.
+    """
+    mask = ~np.isnan(values)
+    timestamps = timestamps[mask]
+    values = values[mask]
+    if values.size == 0:
+        empty = np.empty(0)
+        return {"t": empty, "min": empty, "max": empty, "avg": empty, "count": empty.astype(np.int64)}
+
+    width = max((end - start) / buckets, 1e-9)
+    index = np.clip(((timestamps - start) / width).astype(np.int64), 0, buckets - 1)
+
+    starts = np.flatnonzero(np.r_[True, np.diff(index) != 0])
+    counts = np.diff(np.r_[starts, values.size])
+    sums = np.add.reduceat(values, starts)
+
+    return {
+        "t": start + index[starts] * width,
+        "min": np.minimum.reduceat(values, starts),
+        "max": np.maximum.reduceat(values, starts),
+        "avg": sums / counts,
+        "count": counts,
+    }
+
+
+def bucket_merge(
+    timestamps: np.ndarray,
+    counts: np.ndarray,
+    sums: np.ndarray,
+    mins: np.ndarray,
+    maxs: np.ndarray,
+    start: float,
+    end: float,
+    buckets: int
+) -> Dict[str, np.ndarray]:
+    """
+    ``bucket_aggregate`` for pre-aggregated input.
+
+    Each input point is a partial aggregate (a rollup bucket, or a single
+    reading with a count of one) placed by its start time; the output has
+    the same shape as ``bucket_aggregate``. ``timestamps`` must be sorted.
+    """
+    if timestamps.size == 0:
+        empty = np.empty(0)
+        return {"t": empty, "min": empty, "max": empty, "avg": empty, "count": empty.astype(np.int64)}
+
+    width = max((end - start) / buckets, 1e-9)
+    index = np.clip(((timestamps - start) / width).astype(np.int64), 0, buckets - 1)
+
+    starts = np.flatnonzero(np.r_[True, np.diff(index) != 0])
+    total = np.add.reduceat(counts, starts)
+
+    return {
+        "t": start + index[starts] * width,
+        "min": np.minimum.reduceat(mins, starts),
+        "max": np.maximum.reduceat(maxs, starts),
+        "avg": np.add.reduceat(sums, starts) / total,
+        "count": total.astype(np.int64),
+    }
+
+
+def lttb(timestamps: np.ndarray, values: np.ndarray, threshold: int) -> Dict[str, np.ndarray]:
+    """
+    Largest-Triangle-Three-Buckets downsampling.
+
+    Keeps the first and last points and, for each of ``threshold - 2``
+    buckets, the point forming the largest triangle with the previously
+    selected point and the average of the next bucket. The scan over buckets
+    is sequential by nature; the work inside each bucket is vectorized.
+    """
+    mask = ~np.isnan(values)
+    x = timestamps[mask]
+    y = values[mask]
+    n = x.size
+    if threshold >= n or threshold < 3:
+        return {"t": x, "v": y}
+
+    edges = np.linspace(1, n - 1, threshold - 1).astype(np.int64)
+    selected = np.empty(threshold, dtype=np.int64)
+    selected[0] = 0
+    selected[-1] = n - 1
+
+    previous = 0
+    for i in range(threshold - 2):
+        lo, hi = edges[i], edges[i + 1]
+        next_lo, next_hi = hi, edges[i + 2] if i + 2 < edges.size else n
+        avg_x = x[next_lo:next_hi].mean()
+        avg_y = y[next_lo:next_hi].mean()
+
+        ax, ay = x[previous], y[previous]
+        areas = np.abs(
+            (ax - avg_x) * (y[lo:hi] - ay) - (ax - x[lo:hi]) * (avg_y - ay)
+        )
+        previous = lo + int(np.argmax(areas))
+        selected[i + 1] = previous
+
+    return {"t": x[selected], "v": y[selected]}
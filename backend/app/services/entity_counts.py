@@ -0,0 +1,113 @@
+"""
+Maintained row counts for list endpoint totals.
+
+Instead of running COUNT(*) over the filtered set on every list request,
+each worker keeps per-tenant counts of incidents by (status, severity, type)
+and of assets by (type, status). The API updates them as rows are created,
+updated and deleted, and a periodic GROUP BY reconcile corrects drift from
+writes made by other workers or outside the API. Totals served from the
+counters can therefore lag by up to ``COUNTER_RECONCILE_SECONDS``; list
+endpoints accept ``exact_total=true`` to count in the database instead.
+"""
+import asyncio
+import logging
+from collections import Counter
+from typing import Any, Dict, Optional, Tuple
+from uuid import UUID
+
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.models.asset import Asset
+from app.models.incident import Incident
+
+logger = logging.getLogger(__name__)
+
+Key = Tuple[Optional[str], ...]
+
+
+class DimensionCounts:
+    """Row counts of one model grouped by tenant and a tuple of columns"""
+
+    def __init__(self, model: Any, dimensions: Tuple[str, ...]):
+        self.model = model
+        self.dimensions = dimensions
+        # tenant -> dimension values -> rows; the None tenant aggregates all tenants
+        self.counts: Dict[Optional[UUID], Counter] = {}
+        self.loaded = False
+
+    def key(self, row: Any) -> Key:
+        return tuple(getattr(row, name) for name in self.dimensions)
+
+    def add(self, tenant_id: UUID, key: Key, delta: int = 1):
+        for scope in (tenant_id, None):
+            counts = self.counts.setdefault(scope, Counter())
+            counts[key] += delta
+            if counts[key] <= 0:
+                del counts[key]
+
+    def move(self, tenant_id: UUID, old_key: Key, new_key: Key):
+        if old_key != new_key:
+            self.add(tenant_id, old_key, -1)
+            self.add(tenant_id, new_key, 1)
+
+    def total(self, tenant_id: Optional[UUID] = None, **filters: Optional[str]) -> Optional[int]:
+        """
+        Rows matching ``filters`` (dimension name -> value, None meaning any),
+        or None if the counts are not available.
+        """
+        if not self.loaded:
+            return None
+        wanted = [
+            (position, filters[name])
+            for position, name in enumerate(self.dimensions)
+            if filters.get(name) is not None
+        ]
+        counts = self.counts.get(tenant_id, {})
+        if not wanted:
+            return sum(counts.values())
+        return sum(
+            count for key, count in counts.items()
+            if all(key[position] == value for position, value in wanted)
+        )
+
+    async def reconcile(self, db: AsyncSession) -> int:
+        """Recount from the database and swap the result in"""
+        columns = [getattr(self.model, name) for name in self.dimensions]
+        result = await db.execute(
+            select(self.model.tenant_id, *columns, func.count()).group_by(self.model.tenant_id, *columns)
+        )
+        counts: Dict[Optional[UUID], Counter] = {None: Counter()}
+        for tenant_id, *key, count in result.all():
+            key = tuple(key)
+            counts.setdefault(tenant_id, Counter())[key] = count
+            counts[None][key] += count
+        self.counts = counts
+        self.loaded = True
+        return sum(counts[None].values())
+
+
+incident_counts = DimensionCounts(Incident, ("status", "severity", "type"))
+asset_counts = DimensionCounts(Asset, ("type", "status"))
+
+
+async def reconcile_all(db: AsyncSession):
+    incidents = await incident_counts.reconcile(db)
+    assets = await asset_counts.reconcile(db)
+    logger.info("Reconciled list counters: %d incidents, %d assets", incidents, assets)
+
+
+async def run_reconcile_loop():
+    """Periodically recount so that writes from other workers are picked up"""
+    from app.core.database import AsyncSessionLocal
+
+    while True:
+        await asyncio.sleep(settings.COUNTER_RECONCILE_SECONDS)
+        try:
+            async with AsyncSessionLocal() as db:
+                await reconcile_all(db)
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            logger.exception("List counter reconcile failed")
@@ -0,0 +1,303 @@
+"""
+Append-only event log in memory-mapped segment files.
+
+Records are length-prefixed, CRC-checked byte strings appended to
+preallocated segment files of ``TELEMETRY_WAL_SEGMENT_BYTES`` that are
+written through ``mmap``. Positions in the log are logical byte offsets
+that keep growing across segments; each segment file is named after the
+offset of its first byte.
+
+Appends only copy into the mapping. Durability comes from a background
+flusher that ``msync``s everything appended since its last pass, at most
+every ``TELEMETRY_WAL_FSYNC_INTERVAL_MS``, so concurrent writers share one
+sync (group commit); ``wait_durable`` returns once a writer's records are
+on disk. Consumers read durable records from their checkpoint onwards and
+``checkpoint`` their progress, which also deletes segments that are fully
+consumed.
+
+On open the segments are scanned to find the end of the log: a zero header
+marks unused space and a CRC mismatch marks a torn write, and appends
+resume from there. Each log lives in a slot directory held with an
+exclusive ``flock``, so every worker process writes its own log and a
+restarted worker takes over the slot (and the backlog) of a dead one.
+"""
+import asyncio
+import fcntl
+import logging
+import mmap
+import os
+import struct
+import threading
+import zlib
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+HEADER = struct.Struct("<II")  # payload length, crc32 of the payload
+SEGMENT_SUFFIX = ".seg"
+CHECKPOINT_FILE = "checkpoint"
+LOCK_FILE = "lock"
+MAX_SLOTS = 256
+
+
+def _fsync_directory(path: Path):
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+class Segment:
+    """One preallocated, memory-mapped segment file"""
+
+    def __init__(self, path: Path, base: int, size: Optional[int] = None):
+        self.path = path
+        self.base = base
+        fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            if size is not None:
+                os.ftruncate(fd, size)
+            self.size = os.fstat(fd).st_size
+            self.mm = mmap.mmap(fd, self.size)
+        finally:
+            os.close(fd)
+        self.end = 0
+
+    def scan(self) -> int:
+        """Position after the last intact record"""
+        position = 0
+        while position + HEADER.size <= self.size:
+            length, crc = HEADER.unpack_from(self.mm, position)
+            start = position + HEADER.size
+            if length == 0 or start + length > self.size:
+                break
+            if zlib.crc32(self.mm[start:start + length]) != crc:
+                logger.warning(f"Torn record at offset {self.base + position} in {self.path.name}, truncating")
+                break
+            position = start + length
+        # Clear whatever follows so that a later scan stops at the same place
+        if position + HEADER.size <= self.size:
+            HEADER.pack_into(self.mm, position, 0, 0)
+        self.end = position
+        return position
+
+    def fits(self, length: int) -> bool:
+        return self.end + HEADER.size + length <= self.size
+
+    def write(self, payload: bytes):
+        HEADER.pack_into(self.mm, self.end, len(payload), zlib.crc32(payload))
+        start = self.end + HEADER.size
+        self.mm[start:start + len(payload)] = payload
+        self.end = start + len(payload)
+
+    def flush(self, start: int, end: int):
+        """msync the byte range [start, end) of this segment"""
+        start -= start % mmap.PAGESIZE
+        if end > start:
+            self.mm.flush(start, end - start)
+
+    def close(self):
+        self.mm.close()
+
+
+class EventLog:
+    """Append-only log of byte records with group-committed durability"""
+
+    def __init__(self, directory: Path, segment_bytes: int, fsync_interval: float):
+        self.directory = directory
+        self.segment_bytes = segment_bytes
+        self.fsync_interval = fsync_interval
+        self.segments: List[Segment] = []
+        # Guards changes to ``segments``, which the sync and checkpoint threads walk
+        self._segments_lock = threading.Lock()
+        self.written = 0  # logical end of appended records
+        self.flushed = 0  # logical end of records known to be on disk
+        self.committed = 0  # consumer checkpoint
+        self.recovered = 0  # end of the log when it was opened; records before it may be replays
+        self._lock_fd: Optional[int] = None
+        self._dirty = asyncio.Event()
+        self._flush_done: Optional[asyncio.Future] = None
+        self._flusher: Optional[asyncio.Task] = None
+        self.syncs = 0
+
+    @classmethod
+    def claim(cls, root: Path, segment_bytes: int, fsync_interval: float, exclude: Tuple[Path, ...] = ()) -> Optional["EventLog"]:
+        """Open the first slot under ``root`` that no other process holds"""
+        root.mkdir(parents=True, exist_ok=True)
+        for slot in range(MAX_SLOTS):
+            directory = root / f"slot-{slot}"
+            if directory in exclude:
+                continue
+            directory.mkdir(exist_ok=True)
+            log = cls(directory, segment_bytes, fsync_interval)
+            if log._try_lock():
+                log.open()
+                return log
+        return None
+
+    @classmethod
+    def orphans(cls, root: Path, segment_bytes: int, exclude: Tuple[Path, ...]) -> List["EventLog"]:
+        """Unheld slots that still have records to consume"""
+        found = []
+        for directory in sorted(root.glob("slot-*")):
+            if directory in exclude or not any(directory.glob(f"*{SEGMENT_SUFFIX}")):
+                continue
+            log = cls(directory, segment_bytes, 0)
+            if not log._try_lock():
+                continue
+            log.open()
+            if log.backlog:
+                found.append(log)
+            else:
+                log.close_files()
+        return found
+
+    def _try_lock(self) -> bool:
+        fd = os.open(self.directory / LOCK_FILE, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            os.close(fd)
+            return False
+        self._lock_fd = fd
+        return True
+
+    def open(self):
+        """Map existing segments and recover the end of the log"""
+        checkpoint = self.directory / CHECKPOINT_FILE
+        self.committed = int(checkpoint.read_text()) if checkpoint.exists() else 0
+        paths = sorted(self.directory.glob(f"*{SEGMENT_SUFFIX}"), key=lambda p: int(p.stem))
+        for path in paths:
+            segment = Segment(path, int(path.stem))
+            segment.scan()
+            self.segments.append(segment)
+        if self.segments:
+            last = self.segments[-1]
+            self.written = self.flushed = last.base + last.end
+        else:
+            self.written = self.flushed = self.committed
+        self.recovered = self.written
+        if self.backlog:
+            logger.info(f"Event log {self.directory.name}: {self.backlog} bytes to replay from offset {self.committed}")
+
+    @property
+    def backlog(self) -> int:
+        """Bytes appended but not yet consumed"""
+        return self.written - self.committed
+
+    def start(self):
+        self._flusher = asyncio.create_task(self._run_flusher())
+
+    def append(self, payload: bytes) -> int:
+        """Append one record; returns the log offset after it"""
+        segment = self.segments[-1] if self.segments else None
+        if segment is None or not segment.fits(len(payload)):
+            segment = self._roll(len(payload))
+        segment.write(payload)
+        self.written = segment.base + segment.end
+        self._dirty.set()
+        return self.written
+
+    def _roll(self, length: int) -> Segment:
+        base = self.written
+        size = max(self.segment_bytes, HEADER.size * 2 + length)
+        segment = Segment(self.directory / f"{base:020d}{SEGMENT_SUFFIX}", base, size)
+        _fsync_directory(self.directory)
+        with self._segments_lock:
+            self.segments.append(segment)
+        return segment
+
+    async def wait_durable(self, offset: int):
+        """Wait until every record before ``offset`` has been synced to disk"""
+        while self.flushed < offset:
+            if self._flush_done is None:
+                self._flush_done = asyncio.get_running_loop().create_future()
+            self._dirty.set()
+            await asyncio.shield(self._flush_done)
+
+    async def _run_flusher(self):
+        while True:
+            await self._dirty.wait()
+            self._dirty.clear()
+            # Let concurrent writers join this sync
+            await asyncio.sleep(self.fsync_interval)
+            target, done = self.written, self._flush_done
+            self._flush_done = None
+            try:
+                await asyncio.to_thread(self._sync, self.flushed, target)
+            except Exception as e:
+                logger.error(f"Event log sync failed: {e}")
+                if done is not None:
+                    done.set_exception(e)
+                    done.exception()
+                continue
+            self.flushed = target
+            self.syncs += 1
+            if done is not None:
+                done.set_result(None)
+
+    def _sync(self, start: int, end: int):
+        with self._segments_lock:
+            segments = list(self.segments)
+        # Segments a checkpoint drops meanwhile end before ``start``, so none is missed
+        for segment in segments:
+            segment_end = segment.base + segment.end
+            if segment_end <= start or segment.base >= end:
+                continue
+            segment.flush(max(start, segment.base) - segment.base, min(end, segment_end) - segment.base)
+
+    def read(self, start: int, max_bytes: int) -> Tuple[List[bytes], int]:
+        """Durable records from ``start``, about ``max_bytes`` of them, and the offset after the last"""
+        records, position, total = [], start, 0
+        for segment in self.segments:
+            segment_end = segment.base + segment.end
+            if segment_end <= position:
+                continue
+            position = max(position, segment.base)
+            while position < min(segment_end, self.flushed) and total < max_bytes:
+                length, _ = HEADER.unpack_from(segment.mm, position - segment.base)
+                data_start = position - segment.base + HEADER.size
+                records.append(bytes(segment.mm[data_start:data_start + length]))
+                position += HEADER.size + length
+                total += length
+            if total >= max_bytes or position < segment_end:
+                break
+        return records, position
+
+    def checkpoint(self, offset: int):
+        """Record that everything before ``offset`` is consumed and drop finished segments"""
+        path = self.directory / CHECKPOINT_FILE
+        tmp = path.with_suffix(".tmp")
+        with open(tmp, "w") as f:
+            f.write(str(offset))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+        _fsync_directory(self.directory)
+        self.committed = offset
+
+        # Keep the last segment for appends, even when fully consumed
+        while len(self.segments) > 1 and self.segments[0].base + self.segments[0].end <= offset:
+            with self._segments_lock:
+                segment = self.segments.pop(0)
+            segment.close()
+            segment.path.unlink()
+
+    async def close(self):
+        if self._flusher is not None:
+            self._flusher.cancel()
+            await asyncio.gather(self._flusher, return_exceptions=True)
+            self._flusher = None
+        self._sync(self.flushed, self.written)
+        self.flushed = self.written
+        self.close_files()
+
+    def close_files(self):
+        for segment in self.segments:
+            segment.close()
+        self.segments = []
+        if self._lock_fd is not None:
+            os.close(self._lock_fd)
+            self._lock_fd = None
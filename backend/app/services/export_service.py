@@ -0,0 +1,69 @@
+"""
+Streaming exports of list endpoints.
+
+Rows are read through a server-side cursor in ``EXPORT_CHUNK_SIZE`` chunks
+and encoded chunk by chunk, so memory use does not depend on the size of the
+export. Each export opens its own session because the response body is
+produced after the endpoint (and its dependencies) have returned.
+"""
+import csv
+import io
+import json
+import logging
+from typing import Any, AsyncIterator, Callable, Dict
+
+from sqlalchemy import Select
+
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+
+logger = logging.getLogger(__name__)
+
+EXPORT_MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+}
+
+
+def _csv_value(value: Any) -> Any:
+    """Flatten nested values into JSON text for CSV cells"""
+    if isinstance(value, (dict, list)):
+        return json.dumps(value)
+    return value
+
+
+async def stream_export(
+    query: Select,
+    serialize: Callable[[Any], Dict[str, Any]],
+    format: str = "ndjson"
+) -> AsyncIterator[bytes]:
+    """
+    Yield an export of ``query`` as NDJSON or CSV.
+
+    If the client disconnects, the response task is cancelled and leaving the
+    session block closes the cursor and returns the connection to the pool.
+    """
+    fieldnames = None
+    exported = 0
+    async with AsyncSessionLocal() as db:
+        result = await db.stream_scalars(
+            query.execution_options(yield_per=settings.EXPORT_CHUNK_SIZE)
+        )
+        async for partition in result.partitions():
+            records = [serialize(row) for row in partition]
+            exported += len(records)
+            if format == "csv":
+                buffer = io.StringIO()
+                writer = csv.DictWriter(buffer, fieldnames=fieldnames or list(records[0]))
+                if fieldnames is None:
+                    fieldnames = writer.fieldnames
+                    writer.writeheader()
+                writer.writerows(
+                    {key: _csv_value(value) for key, value in record.items()}
+                    for record in records
+                )
+                chunk = buffer.getvalue()
+            else:
+                chunk = "".join(json.dumps(record) + "\n" for record in records)
+            yield chunk.encode()
+    logger.info("Exported %d rows", exported)
@@ -0,0 +1,454 @@
+"""
+Batched multi-series forecasting.
+
+Readings of one metric for many assets are bucketed onto a regular grid of
+``FORECAST_STEP_SECONDS`` steps, giving a (series x steps) matrix, and the
+baseline models run over the whole matrix at once:
+
+* ``seasonal_naive`` repeats the last season (``FORECAST_SEASON_STEPS``);
+* ``ets`` is additive Holt-Winters with a damped trend and fixed smoothing
+  parameters, one vectorized pass over the time axis for all series.
+
+``prophet`` models are fitted one series per task on a process pool of
+``FORECAST_WORKERS`` processes, normally by the scheduled precompute rather
+than inside a request.
+
+Forecasts are cached per (asset, metric, model) together with the data
+watermark they were computed at: the end of the last complete step. A cached
+forecast is served until the next step completes, so repeated requests over
+thousands of assets are dictionary lookups.
+
+The precompute runs in the leader worker only; its Prophet forecasts are
+also written to the shared cache tier, where the other workers pick them
+up on their first miss.
+"""
+import asyncio
+import importlib.util
+import logging
+import math
+import time
+from collections import OrderedDict
+from datetime import datetime, timezone
+from typing import TYPE_CHECKING, Dict, List, NamedTuple, Optional, Tuple
+from uuid import UUID
+
+import numpy as np
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.cache import cache, cache_key
+from app.core.config import settings
+from app.models.asset import Asset
+from app.services.metric_catalog import metric_catalog
+from app.services.rollups import load_rollups, step_resolution
+from app.services.telemetry_query import load_metric_readings
+
+if TYPE_CHECKING:
+    from concurrent.futures import ProcessPoolExecutor
+
+logger = logging.getLogger(__name__)
+
+MODELS = ("seasonal_naive", "ets", "prophet")
+
+# Two-sided 95% interval
+Z_95 = 1.96
+
+# Holt-Winters smoothing for level, trend and season, and trend damping
+ETS_ALPHA = 0.3
+ETS_BETA = 0.05
+ETS_GAMMA = 0.1
+ETS_PHI = 0.98
+
+PROPHET_AVAILABLE = importlib.util.find_spec("prophet") is not None
+
+SeriesKey = Tuple[UUID, str, str]
+
+
+class Forecast(NamedTuple):
+    model: str
+    watermark: float  # Epoch seconds; the forecast starts here
+    step: int
+    value: np.ndarray
+    lower: np.ndarray
+    upper: np.ndarray
+
+    def head(self, steps: int) -> "Forecast":
+        return self._replace(value=self.value[:steps], lower=self.lower[:steps], upper=self.upper[:steps])
+
+
+def current_watermark(now: Optional[float] = None, step: int = settings.FORECAST_STEP_SECONDS) -> float:
+    """End of the last complete step"""
+    now = time.time() if now is None else now
+    return math.floor(now / step) * step
+
+
+def regularize(
+    series: np.ndarray,
+    timestamps: np.ndarray,
+    values: np.ndarray,
+    n_series: int,
+    start: float,
+    step: int,
+    n_steps: int,
+    weights: Optional[np.ndarray] = None
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Average flat (series, timestamp, value) readings into an
+    (n_series, n_steps) matrix, NaN where a step has no readings.
+    Also returns the number of observed steps per series.
+
+    With ``weights`` the input is pre-aggregated: ``values`` are sums of
+    ``weights`` readings each, as in rollup buckets.
+    """
+    column = ((timestamps - start) // step).astype(np.int64)
+    inside = (column >= 0) & (column < n_steps)
+    cell = series[inside] * n_steps + column[inside]
+    size = n_series * n_steps
+    sums = np.bincount(cell, weights=values[inside], minlength=size)
+    if weights is None:
+        counts = np.bincount(cell, minlength=size)
+    else:
+        counts = np.bincount(cell, weights=weights[inside], minlength=size)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        matrix = (sums / counts).reshape(n_series, n_steps)
+    return matrix, (counts.reshape(n_series, n_steps) > 0).sum(axis=1)
+
+
+def fill_gaps(matrix: np.ndarray) -> np.ndarray:
+    """Carry the last observed value forward; leading gaps take the first observation"""
+    observed = ~np.isnan(matrix)
+    columns = np.arange(matrix.shape[1])
+    last = np.maximum.accumulate(np.where(observed, columns, -1), axis=1)
+    first = np.argmax(observed, axis=1)
+    last = np.where(last < 0, first[:, None], last)
+    return np.take_along_axis(matrix, last, axis=1)
+
+
+def seasonal_naive(y: np.ndarray, horizon: int, season: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Forecast and interval half-width repeating each series' last season"""
+    n, length = y.shape
+    season = min(season, length)
+    steps = np.arange(horizon)
+    value = y[:, length - season + steps % season]
+    if length > season:
+        residuals = y[:, season:] - y[:, :-season]
+        sigma = np.sqrt(np.mean(residuals ** 2, axis=1))
+    else:
+        sigma = np.std(y, axis=1)
+    width = Z_95 * sigma[:, None] * np.sqrt(steps // season + 1)[None, :]
+    return value, width
+
+
+def ets(y: np.ndarray, horizon: int, season: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Forecast and interval half-width from additive damped Holt-Winters"""
+    n, length = y.shape
+    season = max(min(season, length // 2), 1)
+    level = y[:, :season].mean(axis=1)
+    if length >= 2 * season:
+        trend = (y[:, season:2 * season].mean(axis=1) - level) / season
+    else:
+        trend = np.zeros(n)
+    seasonal = y[:, :season] - level[:, None]
+
+    squared_error = np.zeros(n)
+    for t in range(length):
+        s = seasonal[:, t % season]
+        error = y[:, t] - (level + ETS_PHI * trend + s)
+        if t >= season:
+            squared_error += error ** 2
+        previous = level
+        level = ETS_ALPHA * (y[:, t] - s) + (1 - ETS_ALPHA) * (level + ETS_PHI * trend)
+        trend = ETS_BETA * (level - previous) + (1 - ETS_BETA) * ETS_PHI * trend
+        seasonal[:, t % season] = ETS_GAMMA * (y[:, t] - level) + (1 - ETS_GAMMA) * s
+
+    steps = np.arange(1, horizon + 1)
+    damping = np.cumsum(ETS_PHI ** steps)
+    value = (
+        level[:, None]
+        + damping[None, :] * trend[:, None]
+        + seasonal[:, (length + steps - 1) % season]
+    )
+    sigma = np.sqrt(squared_error / max(length - season, 1))
+    width = Z_95 * sigma[:, None] * np.sqrt(1 + (steps - 1) * ETS_ALPHA ** 2)[None, :]
+    return value, width
+
+
+BASELINES = {"seasonal_naive": seasonal_naive, "ets": ets}
+
+
+def _fit_prophet(
+    timestamps: np.ndarray,
+    values: np.ndarray,
+    watermark: float,
+    horizon: int,
+    step: int
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Fit Prophet to one series and forecast; runs in a pool process"""
+    import pandas as pd
+    from prophet import Prophet
+
+    history = pd.DataFrame({"ds": pd.to_datetime(timestamps, unit="s"), "y": values})
+    model = Prophet(interval_width=0.95, daily_seasonality=True, weekly_seasonality=True, yearly_seasonality=False)
+    model.fit(history)
+    future = pd.DataFrame({"ds": pd.to_datetime(watermark + step * np.arange(horizon), unit="s")})
+    prediction = model.predict(future)
+    return (
+        prediction["yhat"].to_numpy(),
+        prediction["yhat_lower"].to_numpy(),
+        prediction["yhat_upper"].to_numpy(),
+    )
+
+
+class ForecastCache:
+    """LRU of forecasts per (asset, metric, model), valid for one watermark"""
+
+    def __init__(self, max_series: int):
+        self.max_series = max_series
+        self.entries: "OrderedDict[SeriesKey, Forecast]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def get(self, key: SeriesKey, watermark: float) -> Optional[Forecast]:
+        forecast = self.entries.get(key)
+        if forecast is None or forecast.watermark != watermark:
+            self.misses += 1
+            return None
+        self.entries.move_to_end(key)
+        self.hits += 1
+        return forecast
+
+    def put(self, key: SeriesKey, forecast: Forecast):
+        self.entries[key] = forecast
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_series:
+            self.entries.popitem(last=False)
+
+    def stats(self) -> Dict[str, int]:
+        return {"series": len(self.entries), "hits": self.hits, "misses": self.misses}
+
+
+class ForecastService:
+    """Serves cached forecasts and computes missing ones in batches"""
+
+    def __init__(self):
+        self.step = settings.FORECAST_STEP_SECONDS
+        self.season = settings.FORECAST_SEASON_STEPS
+        self.history_steps = settings.FORECAST_HISTORY_DAYS * 86400 // self.step
+        self.max_horizon = settings.FORECAST_MAX_HORIZON_STEPS
+        self.cache = ForecastCache(settings.FORECAST_CACHE_MAX_SERIES)
+        self._pool: Optional["ProcessPoolExecutor"] = None
+
+    @property
+    def prophet_enabled(self) -> bool:
+        return PROPHET_AVAILABLE and settings.FORECAST_WORKERS > 0
+
+    def _get_pool(self) -> "ProcessPoolExecutor":
+        if self._pool is None:
+            # multiprocessing is only needed once a Prophet fit is requested
+            from concurrent.futures import ProcessPoolExecutor
+
+            self._pool = ProcessPoolExecutor(max_workers=settings.FORECAST_WORKERS)
+        return self._pool
+
+    def close(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+    async def _histories(
+        self,
+        db: AsyncSession,
+        asset_ids: List[UUID],
+        metric: str,
+        watermark: float
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        start = watermark - self.history_steps * self.step
+        resolution = step_resolution(self.step) if settings.TELEMETRY_ROLLUPS_ENABLED else None
+        if resolution is not None:
+            # Steps are whole rollup buckets: average the bucket sums instead of raw readings
+            if metric not in metric_catalog.by_name:
+                await metric_catalog.load(db)
+            series, _, buckets, counts, sums, _, _ = await load_rollups(
+                db, asset_ids, metric_catalog.by_name.get(metric, []), resolution, start, watermark
+            )
+            return regularize(
+                series, buckets, sums, len(asset_ids), start, self.step, self.history_steps, weights=counts
+            )
+        series, timestamps, values = await load_metric_readings(
+            db, asset_ids, metric,
+            datetime.fromtimestamp(start, tz=timezone.utc),
+            datetime.fromtimestamp(watermark, tz=timezone.utc)
+        )
+        return regularize(series, timestamps, values, len(asset_ids), start, self.step, self.history_steps)
+
+    async def _compute(
+        self,
+        db: AsyncSession,
+        asset_ids: List[UUID],
+        metric: str,
+        model: str,
+        watermark: float
+    ) -> Dict[UUID, Forecast]:
+        """Fit ``model`` for every asset with data and cache the results"""
+        matrix, observed = await self._histories(db, asset_ids, metric, watermark)
+        rows = np.flatnonzero(observed >= (2 if model == "prophet" else 1))
+        if not rows.size:
+            return {}
+
+        if model == "prophet":
+            loop = asyncio.get_running_loop()
+            pool = self._get_pool()
+            grid = watermark - (self.history_steps - np.arange(self.history_steps)) * self.step
+            tasks = []
+            for row in rows:
+                present = ~np.isnan(matrix[row])
+                tasks.append(loop.run_in_executor(
+                    pool, _fit_prophet, grid[present], matrix[row, present], watermark, self.max_horizon, self.step
+                ))
+            fitted = await asyncio.gather(*tasks)
+            results = {
+                asset_ids[row]: Forecast(model, watermark, self.step, value, lower, upper)
+                for row, (value, lower, upper) in zip(rows, fitted)
+            }
+        else:
+            value, width = BASELINES[model](fill_gaps(matrix[rows]), self.max_horizon, self.season)
+            results = {
+                asset_ids[row]: Forecast(model, watermark, self.step, value[i], value[i] - width[i], value[i] + width[i])
+                for i, row in enumerate(rows)
+            }
+
+        for asset_id, forecast in results.items():
+            self.cache.put((asset_id, metric, model), forecast)
+        return results
+
+    def _shared_key(self, asset_id: UUID, metric: str) -> str:
+        return cache_key("forecast", None, f"{asset_id}:{metric}:prophet")
+
+    async def _share(self, metric: str, forecasts: Dict[UUID, Forecast]):
+        """Publish precomputed Prophet forecasts to the other workers until the next step"""
+        await cache.set_shared(
+            {
+                self._shared_key(asset_id, metric): {
+                    "watermark": forecast.watermark,
+                    "value": forecast.value.tolist(),
+                    "lower": forecast.lower.tolist(),
+                    "upper": forecast.upper.tolist(),
+                }
+                for asset_id, forecast in forecasts.items()
+            },
+            self.step
+        )
+
+    async def _load_shared(self, asset_ids: List[UUID], metric: str, watermark: float) -> Dict[UUID, Forecast]:
+        """Prophet forecasts another worker precomputed for ``watermark``, added to the local cache"""
+        keys = {self._shared_key(asset_id, metric): asset_id for asset_id in asset_ids}
+        found = {}
+        for key, document in (await cache.get_shared(list(keys))).items():
+            if document["watermark"] != watermark:
+                continue
+            forecast = Forecast(
+                "prophet",
+                watermark,
+                self.step,
+                np.asarray(document["value"]),
+                np.asarray(document["lower"]),
+                np.asarray(document["upper"])
+            )
+            self.cache.put((keys[key], metric, "prophet"), forecast)
+            found[keys[key]] = forecast
+        return found
+
+    async def forecast(
+        self,
+        db: AsyncSession,
+        asset_ids: List[UUID],
+        metric: str,
+        horizon: int,
+        model: str = "auto"
+    ) -> Dict[UUID, Forecast]:
+        """
+        Forecasts of ``horizon`` steps per asset; assets without data in the
+        history window are left out.
+
+        ``auto`` serves a precomputed Prophet forecast where one exists for
+        the current watermark and ETS otherwise, so it never waits for a
+        Prophet fit.
+        """
+        if model == "prophet" and not self.prophet_enabled:
+            raise ValueError("Prophet forecasting is not available")
+        if horizon > self.max_horizon:
+            raise ValueError(f"Horizon exceeds {self.max_horizon} steps")
+
+        watermark = current_watermark(step=self.step)
+        fallback = "ets" if model == "auto" else model
+        forecasts = {}
+        if model in ("auto", "prophet") and self.prophet_enabled:
+            local = {asset_id: self.cache.get((asset_id, metric, "prophet"), watermark) for asset_id in asset_ids}
+            forecasts = {asset_id: forecast for asset_id, forecast in local.items() if forecast is not None}
+            forecasts.update(await self._load_shared(
+                [asset_id for asset_id in asset_ids if asset_id not in forecasts], metric, watermark
+            ))
+        missing = []
+        for asset_id in asset_ids:
+            if asset_id in forecasts:
+                continue
+            # Local Prophet forecasts were looked up above
+            forecast = None if fallback == "prophet" else self.cache.get((asset_id, metric, fallback), watermark)
+            if forecast is None:
+                missing.append(asset_id)
+            else:
+                forecasts[asset_id] = forecast
+
+        if missing:
+            forecasts.update(await self._compute(db, missing, metric, fallback, watermark))
+        return {asset_id: forecast.head(horizon) for asset_id, forecast in forecasts.items()}
+
+    async def precompute(self, db: AsyncSession, metric: str) -> int:
+        """Refresh the baseline and, when enabled, Prophet forecasts of all active assets"""
+        result = await db.execute(select(Asset.id).where(Asset.status == "active"))
+        asset_ids = list(result.scalars())
+        watermark = current_watermark(step=self.step)
+        started = time.perf_counter()
+        computed = await self._compute(db, asset_ids, metric, "ets", watermark)
+        logger.info(
+            "Precomputed ets forecasts of %s for %d assets in %.1f s",
+            metric, len(computed), time.perf_counter() - started
+        )
+        if self.prophet_enabled:
+            started = time.perf_counter()
+            fitted = await self._compute(db, list(computed), metric, "prophet", watermark)
+            await self._share(metric, fitted)
+            logger.info(
+                "Precomputed prophet forecasts of %s for %d assets in %.1f s",
+                metric, len(fitted), time.perf_counter() - started
+            )
+        return len(computed)
+
+    def stats(self) -> Dict[str, object]:
+        return {
+            **self.cache.stats(),
+            "prophet_enabled": self.prophet_enabled,
+            "workers": settings.FORECAST_WORKERS,
+        }
+
+
+forecaster = ForecastService()
+
+
+async def run_precompute_loop():
+    """Recompute forecasts of the configured metrics after every completed step"""
+    from app.core.database import AsyncSessionLocal
+
+    while True:
+        try:
+            for metric in settings.FORECAST_PRECOMPUTE_METRICS:
+                async with AsyncSessionLocal() as db:
+                    await forecaster.precompute(db, metric)
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            logger.exception("Forecast precompute failed")
+        await asyncio.sleep(current_watermark(step=forecaster.step) + forecaster.step - time.time() + 1)
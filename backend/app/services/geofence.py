@@ -0,0 +1,239 @@
+"""
+Geofence enter/exit detection for moving assets.
+
+Zone polygons of each tenant are held in a shapely STRtree of prepared
+geometries. Readings that carry their own location (buses, plows, scooters)
+are evaluated per ingested batch: every point of the batch is tested against
+the tree in one vectorized ``STRtree.query`` call, and the resulting
+(reading, zone) memberships are compared with each asset's previous
+membership using integer codes, without a Python loop per reading.
+
+An asset's readings within a batch are applied in timestamp order, so an
+asset crossing a boundary and back within one batch produces both events.
+Readings no newer than the last one seen for the asset are ignored.
+
+Zones are reloaded every ``GEOFENCE_REFRESH_SECONDS`` to pick up changes
+made through other workers. Inside/outside state is per process.
+"""
+import asyncio
+import logging
+from typing import Any, Dict, List, NamedTuple, Optional, Sequence, Tuple
+from uuid import UUID
+
+import numpy as np
+import shapely
+from geoalchemy2.shape import to_shape
+from shapely.strtree import STRtree
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.models.zone import Zone
+
+logger = logging.getLogger(__name__)
+
+
+class GeofenceEvent(NamedTuple):
+    kind: str  # "enter" or "exit"
+    tenant_id: UUID
+    asset_id: UUID
+    zone_id: UUID
+    zone_name: str
+    timestamp: float  # epoch seconds
+    lng: float
+    lat: float
+
+
+class TenantZones:
+    """The zones of one tenant, indexed for batched point-in-polygon queries"""
+
+    def __init__(self, zones: Dict[UUID, Tuple[str, Any]]):
+        self.zones = zones
+        self.ids = list(zones)
+        self.names = [zones[zone_id][0] for zone_id in self.ids]
+        self.positions = {zone_id: i for i, zone_id in enumerate(self.ids)}
+        geometries = np.array([zones[zone_id][1] for zone_id in self.ids], dtype=object)
+        shapely.prepare(geometries)
+        self.tree = STRtree(geometries)
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def contains(self, lng: np.ndarray, lat: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """(point index, zone position) pairs for every point inside a zone"""
+        if not self.ids:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+        points, zones = self.tree.query(shapely.points(lng, lat), predicate="intersects")
+        return points.astype(np.int64), zones.astype(np.int64)
+
+
+class GeofenceEngine:
+    """Per-asset zone membership and the enter/exit transitions between readings"""
+
+    def __init__(self):
+        self.tenants: Dict[UUID, TenantZones] = {}
+        # asset -> (last reading time, zone set, positions of the zones it is inside)
+        self.state: Dict[UUID, Tuple[float, Optional[TenantZones], Tuple[int, ...]]] = {}
+        self.evaluated = 0
+        self.late = 0
+        self.events = 0
+
+    def zones(self, tenant_id: UUID) -> Optional[TenantZones]:
+        return self.tenants.get(tenant_id)
+
+    def _rebuild(self, tenant_id: UUID, zones: Dict[UUID, Tuple[str, Any]]):
+        if zones:
+            self.tenants[tenant_id] = TenantZones(zones)
+        else:
+            self.tenants.pop(tenant_id, None)
+
+    def set_zone(self, tenant_id: UUID, zone_id: UUID, name: str, boundary: Any):
+        current = self.tenants.get(tenant_id)
+        zones = dict(current.zones) if current is not None else {}
+        zones[zone_id] = (name, boundary)
+        self._rebuild(tenant_id, zones)
+
+    def remove_zone(self, tenant_id: UUID, zone_id: UUID):
+        current = self.tenants.get(tenant_id)
+        if current is None or zone_id not in current.zones:
+            return
+        zones = dict(current.zones)
+        del zones[zone_id]
+        self._rebuild(tenant_id, zones)
+
+    async def load(self, db: AsyncSession) -> int:
+        """Rebuild every tenant's zone tree from the database"""
+        result = await db.execute(select(Zone.id, Zone.tenant_id, Zone.name, Zone.boundary))
+        by_tenant: Dict[UUID, Dict[UUID, Tuple[str, Any]]] = {}
+        for zone_id, tenant_id, name, boundary in result:
+            by_tenant.setdefault(tenant_id, {})[zone_id] = (name, to_shape(boundary))
+        self.tenants = {tenant_id: TenantZones(zones) for tenant_id, zones in by_tenant.items()}
+        count = sum(len(zones) for zones in self.tenants.values())
+        logger.info("Loaded %d geofence zones for %d tenants", count, len(self.tenants))
+        return count
+
+    def observe(
+        self,
+        tenant_id: UUID,
+        asset_ids: Sequence[UUID],
+        timestamps: np.ndarray,
+        lng: np.ndarray,
+        lat: np.ndarray
+    ) -> List[GeofenceEvent]:
+        """Evaluate located readings of one tenant and return the resulting events"""
+        zones = self.tenants.get(tenant_id)
+        if zones is None or not len(asset_ids):
+            return []
+
+        # Local ids for the assets in this batch; drop readings older than the state
+        local: Dict[UUID, int] = {}
+        slots = np.fromiter(
+            (local.setdefault(asset_id, len(local)) for asset_id in asset_ids),
+            dtype=np.int64, count=len(asset_ids)
+        )
+        assets = list(local)
+        previous = [self.state.get(asset_id) for asset_id in assets]
+        seen = np.array([state[0] if state is not None else -np.inf for state in previous])
+        fresh = timestamps > seen[slots]
+        self.late += int((~fresh).sum())
+        if not fresh.any():
+            return []
+        readings = np.flatnonzero(fresh)
+        readings = readings[np.lexsort((timestamps[readings], slots[readings]))]
+        slots = slots[readings]
+        n = readings.size
+        self.evaluated += n
+
+        # Rows: one virtual row per asset holding its previous membership,
+        # followed by its readings in time order
+        first = np.ones(n, dtype=bool)
+        first[1:] = slots[1:] != slots[:-1]
+        group = np.cumsum(first) - 1
+        row = np.arange(n) + group + 1
+        virtual_row = row[first] - 1
+        last = np.ones(n, dtype=bool)
+        last[:-1] = first[1:]
+        last_row = row[last]
+
+        width = len(zones)
+        points, members = zones.contains(lng[readings], lat[readings])
+        previous_rows, previous_zones = [], []
+        for virtual, slot in zip(virtual_row.tolist(), slots[first].tolist()):
+            state = previous[slot]
+            if state is None or not state[2]:
+                continue
+            _, indexed, positions = state
+            if indexed is not zones:
+                # Zones were reloaded since: map positions through zone ids
+                positions = [zones.positions.get(indexed.ids[p]) for p in positions]
+            for position in positions:
+                if position is not None:
+                    previous_rows.append(virtual)
+                    previous_zones.append(position)
+        codes = np.unique(np.concatenate((
+            row[points] * width + members,
+            np.asarray(previous_rows, dtype=np.int64) * width + np.asarray(previous_zones, dtype=np.int64)
+        )))
+        code_rows, code_zones = np.divmod(codes, width)
+
+        # Enter: member at a row but not at the row before it (virtual rows have none before)
+        real = ~np.isin(code_rows, virtual_row)
+        entered = real & ~np.isin(codes - width, codes)
+        # Exit: member at a row but not at the next row of the same asset
+        final = np.isin(code_rows, last_row)
+        exited = ~final & ~np.isin(codes + width, codes)
+
+        reading_at_row = np.full(row[-1] + 1, -1, dtype=np.int64)
+        reading_at_row[row] = np.arange(n)
+        events = []
+        for kind, mask, offset in (("exit", exited, 1), ("enter", entered, 0)):
+            at = reading_at_row[code_rows[mask] + offset]
+            originals = readings[at]
+            for slot, zone, ts, x, y in zip(
+                slots[at].tolist(), code_zones[mask].tolist(), timestamps[originals].tolist(),
+                lng[originals].tolist(), lat[originals].tolist()
+            ):
+                events.append(GeofenceEvent(
+                    kind, tenant_id, assets[slot], zones.ids[zone], zones.names[zone], ts, x, y
+                ))
+        events.sort(key=lambda event: event.timestamp)
+
+        # Membership at each asset's last reading becomes its state
+        membership: Dict[int, List[int]] = {}
+        for code_row, zone in zip(code_rows[final].tolist(), code_zones[final].tolist()):
+            membership.setdefault(code_row, []).append(zone)
+        for slot, last_reading_row, ts in zip(
+            slots[last].tolist(), row[last].tolist(), timestamps[readings[last]].tolist()
+        ):
+            self.state[assets[slot]] = (ts, zones, tuple(membership.get(last_reading_row, ())))
+
+        self.events += len(events)
+        return events
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "tenants": len(self.tenants),
+            "zones": sum(len(zones) for zones in self.tenants.values()),
+            "assets_inside": sum(1 for state in self.state.values() if state[2]),
+            "evaluated": self.evaluated,
+            "late": self.late,
+            "events": self.events,
+        }
+
+
+geofence_engine = GeofenceEngine()
+
+
+async def run_zone_refresh_loop():
+    """Periodically reload zones so that changes from other workers are picked up"""
+    from app.core.database import AsyncSessionLocal
+
+    while True:
+        await asyncio.sleep(settings.GEOFENCE_REFRESH_SECONDS)
+        try:
+            async with AsyncSessionLocal() as db:
+                await geofence_engine.load(db)
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            logger.exception("Geofence zone refresh failed")
@@ -0,0 +1,371 @@
+"""
+Metric catalog and compact telemetry encoding.
+
+Every (asset type, metric name) pair gets a small integer id in
+``metric_catalog``, with its unit. A telemetry row stores its readings as
+two parallel byte strings instead of a JSON document: ``metric_ids`` holds
+little-endian uint16 catalog ids and ``metric_values`` float32 values, so a
+reading costs six bytes however long its name is, and the read path turns a
+whole column of rows into NumPy arrays without parsing anything.
+
+Ids are assigned on first use by whichever worker sees the pair first;
+the unique constraint makes concurrent assignment safe, and other workers
+pick the new ids up when they meet one they do not know. Ids assigned in a
+transaction are only cached once it commits, so a rolled back batch never
+leaves ids behind that the table does not have.
+
+Migrate rows written before the catalog existed (from the backend
+directory) with:
+    python -m app.services.metric_catalog
+"""
+import asyncio
+import logging
+import struct
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Set, Tuple
+from uuid import UUID
+
+import numpy as np
+from sqlalchemy import event, inspect, select, text, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.models.asset import Asset
+from app.models.metric import MetricDefinition
+from app.models.telemetry import TelemetryData
+
+logger = logging.getLogger(__name__)
+
+ID_DTYPE = np.dtype("<u2")
+VALUE_DTYPE = np.dtype("<f4")
+
+# Units for metric names that are common across asset types
+DEFAULT_UNITS = {
+    "pm25": "µg/m³",
+    "pm10": "µg/m³",
+    "no2": "ppb",
+    "o3": "ppb",
+    "co2": "ppm",
+    "aqi": None,
+    "temperature": "°C",
+    "humidity": "%",
+    "pressure": "hPa",
+    "noise": "dB",
+    "speed": "km/h",
+    "flow": "vehicles/h",
+    "occupancy": "%",
+    "battery": "%",
+    "voltage": "V",
+    "current": "A",
+    "power": "kW",
+    "energy": "kWh",
+    "water_level": "m",
+    "rainfall": "mm",
+}
+
+PENDING_KEY = "metric_catalog_pending"
+
+# Rows per transaction when migrating JSON rows
+MIGRATION_BATCH_SIZE = 5000
+
+# Columns added to an existing telemetry_data table by the migration (PostgreSQL)
+MIGRATION_DDL = (
+    "ALTER TABLE IF EXISTS telemetry_data ADD COLUMN IF NOT EXISTS metric_ids BYTEA",
+    "ALTER TABLE IF EXISTS telemetry_data ADD COLUMN IF NOT EXISTS metric_values BYTEA",
+    "ALTER TABLE IF EXISTS telemetry_data ALTER COLUMN metrics DROP NOT NULL",
+)
+
+
+def _is_number(value: Any) -> bool:
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def pack_readings(metric_ids: Sequence[int], values: Sequence[float]) -> Tuple[bytes, bytes]:
+    """Pack parallel ids and values into the row encoding"""
+    count = len(metric_ids)
+    try:
+        packed_values = struct.pack(f"<{count}f", *values)
+    except OverflowError:
+        # Beyond float32 range; NumPy stores those as infinity
+        packed_values = np.array(values, dtype=VALUE_DTYPE).tobytes()
+    return struct.pack(f"<{count}H", *metric_ids), packed_values
+
+
+class MetricCatalog:
+    """In-process copy of ``metric_catalog`` with encoding and decoding of telemetry rows"""
+
+    def __init__(self):
+        self.ids: Dict[Tuple[str, str], int] = {}
+        self.names: Dict[int, str] = {}
+        self.units: Dict[int, Optional[str]] = {}
+        self.by_name: Dict[str, List[int]] = {}
+        # Session.info key of the entries resolved in a session's open transaction
+        self.pending_key = (PENDING_KEY, id(self))
+
+    def _add(self, definition: MetricDefinition):
+        self.ids[(definition.asset_type, definition.name)] = definition.id
+        self.names[definition.id] = definition.name
+        self.units[definition.id] = definition.unit
+        ids = self.by_name.setdefault(definition.name, [])
+        if definition.id not in ids:
+            ids.append(definition.id)
+
+    async def load(self, db: AsyncSession):
+        """Load every catalog entry"""
+        result = await db.execute(select(MetricDefinition))
+        for definition in result.scalars():
+            self._add(definition)
+        logger.info("Metric catalog loaded with %d metrics", len(self.ids))
+
+    async def resolve(self, db: AsyncSession, pairs: Set[Tuple[str, str]]) -> Dict[Tuple[str, str], int]:
+        """
+        Ids of every (asset type, metric) pair, assigning ids to new ones.
+
+        New entries are usable in ``db``'s transaction right away and join
+        the shared catalog when it commits; a rollback discards them.
+        """
+        ids = self.ids
+        if all(pair in ids for pair in pairs):
+            return {pair: ids[pair] for pair in pairs}
+        missing = [pair for pair in pairs if pair not in ids and pair not in db.info.get(self.pending_key, {})]
+        if missing:
+            await self._assign(db, missing)
+        pending: Dict[Tuple[str, str], MetricDefinition] = db.info[self.pending_key]
+        return {pair: ids[pair] if pair in ids else pending[pair].id for pair in pairs}
+
+    async def _assign(self, db: AsyncSession, missing: List[Tuple[str, str]]):
+        statement = _insert_ignoring_existing(db).values([
+            {"asset_type": asset_type, "name": name, "unit": DEFAULT_UNITS.get(name)}
+            for asset_type, name in missing
+        ])
+        await db.execute(statement)
+        result = await db.execute(
+            select(MetricDefinition).where(
+                MetricDefinition.asset_type.in_({asset_type for asset_type, _ in missing})
+            )
+        )
+        session = db.sync_session
+        if not event.contains(session, "after_commit", self._commit_pending):
+            event.listen(session, "after_commit", self._commit_pending)
+            event.listen(session, "after_soft_rollback", self._discard_pending)
+        pending = db.info.setdefault(self.pending_key, {})
+        for definition in result.scalars():
+            pair = (definition.asset_type, definition.name)
+            if pair not in self.ids:
+                # A detached copy, readable after the session expires its objects
+                pending[pair] = MetricDefinition(
+                    id=definition.id, asset_type=definition.asset_type, name=definition.name, unit=definition.unit
+                )
+        logger.info("Assigned metric ids to %d new metrics", len(missing))
+
+    def _commit_pending(self, session: Session):
+        for definition in session.info.pop(self.pending_key, {}).values():
+            self._add(definition)
+
+    def _discard_pending(self, session: Session, previous_transaction):
+        session.info.pop(self.pending_key, None)
+
+    async def encode_rows(
+        self,
+        db: AsyncSession,
+        rows: List[Dict[str, Any]],
+        asset_types: Dict[UUID, str]
+    ) -> List[Dict[str, Any]]:
+        """
+        Insert rows with ``metrics`` replaced by ``metric_ids``/``metric_values``.
+
+        Non-numeric values cannot be encoded and stay in ``metrics``. The
+        input rows are left as they are for the post-insert steps.
+        """
+        ids = await self.resolve(db, {
+            (asset_types[row["asset_id"]], name)
+            for row in rows
+            for name, value in row["metrics"].items()
+            if _is_number(value)
+        })
+        encoded = []
+        for row in rows:
+            asset_type = asset_types[row["asset_id"]]
+            metric_ids, values, other = [], [], None
+            for name, value in row["metrics"].items():
+                if _is_number(value):
+                    metric_ids.append(ids[(asset_type, name)])
+                    values.append(value)
+                else:
+                    other = other or {}
+                    other[name] = value
+            metric_ids_bytes, values_bytes = pack_readings(metric_ids, values)
+            encoded.append({**row, "metrics": other, "metric_ids": metric_ids_bytes, "metric_values": values_bytes})
+        return encoded
+
+    async def ensure_known(self, db: AsyncSession, metric_ids: Iterable[int]):
+        """Reload the catalog if any of ``metric_ids`` was assigned by another worker since it was loaded"""
+        if any(int(metric_id) not in self.names for metric_id in metric_ids):
+            await self.load(db)
+
+    def ids_for(self, names: Iterable[str]) -> Dict[int, str]:
+        """Catalog ids of the given metric names, across asset types"""
+        return {metric_id: name for name in names for metric_id in self.by_name.get(name, ())}
+
+    async def decode(
+        self,
+        db: AsyncSession,
+        metric_ids: Sequence[Optional[bytes]],
+        metric_values: Sequence[Optional[bytes]],
+        documents: Sequence[Optional[dict]],
+        names: Optional[List[str]] = None
+    ) -> Dict[str, np.ndarray]:
+        """
+        One float64 array per metric over ``len(metric_ids)`` rows, NaN where
+        a row lacks the metric; only ``names`` when given.
+
+        The encoded columns are joined into one buffer each and viewed as
+        NumPy arrays without per-row decoding. ``documents`` are the JSON
+        ``metrics`` of the same rows and are only read for rows that have
+        not been migrated yet.
+        """
+        rows = len(metric_ids)
+        counts = np.fromiter(
+            (len(blob) if blob else 0 for blob in metric_ids), dtype=np.int64, count=rows
+        ) // ID_DTYPE.itemsize
+        ids = np.frombuffer(b"".join(blob for blob in metric_ids if blob), dtype=ID_DTYPE)
+        values = np.frombuffer(b"".join(blob for blob in metric_values if blob), dtype=VALUE_DTYPE)
+        row_index = np.repeat(np.arange(rows), counts)
+
+        present = np.unique(ids)
+        await self.ensure_known(db, present)
+
+        series: Dict[str, np.ndarray] = {}
+        if names is not None:
+            series = {name: np.full(rows, np.nan) for name in names}
+            wanted = self.ids_for(names)
+            present = [metric_id for metric_id in present if int(metric_id) in wanted]
+        for metric_id in present:
+            name = self.names.get(int(metric_id))
+            if name is None:
+                continue
+            column = series.get(name)
+            if column is None:
+                column = series[name] = np.full(rows, np.nan)
+            selected = ids == metric_id
+            column[row_index[selected]] = values[selected]
+
+        if None in metric_ids:
+            # Rows still in the JSON format
+            for row, blob in enumerate(metric_ids):
+                document = documents[row]
+                if blob is not None or not document:
+                    continue
+                for name, value in document.items():
+                    if not _is_number(value) or (names is not None and name not in series):
+                        continue
+                    column = series.get(name)
+                    if column is None:
+                        column = series[name] = np.full(rows, np.nan)
+                    column[row] = value
+        if names is None:
+            return {name: series[name] for name in sorted(series)}
+        return series
+
+
+def _migrate_sqlite_schema(connection):
+    """
+    SQLite equivalent of ``MIGRATION_DDL``.
+
+    SQLite cannot drop NOT NULL in place, so an old ``telemetry_data`` is
+    rebuilt: renamed, recreated from the model and copied over.
+    """
+    inspector = inspect(connection)
+    if not inspector.has_table(TelemetryData.__tablename__):
+        return
+    columns = {column["name"]: column for column in inspector.get_columns(TelemetryData.__tablename__)}
+    if "metric_ids" in columns and "metric_values" in columns and columns["metrics"]["nullable"]:
+        return
+    # Index names are schema-wide; free them for the new table
+    for index in inspector.get_indexes(TelemetryData.__tablename__):
+        connection.execute(text(f'DROP INDEX "{index["name"]}"'))
+    connection.execute(text("ALTER TABLE telemetry_data RENAME TO telemetry_data_old"))
+    TelemetryData.__table__.create(connection)
+    shared = ", ".join(f'"{name}"' for name in columns if name in TelemetryData.__table__.c)
+    connection.execute(text(f"INSERT INTO telemetry_data ({shared}) SELECT {shared} FROM telemetry_data_old"))
+    connection.execute(text("DROP TABLE telemetry_data_old"))
+
+
+def _insert_ignoring_existing(db: AsyncSession):
+    dialect = db.get_bind().dialect.name
+    if dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert as dialect_insert
+    elif dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert as dialect_insert
+    else:
+        raise NotImplementedError(f"Metric catalog inserts are not supported on {dialect}")
+    return dialect_insert(MetricDefinition).on_conflict_do_nothing(index_elements=["asset_type", "name"])
+
+
+metric_catalog = MetricCatalog()
+
+
+async def migrate_rows(db: AsyncSession, batch_size: int = MIGRATION_BATCH_SIZE) -> int:
+    """
+    Re-encode rows that still store their readings as JSON.
+
+    Works through the table in primary key order, one transaction per
+    ``batch_size`` rows, so it can be interrupted and resumed at any time
+    and runs next to live ingestion. Returns the number of rows migrated.
+    """
+    migrated = 0
+    last_id = None
+    while True:
+        query = select(TelemetryData.id, TelemetryData.asset_id, TelemetryData.metrics).where(
+            TelemetryData.metric_ids.is_(None) & TelemetryData.metrics.is_not(None)
+        )
+        if last_id is not None:
+            query = query.where(TelemetryData.id > last_id)
+        result = await db.execute(query.order_by(TelemetryData.id).limit(batch_size))
+        rows = [{"id": row_id, "asset_id": asset_id, "metrics": metrics} for row_id, asset_id, metrics in result]
+        if not rows:
+            break
+        last_id = rows[-1]["id"]
+
+        types = await db.execute(
+            select(Asset.id, Asset.type).where(Asset.id.in_({row["asset_id"] for row in rows}))
+        )
+        encoded = await metric_catalog.encode_rows(db, rows, dict(types.all()))
+        await db.execute(
+            update(TelemetryData),
+            [
+                {
+                    "id": row["id"],
+                    "metrics": row["metrics"],
+                    "metric_ids": row["metric_ids"],
+                    "metric_values": row["metric_values"],
+                }
+                for row in encoded
+            ]
+        )
+        await db.commit()
+        migrated += len(rows)
+        logger.info("Migrated %d telemetry rows to the compact encoding", migrated)
+    return migrated
+
+
+async def _migrate():
+    from app.core.database import AsyncSessionLocal, async_engine, close_db, init_db
+
+    async with async_engine.begin() as conn:
+        if conn.dialect.name == "postgresql":
+            for statement in MIGRATION_DDL:
+                await conn.execute(text(statement))
+        elif conn.dialect.name == "sqlite":
+            await conn.run_sync(_migrate_sqlite_schema)
+    # Creates metric_catalog and records the new schema version
+    await init_db()
+    async with AsyncSessionLocal() as db:
+        await metric_catalog.load(db)
+        migrated = await migrate_rows(db)
+    await close_db()
+    print(f"Migrated {migrated} telemetry rows")
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(_migrate())
@@ -0,0 +1,430 @@
+"""
+Continuous telemetry rollups.
+
+Every stored reading is folded into per-asset, per-metric buckets of one
+minute, fifteen minutes and one hour in ``telemetry_rollups``, each holding
+the count, sum, min, max and last value (with the time of the last
+reading). A batch is aggregated into buckets with NumPy and merged into the
+table with one upsert per resolution, in the transaction that stores the
+readings. All five aggregates merge exactly, so a late reading simply
+updates the older buckets it falls into.
+
+Batches that may contain readings that were stored before (telemetry log
+replays after a crash) would be counted twice by merging; for those, only
+the hours they touch are recomputed from the stored readings and
+overwritten.
+
+Range queries whose buckets are at least a minute wide read the coarsest
+rollup that is no wider than a bucket, plus raw readings for the partial
+rollup buckets at the edges of the window, and forecasts read the rollup
+matching their step.
+
+Build rollups for telemetry stored before they existed (from the backend
+directory) with:
+    python -m app.services.rollups --days 30
+"""
+import argparse
+import asyncio
+import logging
+import math
+from datetime import datetime, timezone
+from typing import Any, Dict, List, NamedTuple, Optional, Sequence, Tuple
+from uuid import UUID
+
+import numpy as np
+from sqlalchemy import case, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.models.rollup import TelemetryRollup
+from app.services.downsampling import bucket_merge
+from app.services.metric_catalog import ID_DTYPE, VALUE_DTYPE, metric_catalog
+from app.services.telemetry_query import load_series
+
+logger = logging.getLogger(__name__)
+
+# Bucket widths in seconds, finest first; each divides the next
+RESOLUTIONS = (60, 900, 3600)
+
+# Replayed batches are recomputed in whole buckets of the coarsest resolution
+RECOMPUTE_SECONDS = RESOLUTIONS[-1]
+
+PRIMARY_KEY = ["asset_id", "metric_id", "resolution", "bucket"]
+
+
+class Buckets(NamedTuple):
+    """Aggregated buckets as parallel arrays, sorted by asset, metric and bucket"""
+    asset: np.ndarray  # Position in the batch's sorted asset ids
+    metric: np.ndarray
+    bucket: np.ndarray  # Epoch seconds of the bucket start
+    count: np.ndarray
+    sum: np.ndarray
+    min: np.ndarray
+    max: np.ndarray
+    last: np.ndarray
+    last_at: np.ndarray
+
+
+def aggregate(
+    assets: np.ndarray,
+    metric_ids: np.ndarray,
+    timestamps: np.ndarray,
+    values: np.ndarray,
+    resolution: int
+) -> Buckets:
+    """
+    Aggregate flat (asset, metric, timestamp, value) readings into buckets
+    of ``resolution`` seconds; NaN values are skipped.
+    """
+    present = ~np.isnan(values)
+    if not present.all():
+        assets, metric_ids, timestamps, values = (
+            assets[present], metric_ids[present], timestamps[present], values[present]
+        )
+    buckets = np.floor(timestamps / resolution) * resolution
+    # Time is the innermost key, so the last reading of a bucket ends its run
+    order = np.lexsort((timestamps, buckets, metric_ids, assets))
+    assets, metric_ids, buckets = assets[order], metric_ids[order], buckets[order]
+    timestamps, values = timestamps[order], values[order]
+
+    if values.size == 0:
+        empty = np.empty(0)
+        return Buckets(*([empty.astype(np.int64)] * 2), *([empty] * 7))
+    boundary = np.r_[
+        True,
+        (assets[1:] != assets[:-1]) | (metric_ids[1:] != metric_ids[:-1]) | (buckets[1:] != buckets[:-1])
+    ]
+    starts = np.flatnonzero(boundary)
+    ends = np.r_[starts[1:], values.size] - 1
+    return Buckets(
+        asset=assets[starts],
+        metric=metric_ids[starts],
+        bucket=buckets[starts],
+        count=np.diff(np.r_[starts, values.size]),
+        sum=np.add.reduceat(values, starts),
+        min=np.minimum.reduceat(values, starts),
+        max=np.maximum.reduceat(values, starts),
+        last=values[ends],
+        last_at=timestamps[ends],
+    )
+
+
+def _flatten(rows: List[Dict[str, Any]]) -> Tuple[List[UUID], np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """Readings of encoded insert rows as flat arrays, with assets as positions in the sorted asset ids"""
+    asset_ids = sorted({row["asset_id"] for row in rows})
+    positions = {asset_id: i for i, asset_id in enumerate(asset_ids)}
+    counts = np.fromiter(
+        (len(row["metric_ids"]) for row in rows), dtype=np.int64, count=len(rows)
+    ) // ID_DTYPE.itemsize
+    row_assets = np.fromiter((positions[row["asset_id"]] for row in rows), dtype=np.int64, count=len(rows))
+    row_times = np.fromiter((row["timestamp"].timestamp() for row in rows), dtype=np.float64, count=len(rows))
+    metric_ids = np.frombuffer(b"".join(row["metric_ids"] for row in rows), dtype=ID_DTYPE).astype(np.int64)
+    values = np.frombuffer(b"".join(row["metric_values"] for row in rows), dtype=VALUE_DTYPE).astype(np.float64)
+    return asset_ids, np.repeat(row_assets, counts), metric_ids, np.repeat(row_times, counts), values
+
+
+def _upsert(db: AsyncSession, overwrite: bool):
+    """INSERT that merges into existing buckets, or replaces them with ``overwrite``"""
+    dialect = db.get_bind().dialect.name
+    if dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert as dialect_insert
+        least, greatest = func.least, func.greatest
+    elif dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert as dialect_insert
+        least, greatest = func.min, func.max
+    else:
+        raise NotImplementedError(f"Telemetry rollups are not supported on {dialect}")
+
+    statement = dialect_insert(TelemetryRollup)
+    new = statement.excluded
+    if overwrite:
+        values = {name: new[name] for name in ("count", "sum", "min", "max", "last", "last_at")}
+    else:
+        current = TelemetryRollup.__table__.c
+        values = {
+            "count": current["count"] + new["count"],
+            "sum": current["sum"] + new["sum"],
+            "min": least(current["min"], new["min"]),
+            "max": greatest(current["max"], new["max"]),
+            "last": case((new["last_at"] >= current["last_at"], new["last"]), else_=current["last"]),
+            "last_at": greatest(current["last_at"], new["last_at"]),
+        }
+    return statement.on_conflict_do_update(index_elements=PRIMARY_KEY, set_=values)
+
+
+async def _write(
+    db: AsyncSession,
+    asset_ids: Sequence[UUID],
+    assets: np.ndarray,
+    metric_ids: np.ndarray,
+    timestamps: np.ndarray,
+    values: np.ndarray,
+    overwrite: bool = False
+):
+    statement = _upsert(db, overwrite)
+    chunk_size = settings.TELEMETRY_INSERT_CHUNK_SIZE
+    # Every writer upserts in the same key order, so concurrent batches touching
+    # the same buckets wait for each other instead of deadlocking
+    for resolution in RESOLUTIONS:
+        buckets = aggregate(assets, metric_ids, timestamps, values, resolution)
+        records = [
+            {
+                "asset_id": asset_ids[asset],
+                "metric_id": metric_id,
+                "resolution": resolution,
+                "bucket": datetime.fromtimestamp(bucket, tz=timezone.utc),
+                "count": count,
+                "sum": total,
+                "min": low,
+                "max": high,
+                "last": last,
+                "last_at": datetime.fromtimestamp(last_at, tz=timezone.utc),
+            }
+            for asset, metric_id, bucket, count, total, low, high, last, last_at in zip(
+                *(column.tolist() for column in buckets)
+            )
+        ]
+        for start in range(0, len(records), chunk_size):
+            await db.execute(statement, records[start:start + chunk_size])
+
+
+async def recompute(db: AsyncSession, asset_id: UUID, asset_type: str, start: float, end: float):
+    """Rebuild the rollups of one asset for ``[start, end)`` (epoch seconds, whole hours) from its readings"""
+    timestamps, series = await load_series(
+        db, asset_id, datetime.fromtimestamp(start, tz=timezone.utc), datetime.fromtimestamp(end, tz=timezone.utc)
+    )
+    if not timestamps.size:
+        return
+    # Metrics compacted to cold storage before the catalog existed may be new to it
+    ids = await metric_catalog.resolve(db, {(asset_type, name) for name in series})
+    metric_ids = np.concatenate([
+        np.full(timestamps.size, ids[(asset_type, name)], dtype=np.int64) for name in series
+    ])
+    values = np.concatenate(list(series.values()))
+    times = np.tile(timestamps, len(series))
+    await _write(db, [asset_id], np.zeros(values.size, dtype=np.int64), metric_ids, times, values, overwrite=True)
+
+
+def _runs(spans: List[int]) -> List[Tuple[int, int]]:
+    """Collapse sorted span numbers into (first, last) runs of consecutive spans"""
+    runs = []
+    for span in spans:
+        if runs and span == runs[-1][1] + 1:
+            runs[-1] = (runs[-1][0], span)
+        else:
+            runs.append((span, span))
+    return runs
+
+
+async def update_rollups(
+    db: AsyncSession,
+    rows: List[Dict[str, Any]],
+    asset_types: Dict[UUID, str],
+    replay: bool = False
+):
+    """
+    Fold encoded insert rows into the rollups, inside the caller's transaction.
+
+    With ``replay`` some rows may have been counted already, so the hours
+    they fall in are recomputed instead of merged.
+    """
+    if not rows:
+        return
+    if not replay:
+        await _write(db, *_flatten(rows))
+        return
+
+    spans: Dict[UUID, set] = {}
+    for row in rows:
+        spans.setdefault(row["asset_id"], set()).add(int(row["timestamp"].timestamp() // RECOMPUTE_SECONDS))
+    for asset_id in sorted(spans):
+        for first, last in _runs(sorted(spans[asset_id])):
+            await recompute(
+                db, asset_id, asset_types[asset_id], first * RECOMPUTE_SECONDS, (last + 1) * RECOMPUTE_SECONDS
+            )
+
+
+def choose_resolution(width: float) -> Optional[int]:
+    """Coarsest rollup resolution no wider than ``width`` seconds"""
+    fitting = [resolution for resolution in RESOLUTIONS if resolution <= width]
+    return fitting[-1] if fitting else None
+
+
+def step_resolution(step: int) -> Optional[int]:
+    """Coarsest rollup resolution that divides ``step`` seconds"""
+    dividing = [resolution for resolution in RESOLUTIONS if step % resolution == 0]
+    return dividing[-1] if dividing else None
+
+
+async def load_rollups(
+    db: AsyncSession,
+    asset_ids: List[UUID],
+    metric_ids: Optional[List[int]],
+    resolution: int,
+    start: float,
+    end: float,
+    chunk_size: int = 1000
+) -> Tuple[np.ndarray, ...]:
+    """
+    Buckets of ``resolution`` starting in ``[start, end)`` (epoch seconds) as
+    flat (asset position, metric id, bucket start, count, sum, min, max)
+    arrays, ordered by asset, metric and bucket; all metrics when
+    ``metric_ids`` is None.
+    """
+    positions = {asset_id: i for i, asset_id in enumerate(asset_ids)}
+    window = (
+        (TelemetryRollup.resolution == resolution)
+        & (TelemetryRollup.bucket >= datetime.fromtimestamp(start, tz=timezone.utc))
+        & (TelemetryRollup.bucket < datetime.fromtimestamp(end, tz=timezone.utc))
+    )
+    if metric_ids is not None:
+        window = window & TelemetryRollup.metric_id.in_(metric_ids)
+
+    rows = []
+    for offset in range(0, len(asset_ids), chunk_size):
+        result = await db.execute(
+            select(
+                TelemetryRollup.asset_id,
+                TelemetryRollup.metric_id,
+                TelemetryRollup.bucket,
+                TelemetryRollup.count,
+                TelemetryRollup.sum,
+                TelemetryRollup.min,
+                TelemetryRollup.max
+            )
+            .where(TelemetryRollup.asset_id.in_(asset_ids[offset:offset + chunk_size]) & window)
+            .order_by(TelemetryRollup.asset_id, TelemetryRollup.metric_id, TelemetryRollup.bucket)
+        )
+        rows.extend(result.all())
+
+    count = len(rows)
+    if not count:
+        empty = np.empty(0)
+        return (empty.astype(np.int64),) * 2 + (empty,) * 5
+    assets, metrics, buckets, counts, sums, mins, maxs = zip(*rows)
+    return (
+        np.fromiter((positions[asset_id] for asset_id in assets), dtype=np.int64, count=count),
+        np.array(metrics, dtype=np.int64),
+        np.fromiter((bucket.timestamp() for bucket in buckets), dtype=np.float64, count=count),
+        np.array(counts, dtype=np.float64),
+        np.array(sums, dtype=np.float64),
+        np.array(mins, dtype=np.float64),
+        np.array(maxs, dtype=np.float64),
+    )
+
+
+async def downsample_from_rollups(
+    db: AsyncSession,
+    asset_id: UUID,
+    asset_type: str,
+    start: datetime,
+    end: datetime,
+    points: int,
+    metrics: Optional[List[str]] = None
+) -> Optional[Tuple[int, Dict[str, Dict[str, list]]]]:
+    """
+    ``minmax`` downsampling of ``[start, end)`` answered from rollups.
+
+    Uses the coarsest rollup no wider than the output buckets, with raw
+    readings for the partial rollup buckets at either end of the window, so
+    an output bucket boundary can be off by less than one rollup bucket.
+    Returns the number of readings covered and the series shaped like
+    ``downsample``, or None when the buckets are narrower than the finest
+    rollup.
+    """
+    start_ts, end_ts = start.timestamp(), end.timestamp()
+    resolution = choose_resolution((end_ts - start_ts) / points)
+    if resolution is None:
+        return None
+    first = math.ceil(start_ts / resolution) * resolution
+    last = math.floor(end_ts / resolution) * resolution
+    if first >= last:
+        return None
+
+    metric_ids = None
+    if metrics is not None:
+        metric_ids = [
+            metric_catalog.ids[(asset_type, name)] for name in metrics if (asset_type, name) in metric_catalog.ids
+        ]
+    _, ids, buckets, counts, sums, mins, maxs = await load_rollups(db, [asset_id], metric_ids, resolution, first, last)
+    await metric_catalog.ensure_known(db, np.unique(ids))
+
+    left = right = None
+    if start_ts < first:
+        left = await load_series(db, asset_id, start, datetime.fromtimestamp(first, tz=timezone.utc), metrics)
+    if last < end_ts:
+        right = await load_series(db, asset_id, datetime.fromtimestamp(last, tz=timezone.utc), end, metrics)
+    edges = [edge for edge in (left, right) if edge is not None]
+    if metrics is not None:
+        names = list(metrics)
+    else:
+        names = sorted(
+            {metric_catalog.names[int(metric_id)] for metric_id in np.unique(ids)}
+            | {name for _, series in edges for name in series}
+        )
+
+    def raw(edge, name):
+        if edge is None:
+            return None
+        timestamps, series = edge
+        values = series.get(name, np.full(timestamps.size, np.nan))
+        present = ~np.isnan(values)
+        values = values[present]
+        return timestamps[present], np.ones(values.size), values, values, values
+
+    output, covered = {}, 0
+    for name in names:
+        selected = ids == metric_catalog.ids.get((asset_type, name), -1)
+        rolled = (buckets[selected], counts[selected], sums[selected], mins[selected], maxs[selected])
+        # Left edge, rollup buckets, right edge: in time order
+        parts = [part for part in (raw(left, name), rolled, raw(right, name)) if part is not None]
+        merged = [np.concatenate(arrays) for arrays in zip(*parts)]
+        covered += int(merged[1].sum())
+        reduced = bucket_merge(*merged, start_ts, end_ts, points)
+        reduced["t"] = (reduced["t"] * 1000).astype(np.int64)
+        output[name] = {key: array.tolist() for key, array in reduced.items()}
+    return covered, output
+
+
+async def backfill(db: AsyncSession, days: int) -> int:
+    """Recompute the rollups of every asset with readings in the last ``days`` days"""
+    from app.models.asset import Asset
+    from app.models.telemetry import TelemetryData
+
+    end = math.ceil(datetime.now(timezone.utc).timestamp() / RECOMPUTE_SECONDS) * RECOMPUTE_SECONDS
+    start = end - days * 86400
+    result = await db.execute(
+        select(Asset.id, Asset.type).where(
+            Asset.id.in_(
+                select(TelemetryData.asset_id)
+                .where(TelemetryData.timestamp >= datetime.fromtimestamp(start, tz=timezone.utc))
+                .distinct()
+            )
+        )
+    )
+    assets = sorted(result.all())
+    for asset_id, asset_type in assets:
+        # One day at a time keeps the loaded readings small
+        for day_start in range(start, end, 86400):
+            await recompute(db, asset_id, asset_type, day_start, min(day_start + 86400, end))
+        await db.commit()
+    logger.info("Rebuilt rollups of %d assets over %d days", len(assets), days)
+    return len(assets)
+
+
+async def _backfill(days: int):
+    from app.core.database import AsyncSessionLocal, close_db, init_db
+
+    await init_db()
+    async with AsyncSessionLocal() as db:
+        await metric_catalog.load(db)
+        assets = await backfill(db, days)
+    await close_db()
+    print(f"Rebuilt rollups of {assets} assets")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Rebuild telemetry rollups from stored readings")
+    parser.add_argument("--days", type=int, default=30)
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(_backfill(parser.parse_args().days))
@@ -0,0 +1,272 @@
+"""
+In-process spatial index over asset locations.
+
+Each tenant gets a uniform lng/lat grid of ``SPATIAL_INDEX_CELL_DEGREES``
+cells, hashed by cell coordinates. Bounding-box, radius and k-nearest
+queries only touch the cells that can contain a match, and the grid can be
+updated in place as assets are created, moved or deleted.
+"""
+import asyncio
+import heapq
+import logging
+import math
+from typing import Dict, List, Optional, Tuple
+from uuid import UUID
+
+from geoalchemy2 import Geometry
+from sqlalchemy import cast, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.models.asset import Asset
+
+logger = logging.getLogger(__name__)
+
+EARTH_RADIUS_M = 6371008.8
+METERS_PER_DEGREE = math.pi * EARTH_RADIUS_M / 180
+
+Point = Tuple[float, float]
+
+
+def haversine_m(lng1: float, lat1: float, lng2: float, lat2: float) -> float:
+    """Great-circle distance in metres"""
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    dphi = phi2 - phi1
+    dlambda = math.radians(lng2 - lng1)
+    a = math.sin(dphi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(dlambda / 2) ** 2
+    return 2 * EARTH_RADIUS_M * math.asin(min(1.0, math.sqrt(a)))
+
+
+class TenantGrid:
+    """Grid of asset points for a single tenant"""
+
+    def __init__(self, cell_degrees: float):
+        self.cell_degrees = cell_degrees
+        self.cells: Dict[Tuple[int, int], Dict[UUID, Point]] = {}
+        self.points: Dict[UUID, Point] = {}
+        # Populated cell extent (min x, min y, max x, max y); only ever grows
+        self.extent: Optional[Tuple[int, int, int, int]] = None
+
+    def __len__(self) -> int:
+        return len(self.points)
+
+    def _cell(self, lng: float, lat: float) -> Tuple[int, int]:
+        return math.floor(lng / self.cell_degrees), math.floor(lat / self.cell_degrees)
+
+    def upsert(self, asset_id: UUID, lng: float, lat: float):
+        self.remove(asset_id)
+        self.points[asset_id] = (lng, lat)
+        x, y = self._cell(lng, lat)
+        self.cells.setdefault((x, y), {})[asset_id] = (lng, lat)
+        if self.extent is None:
+            self.extent = (x, y, x, y)
+        else:
+            x0, y0, x1, y1 = self.extent
+            self.extent = (min(x0, x), min(y0, y), max(x1, x), max(y1, y))
+
+    def remove(self, asset_id: UUID):
+        point = self.points.pop(asset_id, None)
+        if point is None:
+            return
+        cell = self._cell(*point)
+        members = self.cells.get(cell)
+        if members is not None:
+            members.pop(asset_id, None)
+            if not members:
+                del self.cells[cell]
+
+    def _scan(self, min_lng: float, min_lat: float, max_lng: float, max_lat: float):
+        """Yield (id, lng, lat) for points inside the box"""
+        x0, y0 = self._cell(min_lng, min_lat)
+        x1, y1 = self._cell(max_lng, max_lat)
+        if (x1 - x0 + 1) * (y1 - y0 + 1) > len(self.cells):
+            # Box covers more cells than are populated: walk the populated ones
+            candidates = (
+                members for (x, y), members in self.cells.items()
+                if x0 <= x <= x1 and y0 <= y <= y1
+            )
+        else:
+            candidates = (
+                self.cells[(x, y)]
+                for x in range(x0, x1 + 1)
+                for y in range(y0, y1 + 1)
+                if (x, y) in self.cells
+            )
+        for members in candidates:
+            for asset_id, (lng, lat) in members.items():
+                if min_lng <= lng <= max_lng and min_lat <= lat <= max_lat:
+                    yield asset_id, lng, lat
+
+    def bbox(
+        self,
+        min_lng: float,
+        min_lat: float,
+        max_lng: float,
+        max_lat: float,
+        limit: int
+    ) -> List[Tuple[UUID, float, float]]:
+        results = []
+        for match in self._scan(min_lng, min_lat, max_lng, max_lat):
+            results.append(match)
+            if len(results) >= limit:
+                break
+        return results
+
+    def radius(self, lng: float, lat: float, meters: float, limit: int) -> List[Tuple[UUID, float, float, float]]:
+        """Points within ``meters`` of (lng, lat), nearest first"""
+        dlat = meters / METERS_PER_DEGREE
+        dlng = dlat / max(math.cos(math.radians(lat)), 1e-6)
+        results = []
+        for asset_id, plng, plat in self._scan(lng - dlng, lat - dlat, lng + dlng, lat + dlat):
+            distance = haversine_m(lng, lat, plng, plat)
+            if distance <= meters:
+                results.append((asset_id, plng, plat, distance))
+        results.sort(key=lambda match: match[3])
+        return results[:limit]
+
+    def nearest(self, lng: float, lat: float, k: int) -> List[Tuple[UUID, float, float, float]]:
+        """
+        The ``k`` nearest points to (lng, lat).
+
+        Searches the borders of square rings of cells outward from the query
+        cell and stops once the k-th best distance is closer than any
+        unsearched cell or every point has been seen. Ranks every point
+        directly once the rings have visited more cells than there are points.
+        """
+        if not self.points:
+            return []
+        cx, cy = self._cell(lng, lat)
+        x0, y0, x1, y1 = self.extent
+        max_ring = max(abs(cx - x0), abs(cx - x1), abs(cy - y0), abs(cy - y1))
+        lng_scale = max(math.cos(math.radians(lat)), 1e-6)
+
+        # Rank candidates with an equirectangular approximation, which is
+        # accurate at city scale, and report haversine distances for the winners
+        def ranked(points):
+            for asset_id, (plng, plat) in points:
+                dx = (plng - lng) * lng_scale
+                dy = plat - lat
+                yield dx * dx + dy * dy, asset_id, plng, plat
+
+        best: List[Tuple[float, UUID, float, float]] = []
+        seen = 0
+        visited = 0
+        for ring in range(max_ring + 1):
+            visited += 8 * ring or 1
+            if visited > len(self.points):
+                # The rings now cost more cell lookups than ranking every point
+                best = list(ranked(self.points.items()))
+                break
+            for cell in _ring_cells(cx, cy, ring):
+                members = self.cells.get(cell)
+                if members:
+                    seen += len(members)
+                    best.extend(ranked(members.items()))
+            if seen >= len(self.points):
+                break
+            if len(best) >= k:
+                best = heapq.nsmallest(k, best, key=lambda match: match[0])
+                # Anything outside the searched square is at least this far away
+                reach = ring * self.cell_degrees * lng_scale
+                if best[-1][0] <= reach * reach:
+                    break
+        best = heapq.nsmallest(k, best, key=lambda match: match[0])
+        return [
+            (asset_id, plng, plat, haversine_m(lng, lat, plng, plat))
+            for _, asset_id, plng, plat in best
+        ]
+
+
+def _ring_cells(cx: int, cy: int, ring: int):
+    """Cells on the border of the square ``ring`` cells out from (cx, cy)"""
+    if ring == 0:
+        yield cx, cy
+        return
+    for x in range(cx - ring, cx + ring + 1):
+        yield x, cy - ring
+        yield x, cy + ring
+    for y in range(cy - ring + 1, cy + ring):
+        yield cx - ring, y
+        yield cx + ring, y
+
+
+class AssetSpatialIndex:
+    """Per-tenant spatial index of asset locations"""
+
+    def __init__(self, cell_degrees: float = settings.SPATIAL_INDEX_CELL_DEGREES):
+        self.cell_degrees = cell_degrees
+        self.tenants: Dict[UUID, TenantGrid] = {}
+        # Changes made while a reload is streaming, replayed onto the new grids
+        self._pending: Optional[List[Tuple]] = None
+
+    def grid(self, tenant_id: UUID) -> Optional[TenantGrid]:
+        return self.tenants.get(tenant_id)
+
+    def upsert(self, tenant_id: UUID, asset_id: UUID, lng: float, lat: float):
+        grid = self.tenants.get(tenant_id)
+        if grid is None:
+            grid = self.tenants[tenant_id] = TenantGrid(self.cell_degrees)
+        grid.upsert(asset_id, lng, lat)
+        if self._pending is not None:
+            self._pending.append((tenant_id, asset_id, lng, lat))
+
+    def remove(self, tenant_id: UUID, asset_id: UUID):
+        grid = self.tenants.get(tenant_id)
+        if grid is not None:
+            grid.remove(asset_id)
+        if self._pending is not None:
+            self._pending.append((tenant_id, asset_id, None, None))
+
+    async def load(self, db: AsyncSession, chunk_size: int = 10000) -> int:
+        """Rebuild the index from the assets table, streaming rows in chunks"""
+        geometry = cast(Asset.location, Geometry)
+        query = select(
+            Asset.tenant_id, Asset.id, func.ST_X(geometry), func.ST_Y(geometry)
+        ).execution_options(yield_per=chunk_size)
+
+        tenants: Dict[UUID, TenantGrid] = {}
+        count = 0
+        self._pending = []
+        try:
+            result = await db.stream(query)
+            async for tenant_id, asset_id, lng, lat in result:
+                grid = tenants.get(tenant_id)
+                if grid is None:
+                    grid = tenants[tenant_id] = TenantGrid(self.cell_degrees)
+                grid.upsert(asset_id, lng, lat)
+                count += 1
+
+            for tenant_id, asset_id, lng, lat in self._pending:
+                grid = tenants.setdefault(tenant_id, TenantGrid(self.cell_degrees))
+                if lng is None:
+                    grid.remove(asset_id)
+                else:
+                    grid.upsert(asset_id, lng, lat)
+        finally:
+            self._pending = None
+
+        # Swap in the rebuilt grids in one step so queries never see a partial index
+        self.tenants = tenants
+        logger.info("Spatial index loaded %d assets for %d tenants", count, len(tenants))
+        return count
+
+
+asset_index = AssetSpatialIndex()
+
+
+async def run_refresh_loop():
+    """
+    Periodically rebuild the index so that changes made through other
+    worker processes are picked up.
+    """
+    from app.core.database import AsyncSessionLocal
+
+    while True:
+        await asyncio.sleep(settings.SPATIAL_INDEX_REFRESH_SECONDS)
+        try:
+            async with AsyncSessionLocal() as db:
+                await asset_index.load(db)
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            logger.exception("Spatial index refresh failed")
@@ -0,0 +1,171 @@
+"""
+Time-range telemetry queries.
+
+Loads an asset's readings for a time window, from both the hot table and the
+columnar cold store, into NumPy arrays and reduces them to a bounded number
+of points per metric before they are serialized.
+"""
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+from uuid import UUID
+
+import numpy as np
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.telemetry import TelemetryData
+from app.services.cold_store import load_cold_series, merge_series
+from app.services.downsampling import bucket_aggregate, lttb
+from app.services.metric_catalog import metric_catalog
+
+
+def _epoch_column(dialect_name: str):
+    """Timestamp expression returning epoch seconds, computed in SQL where possible"""
+    if dialect_name == "postgresql":
+        return func.extract("epoch", TelemetryData.timestamp)
+    return TelemetryData.timestamp
+
+
+def _to_epoch(values: List) -> np.ndarray:
+    """Convert a column of epoch numbers or datetimes into float64 seconds"""
+    if values and isinstance(values[0], datetime):
+        return np.fromiter((value.timestamp() for value in values), dtype=np.float64, count=len(values))
+    return np.asarray(values, dtype=np.float64)
+
+
+async def _load_hot_series(
+    db: AsyncSession,
+    asset_id: UUID,
+    start: datetime,
+    end: datetime,
+    metrics: Optional[List[str]] = None
+) -> Tuple[np.ndarray, Dict[str, np.ndarray]]:
+    """
+    Load rows from ``telemetry_data`` in ``[start, end)``.
+
+    Readings come back as the compact catalog encoding and are decoded for
+    all rows at once; the JSON column is only non-null for rows that have
+    not been migrated.
+    """
+    window = (
+        (TelemetryData.asset_id == asset_id)
+        & (TelemetryData.timestamp >= start)
+        & (TelemetryData.timestamp < end)
+    )
+    epoch = _epoch_column(db.get_bind().dialect.name)
+
+    result = await db.execute(
+        select(epoch, TelemetryData.metric_ids, TelemetryData.metric_values, TelemetryData.metrics)
+        .where(window)
+        .order_by(TelemetryData.timestamp)
+    )
+    rows = result.all()
+    if not rows:
+        return np.empty(0), {name: np.empty(0) for name in metrics or ()}
+    epochs, metric_ids, metric_values, documents = zip(*rows)
+    series = await metric_catalog.decode(db, metric_ids, metric_values, documents, metrics)
+    return _to_epoch(list(epochs)), series
+
+
+async def load_series(
+    db: AsyncSession,
+    asset_id: UUID,
+    start: datetime,
+    end: datetime,
+    metrics: Optional[List[str]] = None
+) -> Tuple[np.ndarray, Dict[str, np.ndarray]]:
+    """
+    Load readings in ``[start, end)`` as a timestamp array and one float
+    array per metric, with NaN where a reading lacks the metric.
+
+    Compacted days are read from memory-mapped cold segments and merged with
+    the rows still in ``telemetry_data``.
+    """
+    parts = load_cold_series(asset_id, start, end, metrics)
+    parts.append(await _load_hot_series(db, asset_id, start, end, metrics))
+    return merge_series(parts, metrics)
+
+
+async def load_metric_readings(
+    db: AsyncSession,
+    asset_ids: List[UUID],
+    metric: str,
+    start: datetime,
+    end: datetime,
+    chunk_size: int = 1000
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Readings of one metric for many assets in ``[start, end)``, as flat
+    (series, timestamp, value) arrays where ``series`` is the position of the
+    asset in ``asset_ids``. Readings lacking the metric are dropped.
+
+    Hot rows are fetched with one query per ``chunk_size`` assets instead of
+    one per asset.
+    """
+    positions = {asset_id: i for i, asset_id in enumerate(asset_ids)}
+    series_parts, time_parts, value_parts = [], [], []
+
+    for asset_id, i in positions.items():
+        for timestamps, series in load_cold_series(asset_id, start, end, [metric]):
+            series_parts.append(np.full(timestamps.size, i, dtype=np.int64))
+            time_parts.append(timestamps)
+            value_parts.append(series[metric])
+
+    epoch = _epoch_column(db.get_bind().dialect.name)
+    for offset in range(0, len(asset_ids), chunk_size):
+        chunk = asset_ids[offset:offset + chunk_size]
+        result = await db.execute(
+            select(
+                TelemetryData.asset_id,
+                epoch,
+                TelemetryData.metric_ids,
+                TelemetryData.metric_values,
+                TelemetryData.metrics
+            ).where(
+                TelemetryData.asset_id.in_(chunk)
+                & (TelemetryData.timestamp >= start)
+                & (TelemetryData.timestamp < end)
+            )
+        )
+        rows = result.all()
+        if not rows:
+            continue
+        row_assets, epochs, metric_ids, metric_values, documents = zip(*rows)
+        decoded = await metric_catalog.decode(db, metric_ids, metric_values, documents, [metric])
+        series_parts.append(np.fromiter((positions[asset_id] for asset_id in row_assets), dtype=np.int64, count=len(rows)))
+        time_parts.append(_to_epoch(list(epochs)))
+        value_parts.append(decoded[metric])
+
+    if not series_parts:
+        return np.empty(0, dtype=np.int64), np.empty(0), np.empty(0)
+    series = np.concatenate(series_parts)
+    timestamps = np.concatenate(time_parts)
+    values = np.concatenate(value_parts)
+    present = ~np.isnan(values)
+    return series[present], timestamps[present], values[present]
+
+
+def downsample(
+    timestamps: np.ndarray,
+    series: Dict[str, np.ndarray],
+    start: datetime,
+    end: datetime,
+    points: int,
+    mode: str = "minmax"
+) -> Dict[str, Dict[str, list]]:
+    """
+    Reduce every metric to at most ``points`` points.
+
+    ``minmax`` returns per-bucket min/max/avg/count, which preserves spikes
+    for range charts; ``lttb`` returns the visually most significant raw
+    points. Bucket times are epoch milliseconds.
+    """
+    output = {}
+    for name, values in series.items():
+        if mode == "lttb":
+            reduced = lttb(timestamps, values, points)
+        else:
+            reduced = bucket_aggregate(timestamps, values, start.timestamp(), end.timestamp(), points)
+        reduced["t"] = (reduced["t"] * 1000).astype(np.int64)
+        output[name] = {key: array.tolist() for key, array in reduced.items()}
+    return output
@@ -0,0 +1,334 @@
+"""
+Telemetry ingestion service.
+
+Readings are decoded and validated in bulk, checked against known assets with
+a single lookup, and written with multi-row INSERT statements inside one
+transaction per batch.
+"""
+import json
+import logging
+import time
+import uuid
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Tuple
+from uuid import UUID
+
+import numpy as np
+from pydantic import TypeAdapter, ValidationError
+from sqlalchemy import insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.models.asset import Asset
+from app.models.telemetry import TelemetryData
+from app.schemas.telemetry import (
+    TelemetryBatchResult,
+    TelemetryDataCreate,
+    TelemetryRejection,
+)
+from app.services.alert_service import anomaly_alert, raise_alerts
+from app.services.anomaly_detector import anomaly_detector
+from app.services.geofence import geofence_engine
+from app.services.metric_catalog import metric_catalog
+from app.services.rollups import update_rollups
+from app.services.ws_hub import geofence_hub, telemetry_hub
+
+logger = logging.getLogger(__name__)
+
+# Cap on the number of per-row errors echoed back to the client
+MAX_REPORTED_ERRORS = 100
+
+# Maximum number of ids per IN (...) clause when checking assets
+ASSET_LOOKUP_CHUNK_SIZE = 1000
+
+_batch_adapter = TypeAdapter(List[TelemetryDataCreate])
+
+
+def decode_payload(body: bytes, ndjson: bool = False) -> Tuple[List[Any], Dict[int, str]]:
+    """
+    Decode a JSON array or NDJSON payload into raw records.
+
+    Unparseable NDJSON lines do not fail the batch: they are kept as ``None``
+    placeholders so that indices line up with the request, and reported in
+    the returned error map.
+    """
+    errors: Dict[int, str] = {}
+    
+    if not ndjson:
+        try:
+            records = json.loads(body)
+        except ValueError as e:
+            raise ValueError(f"Invalid JSON payload: {e}")
+        if not isinstance(records, list):
+            raise ValueError("Expected a JSON array of telemetry readings")
+        return records, errors
+    
+    records = []
+    for line in body.splitlines():
+        if not line.strip():
+            continue
+        try:
+            records.append(json.loads(line))
+        except ValueError as e:
+            errors[len(records)] = f"Invalid JSON: {e}"
+            records.append(None)
+    return records, errors
+
+
+def validate_records(
+    records: List[Any],
+    errors: Dict[int, str]
+) -> List[Tuple[int, TelemetryDataCreate]]:
+    """
+    Validate records in bulk, recording failures in ``errors``.
+
+    The whole batch is validated in one pass. When some rows fail, their
+    indices are collected from the validation error and the remaining rows
+    are validated again, so clean batches never take a per-row slow path.
+    """
+    pending = [i for i in range(len(records)) if i not in errors]
+    
+    while pending:
+        try:
+            readings = _batch_adapter.validate_python([records[i] for i in pending])
+        except ValidationError as exc:
+            failed = set()
+            for error in exc.errors():
+                position = error["loc"][0]
+                index = pending[position]
+                if index not in errors:
+                    field = ".".join(str(part) for part in error["loc"][1:]) or "reading"
+                    errors[index] = f"{field}: {error['msg']}"
+                failed.add(position)
+            pending = [index for position, index in enumerate(pending) if position not in failed]
+            continue
+        return list(zip(pending, readings))
+    
+    return []
+
+
+def _to_ewkt(reading: TelemetryDataCreate) -> Optional[str]:
+    """Convert an optional GeoPoint into EWKT for the geography column"""
+    if reading.location is None:
+        return None
+    lng, lat = reading.location.coordinates
+    return f"SRID={settings.DEFAULT_SRID};POINT({lng} {lat})"
+
+
+async def lookup_assets(db: AsyncSession, asset_ids: set) -> Dict[UUID, Tuple[UUID, Optional[str], str]]:
+    """Map the existing ``asset_ids`` to their (tenant_id, zone, asset type)"""
+    known = {}
+    ids = list(asset_ids)
+    for start in range(0, len(ids), ASSET_LOOKUP_CHUNK_SIZE):
+        chunk = ids[start:start + ASSET_LOOKUP_CHUNK_SIZE]
+        result = await db.execute(
+            select(Asset.id, Asset.tenant_id, Asset.properties["zone"].as_string(), Asset.type)
+            .where(Asset.id.in_(chunk))
+        )
+        known.update((asset_id, (tenant_id, zone, asset_type)) for asset_id, tenant_id, zone, asset_type in result)
+    return known
+
+
+async def _publish_latest(rows: List[Dict[str, Any]], assets: Dict[UUID, Tuple[UUID, Optional[str], str]]):
+    """
+    Push the latest reading per asset to live telemetry subscribers.
+
+    Clients only ever see the newest value per asset, so older readings in
+    the same batch are skipped before fan-out.
+    """
+    latest = {}
+    for row in rows:
+        current = latest.get(row["asset_id"])
+        if current is None or row["timestamp"] >= current["timestamp"]:
+            latest[row["asset_id"]] = row
+    for asset_id, row in latest.items():
+        tenant_id, zone, _ = assets[asset_id]
+        await telemetry_hub.publish(
+            tenant_id,
+            {
+                "sensor_id": str(asset_id),
+                "metrics": row["metrics"],
+                "timestamp": row["timestamp"].isoformat(),
+            },
+            key=asset_id,
+            asset_id=asset_id,
+            zone=zone
+        )
+
+
+async def _detect_anomalies(
+    db: AsyncSession,
+    rows: List[Dict[str, Any]],
+    assets: Dict[UUID, Tuple[UUID, Optional[str], str]]
+):
+    """Score the stored readings and raise alerts; never fails the batch"""
+    try:
+        anomalies = anomaly_detector.observe_rows(rows)
+        if not anomalies:
+            return
+        candidates = []
+        for anomaly in anomalies:
+            tenant_id, zone, _ = assets[anomaly.asset_id]
+            candidates.append(anomaly_alert(anomaly, tenant_id, zone, rows[anomaly.row]["location"]))
+        await raise_alerts(db, candidates)
+    except Exception:
+        await db.rollback()
+        logger.exception("Anomaly detection failed for a batch of %d rows", len(rows))
+
+
+async def _evaluate_geofences(
+    located: List[Tuple[UUID, Any, float, float]],
+    assets: Dict[UUID, Tuple[UUID, Optional[str], str]]
+):
+    """Push zone enter/exit events for readings that carry a location"""
+    by_tenant: Dict[UUID, List[Tuple[UUID, Any, float, float]]] = {}
+    for reading in located:
+        by_tenant.setdefault(assets[reading[0]][0], []).append(reading)
+    try:
+        for tenant_id, readings in by_tenant.items():
+            asset_ids, timestamps, lng, lat = zip(*readings)
+            events = geofence_engine.observe(
+                tenant_id,
+                asset_ids,
+                np.fromiter((ts.timestamp() for ts in timestamps), dtype=np.float64, count=len(timestamps)),
+                np.asarray(lng, dtype=np.float64),
+                np.asarray(lat, dtype=np.float64)
+            )
+            for event in events:
+                await geofence_hub.publish(
+                    tenant_id,
+                    {
+                        "event": event.kind,
+                        "asset_id": str(event.asset_id),
+                        "zone_id": str(event.zone_id),
+                        "zone_name": event.zone_name,
+                        "location": {"lng": event.lng, "lat": event.lat},
+                        "timestamp": datetime.fromtimestamp(event.timestamp, tz=timezone.utc).isoformat(),
+                    },
+                    asset_id=event.asset_id,
+                    zone=event.zone_name
+                )
+    except Exception:
+        logger.exception("Geofence evaluation failed for a batch of %d located readings", len(located))
+
+
+def build_rows(
+    valid: List[Tuple[int, TelemetryDataCreate]],
+    known: Dict[UUID, Tuple[UUID, Optional[str], str]],
+    errors: Dict[int, str]
+) -> Tuple[List[Dict[str, Any]], List[Tuple[UUID, Any, float, float]]]:
+    """Insert rows for readings of known assets, plus (asset, time, lng, lat) for located ones"""
+    rows = []
+    located = []
+    for index, reading in valid:
+        if reading.asset_id not in known:
+            errors[index] = f"asset_id: unknown asset {reading.asset_id}"
+            continue
+        rows.append({
+            "id": uuid.uuid4(),
+            "asset_id": reading.asset_id,
+            "timestamp": reading.timestamp,
+            "metrics": reading.metrics,
+            "location": _to_ewkt(reading),
+            "tags": reading.tags or {},
+        })
+        if reading.location is not None:
+            located.append((reading.asset_id, reading.timestamp, *reading.location.coordinates[:2]))
+    return rows, located
+
+
+def _insert_statement(db: AsyncSession, skip_existing: bool):
+    """Plain multi-row INSERT, or one that ignores rows whose id is already stored"""
+    if not skip_existing:
+        return insert(TelemetryData)
+    dialect = db.get_bind().dialect.name
+    if dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert as dialect_insert
+    elif dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert as dialect_insert
+    else:
+        raise NotImplementedError(f"Idempotent telemetry inserts are not supported on {dialect}")
+    return dialect_insert(TelemetryData).on_conflict_do_nothing(index_elements=["id"])
+
+
+async def store_rows(
+    db: AsyncSession,
+    rows: List[Dict[str, Any]],
+    located: List[Tuple[UUID, Any, float, float]],
+    known: Dict[UUID, Tuple[UUID, Optional[str], str]],
+    skip_existing: bool = False
+):
+    """
+    Insert rows in one transaction, then fan out live updates, anomaly
+    detection and geofence events.
+
+    Rows are inserted in chunks of ``TELEMETRY_INSERT_CHUNK_SIZE`` through
+    executemany, which SQLAlchemy renders as multi-row INSERT ... VALUES
+    statements, with readings in the compact encoding of the metric catalog,
+    and folded into the rollups in the same transaction. With
+    ``skip_existing`` rows whose id is already stored are ignored and the
+    rollups they touch are recomputed, which makes replaying the same rows
+    harmless.
+    """
+    statement = _insert_statement(db, skip_existing)
+    chunk_size = settings.TELEMETRY_INSERT_CHUNK_SIZE
+    try:
+        asset_types = {asset_id: asset_type for asset_id, (_, _, asset_type) in known.items()}
+        encoded = await metric_catalog.encode_rows(db, rows, asset_types)
+        for start in range(0, len(encoded), chunk_size):
+            await db.execute(statement, encoded[start:start + chunk_size])
+        if settings.TELEMETRY_ROLLUPS_ENABLED:
+            await update_rollups(db, encoded, asset_types, replay=skip_existing)
+        await db.commit()
+    except Exception:
+        await db.rollback()
+        logger.exception("Telemetry batch insert failed (%d rows)", len(rows))
+        raise
+    
+    # The rows are committed: nothing after this point may fail the batch
+    try:
+        await _publish_latest(rows, known)
+    except Exception:
+        logger.exception("Live telemetry publish failed for a batch of %d rows", len(rows))
+    if settings.ANOMALY_DETECTION_ENABLED:
+        await _detect_anomalies(db, rows, known)
+    if settings.GEOFENCE_ENABLED and located:
+        await _evaluate_geofences(located, known)
+
+
+async def ingest_batch(
+    db: AsyncSession,
+    records: List[Any],
+    errors: Optional[Dict[int, str]] = None
+) -> TelemetryBatchResult:
+    """
+    Validate and persist a batch of telemetry readings.
+
+    Readings of unknown assets are rejected; the rest are written as a
+    single transaction by ``store_rows``.
+    """
+    started = time.perf_counter()
+    errors = dict(errors or {})
+    
+    valid = validate_records(records, errors)
+    
+    known = await lookup_assets(db, {reading.asset_id for _, reading in valid})
+    rows, located = build_rows(valid, known, errors)
+    await store_rows(db, rows, located, known)
+    
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    logger.debug("Ingested %d telemetry rows in %.1f ms", len(rows), elapsed_ms)
+    
+    return batch_result(len(rows), errors, elapsed_ms)
+
+
+def batch_result(accepted: int, errors: Dict[int, str], elapsed_ms: float) -> TelemetryBatchResult:
+    return TelemetryBatchResult(
+        accepted=accepted,
+        rejected=len(errors),
+        errors=[
+            TelemetryRejection(index=index, error=message)
+            for index, message in sorted(errors.items())[:MAX_REPORTED_ERRORS]
+        ],
+        elapsed_ms=round(elapsed_ms, 3)
+    )
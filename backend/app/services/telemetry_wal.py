@@ -0,0 +1,213 @@
+"""
+Write-ahead log in front of telemetry persistence.
+
+With ``TELEMETRY_WAL_ENABLED`` the ingest endpoint validates a batch, appends
+the valid readings to this worker's event log as one record and answers as
+soon as the record is on disk (one group fsync, at most
+``TELEMETRY_WAL_FSYNC_INTERVAL_MS`` later), so a slow or unavailable
+database no longer pushes back on sensors. The normalizer drains the log
+into ``telemetry_data``, up to ``TELEMETRY_WAL_DRAIN_BATCH_BYTES`` of
+records per transaction, checkpointing after each commit, and then runs the
+usual post-insert steps (live updates, anomaly detection, geofences).
+
+Readings get their ids when they are logged, and records that may have been
+stored already are inserted with ON CONFLICT DO NOTHING (and their rollups
+recomputed): records logged before the process opened the log, records of
+a worker that is gone, and records retried after a pass that failed before
+its checkpoint. Replaying them stores nothing twice. The unknown-asset
+check needs the database, so it moves to the normalizer: such readings are
+dropped there and counted instead of being rejected in the response.
+"""
+import asyncio
+import logging
+import time
+import uuid
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import orjson
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.schemas.telemetry import TelemetryBatchResult, TelemetryDataCreate
+from app.services.event_log import EventLog
+from app.services.telemetry_service import batch_result, lookup_assets, store_rows, validate_records
+
+logger = logging.getLogger(__name__)
+
+
+class LogFullError(Exception):
+    """The undrained backlog has reached ``TELEMETRY_WAL_MAX_BYTES``"""
+
+
+def encode_readings(valid: List[Tuple[int, TelemetryDataCreate]]) -> bytes:
+    """One log record for a batch: [id, asset, timestamp, metrics, lng, lat, tags] per reading"""
+    # A random prefix per batch and the position within it: unique without a uuid4() per reading
+    prefix = uuid.uuid4().hex[:24]
+    entries = []
+    for index, (_, reading) in enumerate(valid):
+        lng, lat = reading.location.coordinates[:2] if reading.location is not None else (None, None)
+        entries.append((
+            f"{prefix}{index:08x}", reading.asset_id, reading.timestamp, reading.metrics, lng, lat, reading.tags or {}
+        ))
+    return orjson.dumps(entries)
+
+
+def decode_readings(payload: bytes) -> List[Dict[str, Any]]:
+    """Insert rows for a logged batch"""
+    rows = []
+    for row_id, asset_id, timestamp, metrics, lng, lat, tags in orjson.loads(payload):
+        rows.append({
+            "id": uuid.UUID(row_id),
+            "asset_id": uuid.UUID(asset_id),
+            "timestamp": datetime.fromisoformat(timestamp),
+            "metrics": metrics,
+            "location": f"SRID={settings.DEFAULT_SRID};POINT({lng} {lat})" if lng is not None else None,
+            "tags": tags,
+            "lnglat": (lng, lat) if lng is not None else None,
+        })
+    return rows
+
+
+class TelemetryWAL:
+    """This worker's telemetry event log and its normalizer"""
+
+    def __init__(self):
+        self.log: Optional[EventLog] = None
+        # Logs of workers that are gone, drained before our own
+        self.orphans: List[EventLog] = []
+        self.logged_batches = 0
+        self.logged_readings = 0
+        self.stored_readings = 0
+        self.dropped_unknown = 0
+        self.corrupt_records = 0
+        self.failures = 0
+        # (log, offset) of the last pass that was not checkpointed, if any
+        self.attempted: Optional[Tuple[EventLog, int]] = None
+
+    def open(self):
+        root = Path(settings.TELEMETRY_WAL_PATH)
+        self.log = EventLog.claim(
+            root,
+            settings.TELEMETRY_WAL_SEGMENT_BYTES,
+            settings.TELEMETRY_WAL_FSYNC_INTERVAL_MS / 1000
+        )
+        if self.log is None:
+            raise RuntimeError(f"No free telemetry log slot under {root}")
+        self.log.start()
+        self.orphans = EventLog.orphans(root, settings.TELEMETRY_WAL_SEGMENT_BYTES, exclude=(self.log.directory,))
+        logger.info(
+            "Telemetry log %s opened (%d bytes to replay, %d orphaned logs)",
+            self.log.directory.name, self.log.backlog, len(self.orphans)
+        )
+
+    async def close(self):
+        for log in self.orphans:
+            log.close_files()
+        self.orphans = []
+        if self.log is not None:
+            await self.log.close()
+            self.log = None
+
+    async def append(self, valid: List[Tuple[int, TelemetryDataCreate]]):
+        """Log validated readings and wait until they are durable"""
+        if self.log.backlog >= settings.TELEMETRY_WAL_MAX_BYTES:
+            raise LogFullError(f"Telemetry backlog of {self.log.backlog} bytes is not draining")
+        offset = self.log.append(encode_readings(valid))
+        self.logged_batches += 1
+        self.logged_readings += len(valid)
+        await self.log.wait_durable(offset)
+
+    async def drain_once(self, db: AsyncSession) -> bool:
+        """Store one batch from the oldest log with a backlog; False when there is nothing to do"""
+        while self.orphans and not self.orphans[0].backlog:
+            finished = self.orphans.pop(0)
+            logger.info("Orphaned telemetry log %s drained", finished.directory.name)
+            finished.close_files()
+        log = self.orphans[0] if self.orphans else self.log
+        if log is None:
+            return False
+        records, end = log.read(log.committed, settings.TELEMETRY_WAL_DRAIN_BATCH_BYTES)
+        if not records:
+            return False
+
+        rows = []
+        for payload in records:
+            try:
+                rows.extend(decode_readings(payload))
+            except (ValueError, TypeError) as e:
+                # The CRC matched, so retrying will not help; skip it
+                self.corrupt_records += 1
+                logger.error("Skipping undecodable telemetry log record: %s", e)
+
+        known = await lookup_assets(db, {row["asset_id"] for row in rows})
+        stored, located = [], []
+        for row in rows:
+            lnglat = row.pop("lnglat")
+            if row["asset_id"] not in known:
+                self.dropped_unknown += 1
+                continue
+            stored.append(row)
+            if lnglat is not None:
+                located.append((row["asset_id"], row["timestamp"], *lnglat))
+
+        # Records logged before this process opened the log, or a retry of a
+        # pass that failed after its commit, may have been stored already
+        replay = (
+            log is not self.log
+            or log.committed < log.recovered
+            or self.attempted == (log, log.committed)
+        )
+        self.attempted = (log, log.committed)
+        await store_rows(db, stored, located, known, skip_existing=replay)
+        await asyncio.to_thread(log.checkpoint, end)
+        self.attempted = None
+        self.stored_readings += len(stored)
+        return True
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "slot": self.log.directory.name if self.log else None,
+            "backlog_bytes": self.log.backlog if self.log else 0,
+            "orphaned_backlog_bytes": sum(log.backlog for log in self.orphans),
+            "segments": len(self.log.segments) if self.log else 0,
+            "syncs": self.log.syncs if self.log else 0,
+            "logged_batches": self.logged_batches,
+            "logged_readings": self.logged_readings,
+            "stored_readings": self.stored_readings,
+            "dropped_unknown_assets": self.dropped_unknown,
+            "corrupt_records": self.corrupt_records,
+            "failures": self.failures,
+        }
+
+
+telemetry_wal = TelemetryWAL()
+
+
+async def log_batch(records: List[Any], errors: Optional[Dict[int, str]] = None) -> TelemetryBatchResult:
+    """Validate a batch and acknowledge it once it is durable in the log"""
+    started = time.perf_counter()
+    errors = dict(errors or {})
+    valid = validate_records(records, errors)
+    if valid:
+        await telemetry_wal.append(valid)
+    return batch_result(len(valid), errors, (time.perf_counter() - started) * 1000)
+
+
+async def run_normalizer_loop():
+    """Drain the telemetry log into the database, backing off while it fails"""
+    from app.core.database import AsyncSessionLocal
+
+    idle = settings.TELEMETRY_WAL_DRAIN_INTERVAL_MS / 1000
+    delay = idle
+    while True:
+        try:
+            async with AsyncSessionLocal() as db:
+                busy = await telemetry_wal.drain_once(db)
+            delay = 0 if busy else idle
+        except Exception:
+            telemetry_wal.failures += 1
+            delay = min(max(delay * 2, idle), 30)
+            logger.exception("Telemetry normalizer failed, retrying in %.1fs", delay)
+        await asyncio.sleep(delay)
@@ -0,0 +1,214 @@
+"""
+WebSocket fan-out hubs for live alerts, telemetry and geofence events.
+
+Each hub keeps its subscribers indexed by tenant. A subscriber may narrow
+its subscription to specific assets and zones. Every subscriber owns a
+bounded queue of pending messages keyed by a coalescing key (the asset for
+telemetry), so a slow client only ever receives the latest value per key
+and memory per connection stays bounded. Messages are serialized once per
+publish, not once per client.
+
+When Redis is reachable, publishes go through a Redis channel per hub so
+that clients connected to any worker receive them.
+"""
+import asyncio
+import json
+import logging
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, Optional, Set
+from uuid import UUID, uuid4
+
+from fastapi import WebSocket
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class Subscriber:
+    """A connected client and its pending messages"""
+
+    def __init__(
+        self,
+        websocket: WebSocket,
+        tenant_id: UUID,
+        assets: Optional[Set[str]] = None,
+        zones: Optional[Set[str]] = None,
+        max_pending: int = settings.WS_CLIENT_QUEUE_SIZE
+    ):
+        self.websocket = websocket
+        self.tenant_id = tenant_id
+        self.assets = assets or set()
+        self.zones = zones or set()
+        self.max_pending = max_pending
+        self.pending: "OrderedDict[Any, str]" = OrderedDict()
+        self.ready = asyncio.Event()
+        self.coalesced = 0
+        self.dropped = 0
+
+    def wants(self, asset_id: Optional[str], zone: Optional[str]) -> bool:
+        """Whether a message for this asset/zone matches the subscription"""
+        if not self.assets and not self.zones:
+            return True
+        return (asset_id is not None and asset_id in self.assets) or (
+            zone is not None and zone in self.zones
+        )
+
+    def enqueue(self, key: Any, payload: str):
+        """Queue a message, replacing any unsent message with the same key"""
+        if key in self.pending:
+            self.coalesced += 1
+            self.pending[key] = payload
+        else:
+            self.pending[key] = payload
+            if len(self.pending) > self.max_pending:
+                self.pending.popitem(last=False)
+                self.dropped += 1
+        self.ready.set()
+
+    async def send_loop(self, heartbeat_interval: float):
+        """Drain pending messages to the client, sending heartbeats when idle"""
+        while True:
+            try:
+                await asyncio.wait_for(self.ready.wait(), timeout=heartbeat_interval)
+            except asyncio.TimeoutError:
+                await self.websocket.send_text(json.dumps({"type": "heartbeat"}))
+                continue
+            self.ready.clear()
+            if self.dropped:
+                dropped, self.dropped = self.dropped, 0
+                await self.websocket.send_text(json.dumps({"type": "overflow", "dropped": dropped}))
+            while self.pending:
+                _, payload = self.pending.popitem(last=False)
+                await self.websocket.send_text(payload)
+
+
+class Hub:
+    """Fan-out hub for one message type (e.g. alerts or telemetry)"""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.subscribers: Dict[UUID, Set[Subscriber]] = {}
+        self.published = 0
+
+    @property
+    def connections(self) -> int:
+        return sum(len(subscribers) for subscribers in self.subscribers.values())
+
+    def add(self, subscriber: Subscriber):
+        self.subscribers.setdefault(subscriber.tenant_id, set()).add(subscriber)
+
+    def remove(self, subscriber: Subscriber):
+        subscribers = self.subscribers.get(subscriber.tenant_id)
+        if subscribers is not None:
+            subscribers.discard(subscriber)
+            if not subscribers:
+                del self.subscribers[subscriber.tenant_id]
+
+    def dispatch(
+        self,
+        tenant_id: UUID,
+        payload: str,
+        key: Any,
+        asset_id: Optional[str] = None,
+        zone: Optional[str] = None
+    ):
+        """Queue an already-serialized message for matching local subscribers"""
+        self.published += 1
+        for subscriber in self.subscribers.get(tenant_id, ()):
+            if subscriber.wants(asset_id, zone):
+                subscriber.enqueue(key, payload)
+
+    async def publish(
+        self,
+        tenant_id: UUID,
+        data: Dict[str, Any],
+        key: Any = None,
+        asset_id: Optional[UUID] = None,
+        zone: Optional[str] = None
+    ):
+        """
+        Publish a message to the hub's subscribers in every worker.
+
+        Messages sharing a ``key`` coalesce in slow clients' queues; without
+        a key every message is delivered (subject to the queue bound).
+        """
+        asset = str(asset_id) if asset_id is not None else None
+        payload = json.dumps({"type": self.name, "data": data}, default=str)
+        if key is None:
+            # Unique across workers, so unkeyed messages never replace each other
+            key = uuid4().hex
+        await hub_bridge.publish(self, tenant_id, payload, key, asset, zone)
+
+    def stats(self) -> Dict[str, int]:
+        subscribers = [s for group in self.subscribers.values() for s in group]
+        return {
+            "connections": len(subscribers),
+            "published": self.published,
+            "pending": sum(len(s.pending) for s in subscribers),
+            "coalesced": sum(s.coalesced for s in subscribers),
+        }
+
+
+class HubBridge:
+    """Relays publishes between workers through Redis pub/sub when available"""
+
+    CHANNEL_PREFIX = "civitasiq:ws:"
+
+    def __init__(self, hubs: Iterable[Hub]):
+        self.hubs = {hub.name: hub for hub in hubs}
+        self._redis = None
+        self._listener: Optional[asyncio.Task] = None
+
+    async def start(self):
+        try:
+            import redis.asyncio as redis
+
+            client = redis.from_url(
+                settings.REDIS_URL,
+                db=settings.REDIS_DB,
+                decode_responses=True,
+                socket_connect_timeout=1
+            )
+            await client.ping()
+        except Exception as e:
+            logger.warning(f"Redis unavailable, WebSocket fan-out is local to this worker: {e}")
+            return
+        self._redis = client
+        pubsub = client.pubsub()
+        await pubsub.subscribe(*(self.CHANNEL_PREFIX + name for name in self.hubs))
+        self._listener = asyncio.create_task(self._listen(pubsub))
+
+    async def stop(self):
+        if self._listener is not None:
+            self._listener.cancel()
+            await asyncio.gather(self._listener, return_exceptions=True)
+        if self._redis is not None:
+            await self._redis.close()
+
+    async def publish(self, hub: Hub, tenant_id: UUID, payload: str, key: Any, asset: Optional[str], zone: Optional[str]):
+        if self._redis is None:
+            hub.dispatch(tenant_id, payload, key, asset, zone)
+            return
+        envelope = json.dumps([str(tenant_id), payload, str(key), asset, zone])
+        await self._redis.publish(self.CHANNEL_PREFIX + hub.name, envelope)
+
+    async def _listen(self, pubsub):
+        async for message in pubsub.listen():
+            if message["type"] != "message":
+                continue
+            hub = self.hubs.get(message["channel"][len(self.CHANNEL_PREFIX):])
+            if hub is None:
+                continue
+            tenant_id, payload, key, asset, zone = json.loads(message["data"])
+            hub.dispatch(UUID(tenant_id), payload, key, asset, zone)
+
+
+alert_hub = Hub("alert")
+telemetry_hub = Hub("telemetry")
+geofence_hub = Hub("geofence")
+hub_bridge = HubBridge([alert_hub, telemetry_hub, geofence_hub])
+
+
+def total_connections() -> int:
+    return alert_hub.connections + telemetry_hub.connections + geofence_hub.connections
@@ -0,0 +1,121 @@
+"""
+Sync vs async session concurrency benchmark.
+
+Drives the incidents listing query from concurrent coroutines, the way
+``async def`` endpoints run inside one worker, once through the blocking
+``Session`` and once through ``AsyncSession``. For each concurrency level it
+reports throughput and p50/p99 latency, then the highest concurrency each
+mode sustains within the p99 budget.
+
+Usage (from the backend directory):
+    python -m benchmarks.async_sessions --db-latency-ms 5 --p99-budget-ms 100
+"""
+import argparse
+import asyncio
+import sys
+import time
+
+from sqlalchemy import create_engine, select, text
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.core.config import settings
+from app.core.database import get_async_database_url
+from app.core.pagination import keyset_order
+from app.models.incident import Incident
+from benchmarks.common import summarize
+
+CONCURRENCY_LEVELS = (1, 4, 16, 64, 128, 256)
+
+
+def build_statements(database_url, db_latency_ms):
+    """Incident page query, optionally preceded by a server-side delay on Postgres"""
+    page = select(Incident).order_by(*keyset_order(Incident)).limit(20)
+    delay = None
+    if db_latency_ms and database_url.startswith("postgresql"):
+        delay = text("SELECT pg_sleep(:seconds)").bindparams(seconds=db_latency_ms / 1000)
+    return delay, page
+
+
+async def drive(request, concurrency, duration):
+    """Run ``concurrency`` closed-loop workers for ``duration`` seconds"""
+    latencies = []
+    deadline = time.perf_counter() + duration
+
+    async def worker():
+        while time.perf_counter() < deadline:
+            started = time.perf_counter()
+            await request()
+            latencies.append((time.perf_counter() - started) * 1000)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    return {"concurrency": concurrency, **summarize(latencies, elapsed)}
+
+
+async def run(args):
+    delay, page = build_statements(args.database_url, args.db_latency_ms)
+    pool_size = max(CONCURRENCY_LEVELS)
+
+    sync_engine = create_engine(args.database_url, pool_size=pool_size, max_overflow=0)
+    SyncSession = sessionmaker(bind=sync_engine)
+    async_engine = create_async_engine(
+        get_async_database_url(args.database_url), pool_size=pool_size, max_overflow=0
+    )
+    AsyncSession = async_sessionmaker(async_engine, expire_on_commit=False)
+
+    async def sync_request():
+        # What an async endpoint using get_db does: block the loop on I/O
+        with SyncSession() as session:
+            if delay is not None:
+                session.execute(delay)
+            session.execute(page).scalars().all()
+
+    async def async_request():
+        async with AsyncSession() as session:
+            if delay is not None:
+                await session.execute(delay)
+            (await session.execute(page)).scalars().all()
+
+    results = {}
+    for mode, request in (("sync", sync_request), ("async", async_request)):
+        results[mode] = [
+            await drive(request, concurrency, args.duration)
+            for concurrency in CONCURRENCY_LEVELS
+        ]
+
+    sync_engine.dispose()
+    await async_engine.dispose()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--database-url", default=settings.DATABASE_URL)
+    parser.add_argument("--duration", type=float, default=5.0, help="Seconds per level")
+    parser.add_argument("--db-latency-ms", type=float, default=5.0)
+    parser.add_argument("--p99-budget-ms", type=float, default=100.0)
+    args = parser.parse_args()
+
+    results = asyncio.run(run(args))
+
+    print(f"{'mode':<6} {'conc':>5} {'rps':>9} {'p50 ms':>8} {'p99 ms':>8}")
+    best = {}
+    for mode, levels in results.items():
+        for level in levels:
+            print(
+                f"{mode:<6} {level['concurrency']:>5} {level['rps']:>9.0f} "
+                f"{level['p50_ms']:>8.1f} {level['p99_ms']:>8.1f}"
+            )
+            if level["p99_ms"] <= args.p99_budget_ms:
+                best[mode] = max(best.get(mode, 0), level["concurrency"])
+
+    print()
+    for mode in results:
+        print(f"{mode}: max concurrency within p99 <= {args.p99_budget_ms:.0f} ms: {best.get(mode, 0)}")
+    return 0 if best.get("async", 0) >= best.get("sync", 0) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,259 @@
+"""
+Endpoint latency benchmark with regression gates.
+
+Drives the incidents, assets and auth routers at a fixed concurrency and
+reports throughput and p50/p95/p99 latency per route. By default requests
+go in-process through the ASGI app built by ``create_application()``; pass
+``--url`` to benchmark a running server instead (start it with
+``RATE_LIMIT_ENABLED=false``, as every request comes from one client). Seed
+the database first with ``python -m benchmarks.seed``.
+
+Results are written as JSON. With ``--compare`` the run is checked against
+a stored baseline and the exit code is non-zero if any route regressed by
+more than ``--tolerance``.
+
+Usage (from the backend directory):
+    python -m benchmarks.endpoints --output results.json
+    python -m benchmarks.endpoints --compare baseline.json --tolerance 0.15
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import platform
+import sys
+import time
+from contextlib import asynccontextmanager
+from datetime import datetime, timezone
+
+import httpx
+
+from benchmarks.common import summarize
+
+API = "/api/v1"
+
+# Latency percentiles must not grow, and throughput must not drop, by more
+# than the tolerance
+LATENCY_KEYS = ("p50_ms", "p95_ms", "p99_ms")
+THROUGHPUT_KEYS = ("rps",)
+
+
+@asynccontextmanager
+async def open_client(url):
+    """HTTP client for a running server, or an in-process client for the app"""
+    if url:
+        async with httpx.AsyncClient(base_url=url, timeout=30) as client:
+            yield client
+        return
+
+    from app.core.config import settings
+    from main import create_application
+
+    # All requests come from one client and would quickly be rate limited
+    settings.RATE_LIMIT_ENABLED = False
+    app = create_application()
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://localhost", timeout=30) as client:
+            yield client
+
+
+async def discover(client, sample_size):
+    """Collect ids, a deep-page cursor, a tenant and a token to drive the routes with"""
+    response = await client.get(f"{API}/incidents/", params={"limit": 100, "include_total": "false"})
+    response.raise_for_status()
+    incidents = response.json()["incidents"]
+
+    cursor = response.json()["next_cursor"]
+    for _ in range(9):
+        if not cursor:
+            break
+        page = await client.get(
+            f"{API}/incidents/", params={"limit": 100, "include_total": "false", "cursor": cursor}
+        )
+        cursor = page.json()["next_cursor"]
+
+    response = await client.get(f"{API}/assets/", params={"limit": 100, "include_total": "false"})
+    response.raise_for_status()
+    assets = response.json()["assets"]
+    if not incidents or not assets:
+        raise SystemExit("No data to benchmark; run `python -m benchmarks.seed` first")
+
+    response = await client.post(f"{API}/auth/login", data={"username": "admin", "password": "password"})
+    response.raise_for_status()
+
+    return {
+        "incident_ids": [item["id"] for item in incidents[:sample_size]],
+        "asset_ids": [item["id"] for item in assets[:sample_size]],
+        "asset_points": [item["location"]["coordinates"] for item in assets[:sample_size]],
+        "tenant_id": assets[0]["tenant_id"],
+        "cursor": cursor,
+        "token": response.json()["access_token"],
+    }
+
+
+def build_scenarios(context):
+    """
+    Route name -> factory returning the keyword arguments for one request.
+
+    Factories cycle through the discovered samples so that detail lookups
+    are not all served by a single cached row.
+    """
+    incident_ids = itertools.cycle(context["incident_ids"])
+    asset_ids = itertools.cycle(context["asset_ids"])
+    points = itertools.cycle(context["asset_points"])
+    tenant_id = context["tenant_id"]
+    auth_header = {"Authorization": f"Bearer {context['token']}"}
+
+    def nearby():
+        lng, lat = next(points)
+        return {"lng": lng, "lat": lat}
+
+    scenarios = {
+        "incidents.list": lambda: {
+            "method": "GET", "url": f"{API}/incidents/", "params": {"limit": 20, "include_total": "false"}
+        },
+        "incidents.list_with_total": lambda: {
+            "method": "GET", "url": f"{API}/incidents/", "params": {"limit": 20}
+        },
+        "incidents.list_exact_total": lambda: {
+            "method": "GET", "url": f"{API}/incidents/", "params": {"limit": 20, "exact_total": "true"}
+        },
+        "incidents.list_filtered": lambda: {
+            "method": "GET", "url": f"{API}/incidents/",
+            "params": {"limit": 20, "severity": "critical", "status": "reported", "include_total": "false"}
+        },
+        "incidents.get": lambda: {"method": "GET", "url": f"{API}/incidents/{next(incident_ids)}"},
+        "assets.list": lambda: {
+            "method": "GET", "url": f"{API}/assets/", "params": {"limit": 20, "include_total": "false"}
+        },
+        "assets.get": lambda: {"method": "GET", "url": f"{API}/assets/{next(asset_ids)}"},
+        "assets.radius": lambda: {
+            "method": "GET", "url": f"{API}/assets/spatial/radius",
+            "params": {"tenant_id": tenant_id, "radius_m": 500, **nearby()}
+        },
+        "assets.nearest": lambda: {
+            "method": "GET", "url": f"{API}/assets/spatial/nearest",
+            "params": {"tenant_id": tenant_id, "k": 10, **nearby()}
+        },
+        "auth.login": lambda: {
+            "method": "POST", "url": f"{API}/auth/login",
+            "data": {"username": "admin", "password": "password"}
+        },
+        "auth.me": lambda: {"method": "GET", "url": f"{API}/auth/me", "headers": auth_header},
+    }
+    if context["cursor"]:
+        scenarios["incidents.list_deep_cursor"] = lambda: {
+            "method": "GET", "url": f"{API}/incidents/",
+            "params": {"limit": 20, "include_total": "false", "cursor": context["cursor"]}
+        }
+    return scenarios
+
+
+async def drive(client, factory, concurrency, requests, warmup):
+    """Issue ``requests`` requests from ``concurrency`` closed-loop workers"""
+    for _ in range(warmup):
+        await client.request(**factory())
+
+    latencies = []
+    errors = 0
+    remaining = requests
+
+    async def worker():
+        nonlocal remaining, errors
+        while remaining > 0:
+            remaining -= 1
+            started = time.perf_counter()
+            response = await client.request(**factory())
+            latencies.append((time.perf_counter() - started) * 1000)
+            if response.status_code >= 400:
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return summarize(latencies, time.perf_counter() - started, errors)
+
+
+async def run(args):
+    async with open_client(args.url) as client:
+        context = await discover(client, args.sample_size)
+        scenarios = build_scenarios(context)
+        selected = [name for name in scenarios if not args.routes or name in args.routes]
+        routes = {}
+        for name in selected:
+            routes[name] = await drive(client, scenarios[name], args.concurrency, args.requests, args.warmup)
+            print(
+                f"{name:<28} {routes[name]['rps']:>9.0f} {routes[name]['p50_ms']:>8.1f} "
+                f"{routes[name]['p95_ms']:>8.1f} {routes[name]['p99_ms']:>8.1f} {routes[name]['errors']:>6}"
+            )
+    return {
+        "meta": {
+            "started_at": datetime.now(timezone.utc).isoformat(),
+            "target": args.url or "asgi",
+            "concurrency": args.concurrency,
+            "requests_per_route": args.requests,
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+        },
+        "routes": routes,
+    }
+
+
+def compare(results, baseline, tolerance):
+    """Return human-readable regressions of ``results`` against ``baseline``"""
+    regressions = []
+    for name, current in results["routes"].items():
+        previous = baseline.get("routes", {}).get(name)
+        if previous is None:
+            continue
+        for key in LATENCY_KEYS:
+            if previous[key] and current[key] > previous[key] * (1 + tolerance):
+                regressions.append(
+                    f"{name}: {key} {previous[key]:.1f} -> {current[key]:.1f} "
+                    f"(+{(current[key] / previous[key] - 1) * 100:.0f}%)"
+                )
+        for key in THROUGHPUT_KEYS:
+            if previous[key] and current[key] < previous[key] * (1 - tolerance):
+                regressions.append(
+                    f"{name}: {key} {previous[key]:.0f} -> {current[key]:.0f} "
+                    f"({(current[key] / previous[key] - 1) * 100:.0f}%)"
+                )
+        if current["errors"] > previous.get("errors", 0):
+            regressions.append(f"{name}: errors {previous.get('errors', 0)} -> {current['errors']}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--url", help="Benchmark a running server instead of the in-process app")
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--requests", type=int, default=2000, help="Measured requests per route")
+    parser.add_argument("--warmup", type=int, default=50, help="Unmeasured requests per route")
+    parser.add_argument("--sample-size", type=int, default=100, help="Distinct ids used for detail routes")
+    parser.add_argument("--routes", nargs="*", help="Only run these routes")
+    parser.add_argument("--output", default="benchmark-results.json")
+    parser.add_argument("--compare", metavar="BASELINE", help="Fail on regressions against this results file")
+    parser.add_argument("--tolerance", type=float, default=0.15, help="Allowed relative regression")
+    args = parser.parse_args()
+
+    print(f"{'route':<28} {'rps':>9} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'errors':>6}")
+    results = asyncio.run(run(args))
+    with open(args.output, "w") as f:
+        json.dump(results, f, indent=2)
+    print(f"\nresults written to {args.output}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.tolerance)
+        if regressions:
+            print(f"\nFAIL: {len(regressions)} regression(s) beyond {args.tolerance:.0%} of {args.compare}")
+            for regression in regressions:
+                print(f"  {regression}")
+            return 1
+        print(f"no regressions beyond {args.tolerance:.0%} of {args.compare}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,116 @@
+"""
+Telemetry write-ahead log benchmark.
+
+Runs concurrent writers that each push generated batches through
+``log_batch`` (validation, encoding, append and the wait for the group
+fsync) into a log in a temporary directory, and reports the acknowledgement
+latency and readings per second. Then reopens the log as a restarted worker
+would and checks that every acknowledged reading is replayed. Fails if the
+p99 acknowledgement latency exceeds ``--budget-ms`` or anything is lost.
+Writers share one event loop, so with many of them the latency is mostly
+time spent queued behind the others' validation.
+
+Needs no database: nothing is normalized while it runs.
+
+Usage (from the backend directory):
+    python -m benchmarks.event_log --writers 4 --batches 200 --batch-size 500
+"""
+import argparse
+import asyncio
+import gc
+import random
+import sys
+import tempfile
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+from app.core.config import settings
+from app.services.event_log import EventLog
+from app.services.telemetry_wal import decode_readings, log_batch, telemetry_wal
+from benchmarks.common import summarize
+
+
+def generate_batch(asset_ids, count):
+    start = datetime.now(timezone.utc) - timedelta(seconds=count)
+    return [
+        {
+            "asset_id": random.choice(asset_ids),
+            "timestamp": (start + timedelta(seconds=i)).isoformat(),
+            "metrics": {"pm25": random.uniform(0, 80), "temperature": random.uniform(-5, 35)},
+            "location": {"type": "Point", "coordinates": [settings.MAP_CENTER_LNG, settings.MAP_CENTER_LAT]},
+        }
+        for i in range(count)
+    ]
+
+
+async def run(args, root: Path):
+    settings.TELEMETRY_WAL_PATH = str(root)
+    telemetry_wal.open()
+    asset_ids = [str(uuid.uuid4()) for _ in range(100)]
+    batches = [generate_batch(asset_ids, args.batch_size) for _ in range(16)]
+    latencies = []
+    # As in a pre-forked worker: keep full collections off the long-lived objects
+    gc.collect()
+    gc.freeze()
+
+    async def writer(index):
+        for i in range(args.batches):
+            started = time.perf_counter()
+            result = await log_batch(batches[(index + i) % len(batches)])
+            latencies.append((time.perf_counter() - started) * 1000)
+            assert result.accepted == args.batch_size, result.errors
+
+    started = time.perf_counter()
+    await asyncio.gather(*(writer(index) for index in range(args.writers)))
+    elapsed = time.perf_counter() - started
+    syncs = telemetry_wal.log.syncs
+    directory = telemetry_wal.log.directory
+    # Leave the log as a dead worker would: appended, synced, never consumed
+    telemetry_wal.log._flusher.cancel()
+    telemetry_wal.log.close_files()
+
+    replay = EventLog(directory, settings.TELEMETRY_WAL_SEGMENT_BYTES, 0)
+    replay.open()
+    replayed = 0
+    position = replay.committed
+    while True:
+        records, position = replay.read(position, settings.TELEMETRY_WAL_DRAIN_BATCH_BYTES)
+        if not records:
+            break
+        replayed += sum(len(decode_readings(payload)) for payload in records)
+    replay.close_files()
+    return summarize(latencies, elapsed), syncs, replayed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--writers", type=int, default=4)
+    parser.add_argument("--batches", type=int, default=200, help="Batches per writer")
+    parser.add_argument("--batch-size", type=int, default=500)
+    parser.add_argument("--budget-ms", type=float, default=100)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        summary, syncs, replayed = asyncio.run(run(args, Path(tmp)))
+
+    logged = args.writers * args.batches * args.batch_size
+    print(
+        f"{summary['requests']} batches acknowledged, {summary['rps'] * args.batch_size:,.0f} readings/s, "
+        f"p50 {summary['p50_ms']:.2f} ms, p99 {summary['p99_ms']:.2f} ms, {syncs} syncs"
+    )
+    print(f"replayed {replayed} of {logged} readings after reopening")
+
+    failed = False
+    if summary["p99_ms"] > args.budget_ms:
+        print(f"FAIL: p99 acknowledgement latency over {args.budget_ms:.0f} ms")
+        failed = True
+    if replayed != logged:
+        print("FAIL: acknowledged readings were not replayed")
+        failed = True
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
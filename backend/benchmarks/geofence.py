@@ -0,0 +1,72 @@
+"""
+Geofence engine benchmark.
+
+Scatters square zones around the configured map center and moves assets
+in a random walk, evaluating one batch per tick the way telemetry ingestion
+does. Reports the time to build the zone tree and per-tick evaluation
+latency with the number of enter/exit events produced.
+
+Usage (from the backend directory):
+    python -m benchmarks.geofence --zones 5000 --assets 10000 --ticks 20
+"""
+import argparse
+import sys
+import time
+import uuid
+
+import numpy as np
+from shapely.geometry import box
+
+from app.core.config import settings
+from app.services.geofence import GeofenceEngine, TenantZones
+from benchmarks.common import summarize
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--zones", type=int, default=5000)
+    parser.add_argument("--assets", type=int, default=10000)
+    parser.add_argument("--ticks", type=int, default=20)
+    parser.add_argument("--extent", type=float, default=0.2, help="Width of the area in degrees")
+    parser.add_argument("--zone-size", type=float, default=0.004, help="Zone side in degrees")
+    parser.add_argument("--speed", type=float, default=0.0005, help="Random walk step in degrees per tick")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    lng0 = settings.MAP_CENTER_LNG - args.extent / 2
+    lat0 = settings.MAP_CENTER_LAT - args.extent / 2
+    corners = rng.uniform(0, args.extent, (args.zones, 2)) + (lng0, lat0)
+    zones = {
+        uuid.uuid4(): (f"zone-{i}", box(x, y, x + args.zone_size, y + args.zone_size))
+        for i, (x, y) in enumerate(corners)
+    }
+
+    engine = GeofenceEngine()
+    tenant_id = uuid.uuid4()
+    started = time.perf_counter()
+    engine.tenants[tenant_id] = TenantZones(zones)
+    build_ms = (time.perf_counter() - started) * 1000
+
+    asset_ids = [uuid.uuid4() for _ in range(args.assets)]
+    lng = rng.uniform(0, args.extent, args.assets) + lng0
+    lat = rng.uniform(0, args.extent, args.assets) + lat0
+    latencies, events = [], 0
+    started = time.perf_counter()
+    for tick in range(args.ticks):
+        lng += rng.normal(0, args.speed, args.assets)
+        lat += rng.normal(0, args.speed, args.assets)
+        tick_started = time.perf_counter()
+        events += len(engine.observe(tenant_id, asset_ids, np.full(args.assets, float(tick)), lng, lat))
+        latencies.append((time.perf_counter() - tick_started) * 1000)
+    summary = summarize(latencies, time.perf_counter() - started)
+
+    print(f"zones {args.zones}, assets {args.assets}, tree built in {build_ms:.1f} ms")
+    print(
+        f"per tick: p50 {summary['p50_ms']:.1f} ms, p95 {summary['p95_ms']:.1f} ms, "
+        f"{args.assets * 1000 / summary['p50_ms']:.0f} readings/s, {events / args.ticks:.0f} events"
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
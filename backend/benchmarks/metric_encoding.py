@@ -0,0 +1,105 @@
+"""
+Compact metric encoding benchmark.
+
+Generates telemetry rows and compares the JSON ``metrics`` document with
+the metric catalog encoding (uint16 ids and float32 values): bytes stored
+per reading, and the CPU time to turn a window of rows into per-metric
+arrays, which for JSON includes the driver's parsing of each document.
+Fails if the storage reduction is below ``--min-storage-ratio`` or the
+decoding speed-up below ``--min-speedup``. Values carry two decimals, as
+most sensors report them; longer values favour the compact encoding more.
+
+Needs no database.
+
+Usage (from the backend directory):
+    python -m benchmarks.metric_encoding --rows 200000 --metrics 6
+"""
+import argparse
+import asyncio
+import json
+import random
+import sys
+import time
+import uuid
+
+import numpy as np
+
+from app.models.metric import MetricDefinition
+from app.services.metric_catalog import metric_catalog
+
+METRIC_NAMES = ["pm25", "pm10", "no2", "temperature", "humidity", "pressure", "noise", "battery"]
+
+
+def legacy_series(documents):
+    """The pre-catalog read path: parse every document, then one pass per metric"""
+    readings = [json.loads(document) for document in documents]
+    names = sorted({name for reading in readings for name in reading})
+    return {
+        name: np.fromiter((reading.get(name, np.nan) for reading in readings), dtype=np.float64, count=len(readings))
+        for name in names
+    }
+
+
+def best_of(runs, function):
+    timings = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        result = function()
+        timings.append(time.perf_counter() - started)
+    return min(timings), result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=200000)
+    parser.add_argument("--metrics", type=int, default=6, help="Metrics per reading")
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--min-storage-ratio", type=float, default=2.0)
+    parser.add_argument("--min-speedup", type=float, default=3.0)
+    args = parser.parse_args()
+
+    names = METRIC_NAMES[:args.metrics]
+    for metric_id, name in enumerate(names, start=1):
+        metric_catalog._add(MetricDefinition(id=metric_id, asset_type="air_quality_sensor", name=name, unit=None))
+    asset_id = uuid.uuid4()
+    rows = [
+        {"asset_id": asset_id, "metrics": {name: round(random.uniform(0, 100), 2) for name in names}}
+        for _ in range(args.rows)
+    ]
+
+    documents = [json.dumps(row["metrics"]) for row in rows]
+    encoded = asyncio.run(metric_catalog.encode_rows(None, rows, {asset_id: "air_quality_sensor"}))
+    metric_ids = [row["metric_ids"] for row in encoded]
+    metric_values = [row["metric_values"] for row in encoded]
+    readings = args.rows * len(names)
+    # One length byte per json/bytea value, as PostgreSQL stores short values
+    json_bytes = sum(len(document) + 1 for document in documents) / readings
+    compact_bytes = sum(len(ids) + len(values) + 2 for ids, values in zip(metric_ids, metric_values)) / readings
+
+    legacy_time, legacy = best_of(args.runs, lambda: legacy_series(documents))
+    compact_time, compact = best_of(
+        args.runs,
+        lambda: asyncio.run(metric_catalog.decode(None, metric_ids, metric_values, [None] * args.rows))
+    )
+    for name in names:
+        # float32 storage: equal to about 7 significant digits
+        assert np.allclose(legacy[name], compact[name], rtol=1e-6), name
+
+    storage_ratio = json_bytes / compact_bytes
+    cpu_ratio = legacy_time / compact_time
+    print(f"{args.rows} rows x {len(names)} metrics")
+    print(f"bytes per reading: JSON {json_bytes:.1f}, compact {compact_bytes:.1f} ({storage_ratio:.1f}x smaller)")
+    print(f"rows to arrays:    JSON {legacy_time * 1000:.0f} ms, compact {compact_time * 1000:.0f} ms ({cpu_ratio:.1f}x faster)")
+
+    failed = False
+    if storage_ratio < args.min_storage_ratio:
+        print(f"FAIL: storage reduction below {args.min_storage_ratio:.1f}x")
+        failed = True
+    if cpu_ratio < args.min_speedup:
+        print(f"FAIL: decoding speed-up below {args.min_speedup:.1f}x")
+        failed = True
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
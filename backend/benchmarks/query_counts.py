@@ -0,0 +1,86 @@
+"""
+N+1 query gate for the list endpoints.
+
+Requests every list endpoint, with each supported ``include`` value, at a
+page size of 1 and at a larger page size, counting the SQL statements each
+request issues. The query count of a list request must not depend on the
+page size; any endpoint whose count grows with it is reported and the exit
+code is non-zero. Run it against a seeded database
+(``python -m benchmarks.seed``) so that pages are actually full.
+
+Usage (from the backend directory):
+    python -m benchmarks.query_counts --page-size 50
+"""
+import argparse
+import asyncio
+import sys
+
+from sqlalchemy import event
+
+from app.api.v1.endpoints.assets import ASSET_RELATIONS
+from app.api.v1.endpoints.incidents import INCIDENT_RELATIONS
+from app.core.database import async_engine
+from benchmarks.endpoints import API, open_client
+
+LIST_ENDPOINTS = {
+    f"{API}/incidents/": INCIDENT_RELATIONS,
+    f"{API}/assets/": ASSET_RELATIONS,
+}
+
+
+class QueryCounter:
+    """Counts statements executed on the async engine"""
+
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, conn, cursor, statement, parameters, context, executemany):
+        self.count += 1
+
+
+async def count_queries(client, counter, url, params):
+    counter.count = 0
+    response = await client.get(url, params=params)
+    response.raise_for_status()
+    return counter.count
+
+
+async def run(args):
+    counter = QueryCounter()
+    event.listen(async_engine.sync_engine, "before_cursor_execute", counter)
+    failures = []
+    try:
+        async with open_client(None) as client:
+            for url, relations in LIST_ENDPOINTS.items():
+                for include in [None, *relations, ",".join(relations)]:
+                    params = {"include_total": "false"}
+                    if include:
+                        params["include"] = include
+                    small = await count_queries(client, counter, url, {**params, "limit": 1})
+                    large = await count_queries(client, counter, url, {**params, "limit": args.page_size})
+                    label = f"{url}?include={include or ''}"
+                    print(f"{label:<60} limit=1: {small:>3}  limit={args.page_size}: {large:>3}")
+                    if large > small:
+                        failures.append(label)
+    finally:
+        event.remove(async_engine.sync_engine, "before_cursor_execute", counter)
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--page-size", type=int, default=50)
+    args = parser.parse_args()
+
+    failures = asyncio.run(run(args))
+    if failures:
+        print(f"\nFAIL: query count grows with page size for {len(failures)} endpoint(s):")
+        for label in failures:
+            print(f"  {label}")
+        return 1
+    print("\nno N+1 queries detected")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
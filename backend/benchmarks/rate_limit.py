@@ -0,0 +1,146 @@
+"""
+Rate limiter overhead benchmark.
+
+Calls a trivial ASGI app directly and through ``RateLimitMiddleware`` with
+the local token bucket backend, spreading requests over many tenants and
+parameterized routes so that they stay under the limits, and reports the
+added time per request, including the cached verification of each bearer
+token that tells the tenant. Fails if it exceeds ``--budget-us``. Also checks
+that a single tenant is cut off with 429 and ``Retry-After`` once its burst
+limit is used up.
+
+Usage (from the backend directory):
+    python -m benchmarks.rate_limit --requests 200000 --budget-us 100
+"""
+import argparse
+import asyncio
+import sys
+import time
+import uuid
+
+from fastapi import FastAPI
+
+from app.core.config import settings
+from app.core.rate_limit import RateLimiter, RateLimitMiddleware
+from app.core.security import token_digest, token_verifier
+from app.schemas.auth import CurrentUser
+
+
+def build_app():
+    app = FastAPI()
+
+    @app.get("/api/v1/assets/")
+    async def assets():
+        return {}
+
+    @app.get("/api/v1/assets/{asset_id}")
+    async def asset(asset_id: str):
+        return {}
+
+    @app.get("/api/v1/incidents/{incident_id}")
+    async def incident(incident_id: str):
+        return {}
+
+    return app
+
+
+async def endpoint(scope, receive, send):
+    """Stands in for the application: answers immediately"""
+    await send({"type": "http.response.start", "status": 200, "headers": []})
+    await send({"type": "http.response.body", "body": b"{}"})
+
+
+def make_tokens(count):
+    """One token per tenant, already in the token cache as after a first verified request"""
+    tokens = []
+    for _ in range(count):
+        token = uuid.uuid4().hex
+        user = CurrentUser(
+            id=uuid.uuid4(), email="bench@example.com", name="Bench", role="operator", tenant_id=uuid.uuid4()
+        )
+        token_verifier.cache.set(token_digest(token), user, 3600)
+        tokens.append(token)
+    return tokens
+
+
+def make_scopes(count, tokens):
+    paths = ["/api/v1/assets/"] + [f"/api/v1/assets/{uuid.uuid4()}" for _ in range(200)]
+    return [
+        {
+            "type": "http",
+            "method": "GET",
+            "path": paths[i % len(paths)],
+            "query_string": b"",
+            "headers": [
+                (b"host", b"localhost"),
+                (b"accept", b"application/json"),
+                (b"authorization", f"Bearer {tokens[i % len(tokens)]}".encode()),
+            ],
+            "client": ("10.0.0.1", 5000),
+        }
+        for i in range(count)
+    ]
+
+
+async def time_calls(app, scopes):
+    statuses = []
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            statuses.append(message["status"])
+
+    started = time.perf_counter()
+    for scope in scopes:
+        await app(dict(scope), receive, send)
+    return (time.perf_counter() - started) / len(scopes) * 1e6, statuses
+
+
+async def run(args):
+    router_app = build_app()
+    limiter = RateLimiter()
+    limited = RateLimitMiddleware(endpoint, router=router_app.router, limiter=limiter)
+
+    scopes = make_scopes(args.requests, make_tokens(args.tenants))
+    # Warm the route cache and buckets
+    await time_calls(limited, scopes[:1000])
+
+    base_us, _ = await time_calls(endpoint, scopes)
+    limited_us, statuses = await time_calls(limited, scopes)
+    rejected = sum(status == 429 for status in statuses)
+
+    # One tenant hammering one route is cut off at the burst limit
+    single = make_scopes(settings.RATE_LIMIT_PER_MINUTE + 5, make_tokens(1))
+    for scope in single:
+        scope["path"] = "/api/v1/incidents/x"
+    _, burst = await time_calls(limited, single)
+    return base_us, limited_us, rejected, burst
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=200000)
+    parser.add_argument("--tenants", type=int, default=5000)
+    parser.add_argument("--budget-us", type=float, default=100.0)
+    args = parser.parse_args()
+
+    base_us, limited_us, rejected, burst = asyncio.run(run(args))
+    overhead = limited_us - base_us
+    print(f"without limiter {base_us:.2f} us/request, with limiter {limited_us:.2f} us/request")
+    print(f"overhead {overhead:.2f} us/request (budget {args.budget_us:.0f} us), {rejected} rejected")
+    allowed = burst.count(200)
+    print(f"single tenant: {allowed} allowed, then {burst.count(429)} rejected with 429")
+
+    if allowed != settings.RATE_LIMIT_PER_MINUTE:
+        print("FAIL: burst limit not enforced")
+        return 1
+    if overhead > args.budget_us:
+        print("FAIL: limiter overhead over budget")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,110 @@
+"""
+Telemetry rollup benchmark.
+
+Generates a month of one-minute readings for one asset and compares a
+minmax chart of the whole month computed from the raw readings with the
+same chart merged from the hourly rollups, and reports the cost of
+aggregating an ingest batch into all three resolutions. The rollup chart
+must match the raw one exactly. Fails if the rows a query reads are not
+reduced by at least ``--min-row-reduction``; reading and decoding rows is
+where the raw query spends its time, the reduction itself is cheap either
+way.
+
+Needs no database: rollup rows are built in memory with the same
+aggregation the ingest path uses.
+
+Usage (from the backend directory):
+    python -m benchmarks.rollups --days 30 --metrics 6 --points 500
+"""
+import argparse
+import sys
+import time
+
+import numpy as np
+
+from app.services.downsampling import bucket_aggregate, bucket_merge
+from app.services.rollups import RESOLUTIONS, aggregate, choose_resolution
+
+
+def best_of(runs, function):
+    timings = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        result = function()
+        timings.append(time.perf_counter() - started)
+    return min(timings), result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--days", type=int, default=30)
+    parser.add_argument("--metrics", type=int, default=6)
+    parser.add_argument("--points", type=int, default=500)
+    parser.add_argument("--batch", type=int, default=1000, help="Rows per ingest batch")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--min-row-reduction", type=float, default=30.0)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(7)
+    start = 1_700_006_400.0  # Midnight UTC, so hours and days align with the window
+    end = start + args.days * 86400
+    timestamps = np.arange(start, end, 60.0) + rng.uniform(0, 59, int(args.days * 1440))
+    raw = {
+        metric_id: np.round(rng.normal(50, 15, timestamps.size), 2).astype(np.float32).astype(np.float64)
+        for metric_id in range(1, args.metrics + 1)
+    }
+    # At most --points buckets of whole hours, so that the hourly rollups fit them
+    hours = -(-args.days * 24 // args.points)
+    points = args.days * 24 // hours
+    resolution = choose_resolution((end - start) / points)
+
+    ids = np.repeat(np.arange(1, args.metrics + 1), timestamps.size)
+    flat_times = np.tile(timestamps, args.metrics)
+    flat_values = np.concatenate([raw[metric_id] for metric_id in range(1, args.metrics + 1)])
+    rollup = aggregate(np.zeros(ids.size, dtype=np.int64), ids, flat_times, flat_values, resolution)
+
+    def from_raw():
+        return {metric_id: bucket_aggregate(timestamps, values, start, end, points) for metric_id, values in raw.items()}
+
+    def from_rollups():
+        output = {}
+        for metric_id in raw:
+            rows = rollup.metric == metric_id
+            output[metric_id] = bucket_merge(
+                rollup.bucket[rows], rollup.count[rows], rollup.sum[rows],
+                rollup.min[rows], rollup.max[rows], start, end, points
+            )
+        return output
+
+    raw_time, expected = best_of(args.runs, from_raw)
+    rollup_time, merged = best_of(args.runs, from_rollups)
+    for metric_id in raw:
+        for key in ("t", "min", "max", "count"):
+            assert np.array_equal(expected[metric_id][key], merged[metric_id][key]), (metric_id, key)
+        assert np.allclose(expected[metric_id]["avg"], merged[metric_id]["avg"]), metric_id
+
+    batch = slice(0, args.batch)
+    batch_args = (
+        np.zeros(args.batch * args.metrics, dtype=np.int64),
+        np.repeat(np.arange(1, args.metrics + 1), args.batch),
+        np.tile(timestamps[batch], args.metrics),
+        np.concatenate([raw[metric_id][batch] for metric_id in raw]),
+    )
+    batch_time, _ = best_of(
+        args.runs, lambda: [aggregate(*batch_args, resolution=r) for r in RESOLUTIONS]
+    )
+
+    row_reduction = timestamps.size / (rollup.count.size / args.metrics)
+    print(f"{args.days} days x {args.metrics} metrics, {timestamps.size * args.metrics} readings, {points} points")
+    print(f"rows read:       raw {timestamps.size}, rollups {rollup.count.size} ({resolution}s buckets, {row_reduction:.0f}x fewer values)")
+    print(f"chart reduction: raw {raw_time * 1000:.1f} ms, rollups {rollup_time * 1000:.1f} ms ({raw_time / rollup_time:.1f}x faster)")
+    print(f"ingest batch:    {args.batch} rows aggregated into {len(RESOLUTIONS)} resolutions in {batch_time * 1000:.2f} ms")
+
+    if row_reduction < args.min_row_reduction:
+        print(f"FAIL: rows read reduced by less than {args.min_row_reduction:.0f}x")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,122 @@
+"""
+Multi-process throughput scaling benchmark.
+
+Starts the server with ``python main.py`` at each ``--workers`` count and
+drives it from several load-generator processes (a single Python client
+would saturate before the server does), then reports throughput per worker
+count and the scaling efficiency: throughput per worker relative to the
+first count given. Fails if the efficiency at any count is below
+``--min-efficiency``. Client processes
+share the machine with the server, so keep the largest worker count at
+about half the cores.
+
+Needs the configured database, like the server itself.
+
+Usage (from the backend directory):
+    python -m benchmarks.scaling --workers 1 2 4 --path /api/v1/health --duration 10
+"""
+import argparse
+import asyncio
+import multiprocessing
+import os
+import signal
+import subprocess
+import sys
+import time
+
+import httpx
+
+from benchmarks.common import summarize
+
+
+async def _load(url, concurrency, duration):
+    latencies, errors = [], 0
+    deadline = time.perf_counter() + duration
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+
+    async with httpx.AsyncClient(limits=limits, timeout=10) as client:
+        async def loop():
+            nonlocal errors
+            while time.perf_counter() < deadline:
+                started = time.perf_counter()
+                try:
+                    response = await client.get(url)
+                    response.raise_for_status()
+                    latencies.append((time.perf_counter() - started) * 1000)
+                except httpx.HTTPError:
+                    errors += 1
+
+        await asyncio.gather(*(loop() for _ in range(concurrency)))
+    return latencies, errors
+
+
+def load_process(args):
+    return asyncio.run(_load(*args))
+
+
+def wait_ready(url, server, timeout=60):
+    deadline = time.perf_counter() + timeout
+    while time.perf_counter() < deadline:
+        if server.poll() is not None:
+            raise RuntimeError(f"server exited with code {server.returncode}")
+        try:
+            if httpx.get(url, timeout=0.5).status_code == 200:
+                return
+        except httpx.TransportError:
+            pass
+        time.sleep(0.1)
+    raise RuntimeError(f"server not ready after {timeout}s")
+
+
+def measure(workers, args):
+    env = dict(os.environ, WORKERS=str(workers), PORT=str(args.port), HOST="127.0.0.1", RATE_LIMIT_ENABLED="false")
+    server = subprocess.Popen([sys.executable, "main.py"], env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    url = f"http://127.0.0.1:{args.port}{args.path}"
+    try:
+        wait_ready(url, server)
+        with multiprocessing.Pool(args.clients) as pool:
+            # Warm-up round so every worker has its connections open
+            pool.map(load_process, [(url, args.concurrency, 1.0)] * args.clients)
+            started = time.perf_counter()
+            results = pool.map(load_process, [(url, args.concurrency, args.duration)] * args.clients)
+            elapsed = time.perf_counter() - started
+    finally:
+        server.send_signal(signal.SIGTERM)
+        server.wait(timeout=60)
+    latencies = [latency for result, _ in results for latency in result]
+    return summarize(latencies, elapsed, errors=sum(errors for _, errors in results))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--path", default="/api/v1/health")
+    parser.add_argument("--port", type=int, default=8766)
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--clients", type=int, default=max((os.cpu_count() or 2) // 2, 1), help="Load generator processes")
+    parser.add_argument("--concurrency", type=int, default=32, help="Connections per load generator")
+    parser.add_argument("--min-efficiency", type=float, default=0.0)
+    args = parser.parse_args()
+
+    print(f"{os.cpu_count()} cores, {args.clients} load generators x {args.concurrency} connections, {args.path}")
+    baseline = None
+    failed = False
+    for workers in args.workers:
+        summary = measure(workers, args)
+        per_worker = summary["rps"] / workers
+        baseline = baseline or per_worker
+        efficiency = per_worker / baseline
+        print(
+            f"workers {workers:>2}: {summary['rps']:>9.0f} req/s, p50 {summary['p50_ms']:.1f} ms, "
+            f"p99 {summary['p99_ms']:.1f} ms, errors {summary['errors']}, efficiency {efficiency:.0%}"
+        )
+        if efficiency < args.min_efficiency:
+            failed = True
+    if failed:
+        print(f"FAIL: scaling efficiency below {args.min_efficiency:.0%}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
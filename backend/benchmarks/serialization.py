@@ -0,0 +1,149 @@
+"""
+List serialization benchmark: response models vs the orjson fast path.
+
+Builds pages of in-memory incident and asset rows and encodes each page
+twice: the way FastAPI did before (a list model built from ORM rows, then
+validated and encoded against ``response_model``) and through
+``RowSerializer`` + ``json_response``. Both outputs are checked to decode
+to the same JSON before timing.
+
+Usage (from the backend directory):
+    python -m benchmarks.serialization --page-sizes 20 100 --iterations 200
+"""
+import argparse
+import asyncio
+import json
+import random
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_response_field
+from geoalchemy2.shape import from_shape
+from shapely.geometry import Point
+
+from app.api.v1.endpoints.assets import asset_serializer
+from app.api.v1.endpoints.incidents import incident_serializer
+from app.core.config import settings
+from app.core.serialization import json_response
+from app.models.asset import Asset
+from app.models.incident import Incident
+from app.schemas.asset import AssetList
+from app.schemas.incident import IncidentList
+
+
+def _location(rng):
+    point = Point(
+        settings.MAP_CENTER_LNG + rng.uniform(-0.1, 0.1),
+        settings.MAP_CENTER_LAT + rng.uniform(-0.1, 0.1)
+    )
+    return from_shape(point, srid=4326)
+
+
+def make_incidents(count, rng):
+    now = datetime.now(timezone.utc)
+    return [
+        Incident(
+            id=uuid.uuid4(),
+            title=f"Incident {i}",
+            description="Signal failure at intersection, traffic backing up",
+            type="traffic_accident",
+            severity=rng.choice(("low", "medium", "high", "critical")),
+            status="reported",
+            location=_location(rng),
+            reported_at=now,
+            assets_involved=[uuid.uuid4()],
+            tags=["traffic", "signals"],
+            tenant_id=uuid.uuid4(),
+            created_at=now - timedelta(minutes=i),
+            updated_at=None,
+        )
+        for i in range(count)
+    ]
+
+
+def make_assets(count, rng):
+    now = datetime.now(timezone.utc)
+    return [
+        Asset(
+            id=uuid.uuid4(),
+            type="air_quality_sensor",
+            name=f"Sensor {i}",
+            location=_location(rng),
+            properties={"zone": "downtown", "firmware": "2.4.1"},
+            status="active",
+            tenant_id=uuid.uuid4(),
+            created_at=now - timedelta(minutes=i),
+            updated_at=None,
+        )
+        for i in range(count)
+    ]
+
+
+def page_fields(limit):
+    return {"total": 1000000, "page": 1, "per_page": limit, "total_pages": 1000000 // limit, "next_cursor": "abc"}
+
+
+async def model_path(list_model, key, field, rows):
+    """Previous behaviour: list model from ORM rows, then FastAPI's response validation"""
+    page = list_model(**{key: rows}, **page_fields(len(rows)))
+    content = await serialize_response(field=field, response_content=page)
+    return JSONResponse(content).body
+
+
+def fast_path(serializer, key, rows):
+    return json_response({key: serializer.many(rows), **page_fields(len(rows))}).body
+
+
+async def time_path(run, iterations):
+    started = time.perf_counter()
+    for _ in range(iterations):
+        await run()
+    return (time.perf_counter() - started) / iterations * 1e6
+
+
+async def run(args):
+    rng = random.Random(0)
+    cases = (
+        ("incidents", IncidentList, incident_serializer, make_incidents),
+        ("assets", AssetList, asset_serializer, make_assets),
+    )
+    results = []
+    for key, list_model, serializer, make_rows in cases:
+        field = create_response_field(name="response", type_=list_model)
+        for size in args.page_sizes:
+            rows = make_rows(size, rng)
+
+            async def slow():
+                return await model_path(list_model, key, field, rows)
+
+            async def fast():
+                return fast_path(serializer, key, rows)
+
+            if json.loads(await slow()) != json.loads(await fast()):
+                raise SystemExit(f"{key}: fast path output differs from the response model output")
+
+            slow_us = await time_path(slow, args.iterations)
+            fast_us = await time_path(fast, args.iterations)
+            results.append((key, size, slow_us, fast_us))
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--page-sizes", type=int, nargs="+", default=[20, 100])
+    parser.add_argument("--iterations", type=int, default=200)
+    args = parser.parse_args()
+
+    results = asyncio.run(run(args))
+    print(f"{'list':<10} {'rows':>5} {'models us':>10} {'fast us':>9} {'speedup':>8}")
+    for key, size, slow_us, fast_us in results:
+        print(f"{key:<10} {size:>5} {slow_us:>10.0f} {fast_us:>9.0f} {slow_us / fast_us:>7.1f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,103 @@
+"""
+Startup budget benchmark.
+
+Measures, each in a fresh interpreter, the time to import the application
+(``import main``) and the time from launching uvicorn to the first
+successful health check, which includes the lifespan startup (schema check,
+Redis connections, index and counter warm-up). Fails if either exceeds its
+budget or if importing the application pulled in modules that are meant to
+be loaded on first use.
+
+Needs the configured database, like the server itself.
+
+Usage (from the backend directory):
+    python -m benchmarks.startup --runs 3 --import-budget-ms 1500 --ready-budget-ms 5000
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+import httpx
+
+# Stacks that endpoints import on first use; none may load at startup
+LAZY_MODULES = (
+    "pandas", "sklearn", "prophet", "langchain", "langgraph",
+    "openai", "anthropic", "folium", "jose", "passlib",
+)
+
+IMPORT_PROBE = """
+import json, sys, time
+started = time.perf_counter()
+import main
+elapsed = time.perf_counter() - started
+print(json.dumps({"ms": elapsed * 1000, "loaded": [m for m in %r if m in sys.modules]}))
+"""
+
+
+def measure_import():
+    result = subprocess.run(
+        [sys.executable, "-c", IMPORT_PROBE % (LAZY_MODULES,)],
+        capture_output=True, text=True, check=True
+    )
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def measure_ready(port, timeout):
+    """Seconds from launching uvicorn until /api/v1/health answers 200"""
+    started = time.perf_counter()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--port", str(port), "--log-level", "warning"],
+        env=os.environ.copy()
+    )
+    try:
+        with httpx.Client(timeout=0.5) as client:
+            while time.perf_counter() - started < timeout:
+                if server.poll() is not None:
+                    raise RuntimeError(f"server exited with code {server.returncode}")
+                try:
+                    if client.get(f"http://127.0.0.1:{port}/api/v1/health").status_code == 200:
+                        return time.perf_counter() - started
+                except httpx.TransportError:
+                    pass
+                time.sleep(0.01)
+        raise RuntimeError(f"server not ready after {timeout}s")
+    finally:
+        server.terminate()
+        server.wait(timeout=10)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--import-budget-ms", type=float, default=1500)
+    parser.add_argument("--ready-budget-ms", type=float, default=5000)
+    args = parser.parse_args()
+
+    imports = [measure_import() for _ in range(args.runs)]
+    import_ms = min(run["ms"] for run in imports)
+    loaded = sorted({module for run in imports for module in run["loaded"]})
+    ready_ms = min(measure_ready(args.port, args.ready_budget_ms / 1000 * 3) for _ in range(args.runs)) * 1000
+
+    print(f"import main:           {import_ms:.0f} ms (budget {args.import_budget_ms:.0f} ms)")
+    print(f"launch to first 200:   {ready_ms:.0f} ms (budget {args.ready_budget_ms:.0f} ms)")
+    print(f"lazy modules imported: {', '.join(loaded) or 'none'}")
+
+    failed = False
+    if import_ms > args.import_budget_ms:
+        print("FAIL: import time over budget")
+        failed = True
+    if ready_ms > args.ready_budget_ms:
+        print("FAIL: time to first request over budget")
+        failed = True
+    if loaded:
+        print("FAIL: modules meant to load on first use were imported at startup")
+        failed = True
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,113 @@
+"""
+Telemetry ingestion throughput benchmark.
+
+Seeds a tenant and a pool of assets, then pushes generated readings through
+the batch ingestion service and reports rows per second.
+
+Usage (from the backend directory):
+    python -m benchmarks.telemetry_ingest --rows 200000 --batch-size 20000
+"""
+import argparse
+import asyncio
+import random
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app.core.config import settings
+from app.core.database import get_async_database_url
+from app.models.asset import Asset
+from app.models.base import Base
+from app.models.tenant import Tenant
+from app.services.telemetry_service import ingest_batch
+
+
+async def seed_assets(session, count):
+    """Create a benchmark tenant with ``count`` assets and return their ids"""
+    tenant_id = uuid.uuid4()
+    await session.execute(insert(Tenant), [{
+        "id": tenant_id,
+        "name": "Benchmark City",
+        "domain": f"bench-{tenant_id.hex[:8]}.civitasiq.local",
+        "settings": {},
+    }])
+    asset_ids = [uuid.uuid4() for _ in range(count)]
+    await session.execute(insert(Asset), [
+        {
+            "id": asset_id,
+            "type": "air_quality_sensor",
+            "name": f"Sensor {i}",
+            "location": f"SRID=4326;POINT({settings.MAP_CENTER_LNG} {settings.MAP_CENTER_LAT})",
+            "properties": {},
+            "status": "active",
+            "tenant_id": tenant_id,
+        }
+        for i, asset_id in enumerate(asset_ids)
+    ])
+    await session.commit()
+    return [str(asset_id) for asset_id in asset_ids]
+
+
+def generate_readings(asset_ids, count):
+    """Generate ``count`` readings spread over the given assets"""
+    start = datetime.now(timezone.utc) - timedelta(seconds=count)
+    return [
+        {
+            "asset_id": asset_ids[i % len(asset_ids)],
+            "timestamp": (start + timedelta(seconds=i)).isoformat(),
+            "metrics": {
+                "pm25": random.uniform(0, 80),
+                "temperature": random.uniform(-5, 35),
+                "humidity": random.uniform(20, 90),
+            },
+        }
+        for i in range(count)
+    ]
+
+
+async def run(args):
+    engine = create_async_engine(get_async_database_url(args.database_url))
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    Session = async_sessionmaker(engine, expire_on_commit=False)
+    
+    async with Session() as session:
+        asset_ids = await seed_assets(session, args.assets)
+    readings = generate_readings(asset_ids, args.rows)
+    
+    accepted = 0
+    started = time.perf_counter()
+    async with Session() as session:
+        for start in range(0, len(readings), args.batch_size):
+            result = await ingest_batch(session, readings[start:start + args.batch_size])
+            accepted += result.accepted
+    elapsed = time.perf_counter() - started
+    await engine.dispose()
+    return accepted, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--database-url", default=settings.DATABASE_URL)
+    parser.add_argument("--rows", type=int, default=200000)
+    parser.add_argument("--batch-size", type=int, default=20000)
+    parser.add_argument("--assets", type=int, default=1000)
+    parser.add_argument("--min-rows-per-sec", type=float, default=50000)
+    args = parser.parse_args()
+    
+    accepted, elapsed = asyncio.run(run(args))
+    
+    rate = accepted / elapsed
+    print(f"ingested {accepted} rows in {elapsed:.2f}s ({rate:,.0f} rows/s)")
+    if rate < args.min_rows_per_sec:
+        print(f"FAIL: below target of {args.min_rows_per_sec:,.0f} rows/s")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
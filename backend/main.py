@@ -3,11 +3,26 @@ from fastapi.middleware.cors import CORSMiddleware
 from fastapi.middleware.trustedhost import TrustedHostMiddleware
 import uvicorn
 from contextlib import asynccontextmanager
+import asyncio
 import logging
 
 from app.core.config import settings
-from app.core.database import init_db
+from app.core.cache import cache
+from app.core.database import AsyncSessionLocal, async_engine, engine, init_db, close_db, prime_pool
+from app.core.metrics import MetricsMiddleware, instrument_engine, metrics_endpoint
+from app.core.rate_limit import RateLimitMiddleware, rate_limiter
+from app.core.security import run_revocation_sync_loop, token_verifier
+from app.core.serving import run_leader_jobs
 from app.api.v1.api import api_router
+from app.services.alert_service import flush_alert_groups, run_group_flush_loop
+from app.services.cold_store import run_compaction_loop
+from app.services.entity_counts import reconcile_all, run_reconcile_loop
+from app.services.forecasting import forecaster, run_precompute_loop
+from app.services.geofence import geofence_engine, run_zone_refresh_loop
+from app.services.metric_catalog import metric_catalog
+from app.services.spatial_index import asset_index, run_refresh_loop
+from app.services.telemetry_wal import run_normalizer_loop, telemetry_wal
+from app.services.ws_hub import hub_bridge
 
 # Configure logging
 logging.basicConfig(
@@ -16,6 +31,11 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+async def warm_up(loader):
+    """Run a startup load in its own session"""
+    async with AsyncSessionLocal() as db:
+        await loader(db)
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Application lifespan events"""
@@ -24,10 +44,67 @@ async def lifespan(app: FastAPI):
     await init_db()
     logger.info("Database initialized successfully")
     
+    # Independent connections and warm-up loads run concurrently, so that
+    # startup waits for the slowest rather than the sum
+    connects = [cache.connect(), token_verifier.connect(), hub_bridge.start()]
+    if settings.RATE_LIMIT_ENABLED:
+        connects.append(rate_limiter.connect())
+    await asyncio.gather(*connects)
+    
+    loaders = [asset_index.load, metric_catalog.load]
+    if settings.GEOFENCE_ENABLED:
+        loaders.append(geofence_engine.load)
+    if settings.COUNTERS_ENABLED:
+        loaders.append(reconcile_all)
+    await asyncio.gather(
+        prime_pool(settings.DATABASE_POOL_PREWARM),
+        *(warm_up(loader) for loader in loaders)
+    )
+    
+    if settings.TELEMETRY_WAL_ENABLED:
+        telemetry_wal.open()
+    
+    background_tasks = []
+    if settings.TELEMETRY_WAL_ENABLED:
+        background_tasks.append(asyncio.create_task(run_normalizer_loop()))
+    if settings.AUTH_REVOCATION_SYNC_SECONDS > 0:
+        background_tasks.append(asyncio.create_task(run_revocation_sync_loop()))
+    if settings.SPATIAL_INDEX_REFRESH_SECONDS > 0:
+        background_tasks.append(asyncio.create_task(run_refresh_loop()))
+    if settings.GEOFENCE_ENABLED and settings.GEOFENCE_REFRESH_SECONDS > 0:
+        background_tasks.append(asyncio.create_task(run_zone_refresh_loop()))
+    if settings.COUNTERS_ENABLED and settings.COUNTER_RECONCILE_SECONDS > 0:
+        background_tasks.append(asyncio.create_task(run_reconcile_loop()))
+    if settings.ALERT_STORM_ENABLED:
+        background_tasks.append(asyncio.create_task(run_group_flush_loop()))
+    
+    # Jobs over shared data run in one worker only
+    leader_jobs = []
+    if settings.TELEMETRY_COMPACTION_ENABLED:
+        leader_jobs.append(run_compaction_loop)
+    if settings.FORECAST_PRECOMPUTE_METRICS:
+        leader_jobs.append(run_precompute_loop)
+    if leader_jobs:
+        background_tasks.append(asyncio.create_task(run_leader_jobs(leader_jobs)))
+    
     yield
     
     # Shutdown
     logger.info("Shutting down CivitasIQ API server...")
+    for task in background_tasks:
+        task.cancel()
+    await asyncio.gather(*background_tasks, return_exceptions=True)
+    # Whatever was not normalized yet is replayed by the next worker on this slot
+    await telemetry_wal.close()
+    if settings.ALERT_STORM_ENABLED:
+        async with AsyncSessionLocal() as db:
+            await flush_alert_groups(db)
+    forecaster.close()
+    await hub_bridge.stop()
+    await rate_limiter.close()
+    await token_verifier.close()
+    await cache.close()
+    await close_db()
 
 def create_application() -> FastAPI:
     """Create and configure FastAPI application"""
@@ -41,6 +118,10 @@ def create_application() -> FastAPI:
         lifespan=lifespan
     )
     
+    # Rate limiting (inside CORS, so that 429 responses carry CORS headers)
+    if settings.RATE_LIMIT_ENABLED:
+        app.add_middleware(RateLimitMiddleware, router=app.router)
+    
     # Security middleware
     app.add_middleware(
         TrustedHostMiddleware,
@@ -56,6 +137,13 @@ def create_application() -> FastAPI:
         allow_headers=["*"],
     )
     
+    # Metrics middleware (outermost, so it times the whole stack)
+    if settings.METRICS_ENABLED:
+        instrument_engine(engine)
+        instrument_engine(async_engine.sync_engine)
+        app.add_middleware(MetricsMiddleware)
+        app.add_route("/metrics", metrics_endpoint, include_in_schema=False)
+    
     # Include API router
     app.include_router(api_router, prefix="/api/v1")
     
@@ -109,10 +197,14 @@ async def api_info():
     }
 
 if __name__ == "__main__":
-    uvicorn.run(
-        "main:app",
-        host=settings.HOST,
-        port=settings.PORT,
-        reload=settings.DEBUG,
-        log_level="info"
-    )
+    if settings.WORKERS > 1 and not settings.DEBUG:
+        from app.core.serving import serve
+        serve(app)
+    else:
+        uvicorn.run(
+            "main:app",
+            host=settings.HOST,
+            port=settings.PORT,
+            reload=settings.DEBUG,
+            log_level="info"
+        )
@@ -0,0 +1,55 @@
+import pytest
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from app.models.metric import MetricDefinition
+from app.services.metric_catalog import MetricCatalog, metric_catalog
+
+
+@pytest.fixture
+async def sessions(tmp_path):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'catalog.db'}")
+    async with engine.begin() as connection:
+        await connection.run_sync(MetricDefinition.__table__.create)
+    yield async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    await engine.dispose()
+
+
+@pytest.fixture
+def catalog():
+    return MetricCatalog()
+
+
+@pytest.mark.asyncio
+async def test_rolled_back_ids_are_not_cached(sessions, catalog):
+    pair = ("pump", "pressure")
+
+    async with sessions() as db:
+        ids = await catalog.resolve(db, {pair})
+        assert pair in ids
+        assert pair not in catalog.ids
+        await db.rollback()
+    assert pair not in catalog.ids
+
+    async with sessions() as db:
+        ids = await catalog.resolve(db, {pair})
+        await db.commit()
+        stored = (await db.execute(select(MetricDefinition.id))).scalars().all()
+
+    assert stored == [ids[pair]]
+    assert catalog.ids == {pair: ids[pair]}
+    assert catalog.names[ids[pair]] == "pressure"
+
+
+@pytest.mark.asyncio
+async def test_pending_ids_are_reused_within_the_transaction(sessions, catalog):
+    pair = ("pump", "flow")
+
+    async with sessions() as db:
+        first = await catalog.resolve(db, {pair})
+        second = await catalog.resolve(db, {pair, ("pump", "pressure")})
+        assert second[pair] == first[pair]
+        await db.commit()
+
+    assert set(catalog.ids) == {pair, ("pump", "pressure")}
+    assert not metric_catalog.ids